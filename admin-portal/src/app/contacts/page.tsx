@@ -12,6 +12,19 @@ interface Agent {
     phone: string;
 }
 
+// Heavy operations run as background jobs; poll until the job finishes
+async function waitForJob(jobId: string, token: string | null) {
+    while (true) {
+        const res = await fetch(`http://localhost:8000/api/v1/jobs/${jobId}`, {
+            headers: { Authorization: `Bearer ${token}` }
+        });
+        if (!res.ok) throw new Error("Job status unavailable");
+        const job = await res.json();
+        if (["SUCCEEDED", "FAILED", "CANCELLED"].includes(job.status)) return job;
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+}
+
 export default function ContactsPage() {
     const [stats, setStats] = useState<any>(null);
     const [uploading, setUploading] = useState(false);
@@ -76,9 +89,13 @@ export default function ContactsPage() {
                 body: formData
             });
             if (res.ok) {
-                const data = await res.json();
-                toast.success(`Uploaded! ${data.new_contacts} new contacts added.`);
-                fetchStats();
+                const job = await waitForJob((await res.json()).id, token);
+                if (job.status === "SUCCEEDED") {
+                    toast.success(`Uploaded! ${job.result.new_contacts} new contacts added.`);
+                    fetchStats();
+                } else {
+                    toast.error(job.error || "Upload failed");
+                }
             } else {
                 toast.error("Upload failed");
             }
@@ -108,9 +125,14 @@ export default function ContactsPage() {
                 })
             });
             if (res.ok) {
-                toast.success("Batch generated!");
-                fetchBatches();
-                fetchStats();
+                const job = await waitForJob((await res.json()).id, token);
+                if (job.status === "SUCCEEDED") {
+                    toast.success("Batch generated!");
+                    fetchBatches();
+                    fetchStats();
+                } else {
+                    toast.error(job.error || "Generation failed");
+                }
             } else {
                 toast.error("Generation failed");
             }
@@ -176,7 +198,7 @@ export default function ContactsPage() {
                         <CardTitle className="text-sm font-medium text-muted-foreground">Active Batches</CardTitle>
                     </CardHeader>
                     <CardContent>
-                        <div className="text-2xl font-bold">{batches.filter(b => b.status !== 'COMPLETED').length}</div>
+                        <div className="text-2xl font-bold">{batches.filter(b => b.status !== 'COMPLETED' && b.status !== 'RECLAIMED').length}</div>
                     </CardContent>
                 </Card>
             </div>
@@ -191,7 +213,7 @@ export default function ContactsPage() {
                             Upload Contacts
                         </CardTitle>
                         <CardDescription>
-                            Import Excel files (.xlsx) with phone numbers.
+                            Import Excel or CSV files with phone numbers.
                         </CardDescription>
                     </CardHeader>
                     <CardContent>
@@ -199,7 +221,7 @@ export default function ContactsPage() {
                             <input
                                 type="file"
                                 className="absolute inset-0 w-full h-full opacity-0 cursor-pointer"
-                                accept=".xlsx, .xls"
+                                accept=".xlsx, .xls, .csv, .tsv, .txt, .vcf, .gz"
                                 onChange={handleUpload}
                                 disabled={uploading}
                             />
@@ -208,9 +230,9 @@ export default function ContactsPage() {
                                     <FileSpreadsheet />
                                 </div>
                                 <div className="font-medium">
-                                    {uploading ? "Uploading..." : "Click to select Excel file"}
+                                    {uploading ? "Uploading..." : "Click to select Excel or CSV file"}
                                 </div>
-                                <p className="text-xs text-muted-foreground">Supported format: .xlsx</p>
+                                <p className="text-xs text-muted-foreground">Supported formats: .xlsx, .csv, .tsv, .vcf (optionally .gz)</p>
                             </div>
                         </div>
                     </CardContent>
@@ -289,6 +311,7 @@ export default function ContactsPage() {
                                                 ${batch.status === 'ASSIGNED' ? 'bg-blue-500/10 text-blue-500' : ''}
                                                 ${batch.status === 'IN_PROGRESS' ? 'bg-indigo-500/10 text-indigo-500' : ''}
                                                 ${batch.status === 'COMPLETED' ? 'bg-green-500/10 text-green-500' : ''}
+                                                ${batch.status === 'RECLAIMED' ? 'bg-gray-500/10 text-gray-400' : ''}
                                             `}>
                                                 {batch.status}
                                             </span>
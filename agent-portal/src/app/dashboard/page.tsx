@@ -73,10 +73,22 @@ export default function DashboardPage() {
         fetchData();
     }, []);
 
-    const handleDownload = async (batchId: string, fileName: string) => {
+    const handleDownload = async (batchId: string | null, fileName: string, downloadUrl?: string) => {
+        if (downloadUrl) {
+            // Signed link: the browser downloads (and resumes) it directly
+            const a = document.createElement('a');
+            a.href = `${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}${downloadUrl}`;
+            a.download = fileName || 'contacts.vcf';
+            document.body.appendChild(a);
+            a.click();
+            a.remove();
+            return;
+        }
         const token = localStorage.getItem("token");
+        // No batch id: all assigned batches as one ZIP
+        const path = batchId ? `download/${batchId}` : 'bundle?format=zip';
         try {
-            const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/api/v1/contacts/agent/vcf/download/${batchId}`, {
+            const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/api/v1/contacts/agent/vcf/${path}`, {
                 headers: { Authorization: `Bearer ${token}` }
             });
 
@@ -128,10 +140,22 @@ export default function DashboardPage() {
 
                 {/* My Batches Section */}
                 <div>
-                    <h3 className="font-semibold text-lg mb-3 flex items-center gap-2">
-                        <FileSpreadsheet size={18} />
-                        Active Contact Batches
-                    </h3>
+                    <div className="flex items-center justify-between mb-3">
+                        <h3 className="font-semibold text-lg flex items-center gap-2">
+                            <FileSpreadsheet size={18} />
+                            Active Contact Batches
+                        </h3>
+                        {batches.length > 1 && (
+                            <Button
+                                size="sm"
+                                variant="outline"
+                                onClick={() => handleDownload(null, 'contacts.zip')}
+                            >
+                                <Download size={16} className="mr-1" />
+                                All
+                            </Button>
+                        )}
+                    </div>
 
                     {batches.length === 0 ? (
                         <Card>
@@ -154,7 +178,7 @@ export default function DashboardPage() {
                                         <Button
                                             size="icon"
                                             variant="outline"
-                                            onClick={() => handleDownload(batch.id, batch.file_name)}
+                                            onClick={() => handleDownload(batch.id, batch.file_name, batch.download_url)}
                                         >
                                             <Download size={20} />
                                         </Button>
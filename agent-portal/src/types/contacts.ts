@@ -5,11 +5,12 @@ export interface VcfBatch {
     contact_count: number;
     prefix: string;
     start_serial: number;
-    status: 'PENDING' | 'ASSIGNED' | 'IN_PROGRESS' | 'COMPLETED';
+    status: 'PENDING' | 'ASSIGNED' | 'IN_PROGRESS' | 'COMPLETED' | 'RECLAIMED';
     agent_id?: string;
     agent_name?: string;
     assigned_at?: string;
     created_at: string;
+    download_url?: string;
 }
 
 export interface ProgressReportRequest {
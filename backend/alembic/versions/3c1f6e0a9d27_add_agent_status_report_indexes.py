@@ -0,0 +1,28 @@
+"""Add agent status report indexes
+
+Revision ID: 3c1f6e0a9d27
+Revises: b066ab9804a4
+Create Date: 2026-10-19 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f6e0a9d27'
+down_revision: Union[str, None] = 'b066ab9804a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_agent_progress_agent_date', 'agent_progress', ['agent_id', 'date'], unique=False)
+    op.create_index('ix_users_tenant_last_activity', 'users', ['tenant_id', 'last_activity_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_tenant_last_activity', table_name='users')
+    op.drop_index('ix_agent_progress_agent_date', table_name='agent_progress')
@@ -0,0 +1,34 @@
+"""Add progress sync idempotency keys
+
+Revision ID: 5d8e1b3f7c40
+Revises: 7f2b9e4c1a63
+Create Date: 2026-10-19 13:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e1b3f7c40'
+down_revision: Union[str, None] = '7f2b9e4c1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('progress_sync_keys',
+        sa.Column('agent_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('idempotency_key', sa.String(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['agent_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('agent_id', 'idempotency_key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('progress_sync_keys')
@@ -0,0 +1,73 @@
+"""Add progress upsert constraint and agent streaks
+
+Revision ID: 7f2b9e4c1a63
+Revises: e4a7d2c91f05
+Create Date: 2026-10-19 12:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f2b9e4c1a63'
+down_revision: Union[str, None] = 'e4a7d2c91f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Merge duplicate (agent, batch, date) rows left by racing reports.
+    # Each report sets the session count, so keep the largest of each.
+    op.execute("""
+        WITH merged AS (
+            SELECT agent_id, vcf_batch_id, date,
+                   MIN(id::text)::uuid AS keep_id,
+                   MAX(morning_count) AS morning_count,
+                   MAX(evening_count) AS evening_count,
+                   MAX(morning_reported_at) AS morning_reported_at,
+                   MAX(evening_reported_at) AS evening_reported_at
+            FROM agent_progress
+            GROUP BY agent_id, vcf_batch_id, date
+            HAVING COUNT(*) > 1
+        ), kept AS (
+            UPDATE agent_progress ap
+            SET morning_count = m.morning_count,
+                evening_count = m.evening_count,
+                morning_reported_at = m.morning_reported_at,
+                evening_reported_at = m.evening_reported_at
+            FROM merged m
+            WHERE ap.id = m.keep_id
+        )
+        DELETE FROM agent_progress ap
+        USING merged m
+        WHERE ap.agent_id = m.agent_id
+          AND ap.vcf_batch_id = m.vcf_batch_id
+          AND ap.date IS NOT DISTINCT FROM m.date
+          AND ap.id <> m.keep_id
+    """)
+    op.create_unique_constraint(
+        'uq_agent_progress_agent_batch_date', 'agent_progress', ['agent_id', 'vcf_batch_id', 'date']
+    )
+
+    op.add_column('users', sa.Column('streak_days', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('users', sa.Column('streak_last_date', sa.Date(), nullable=True))
+    # Seed streaks from the latest daily snapshot of each agent
+    op.execute("""
+        UPDATE users u
+        SET streak_days = s.streak, streak_last_date = s.date
+        FROM (
+            SELECT DISTINCT ON (agent_id) agent_id, date, streak
+            FROM agent_daily_snapshots
+            ORDER BY agent_id, date DESC
+        ) s
+        WHERE u.id = s.agent_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'streak_last_date')
+    op.drop_column('users', 'streak_days')
+    op.drop_constraint('uq_agent_progress_agent_batch_date', 'agent_progress', type_='unique')
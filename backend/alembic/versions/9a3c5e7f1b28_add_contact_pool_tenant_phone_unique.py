@@ -0,0 +1,39 @@
+"""Add unique (tenant_id, phone) index on contact_pool
+
+Revision ID: 9a3c5e7f1b28
+Revises: 5d8e1b3f7c40
+Create Date: 2026-10-19 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3c5e7f1b28'
+down_revision: Union[str, None] = '5d8e1b3f7c40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Drop duplicate phones per tenant, keeping an assigned copy if there is
+    # one, otherwise the earliest upload.
+    op.execute("""
+        DELETE FROM contact_pool cp
+        USING (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY tenant_id, phone
+                ORDER BY is_assigned DESC NULLS LAST, uploaded_at, id
+            ) AS rn
+            FROM contact_pool
+        ) ranked
+        WHERE cp.id = ranked.id AND ranked.rn > 1
+    """)
+    op.create_index('uq_contact_pool_tenant_phone', 'contact_pool', ['tenant_id', 'phone'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_contact_pool_tenant_phone', table_name='contact_pool')
@@ -0,0 +1,42 @@
+"""Add per-tenant VCF serial counters
+
+Revision ID: a8c1e3f5b7d9
+Revises: f3b5d7e9a2c4
+Create Date: 2026-10-19 17:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c1e3f5b7d9'
+down_revision: Union[str, None] = 'f3b5d7e9a2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('vcf_serial_counters',
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('next_serial', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+        sa.PrimaryKeyConstraint('tenant_id')
+    )
+    # Continue after the highest serial any existing batch used
+    op.execute("""
+        INSERT INTO vcf_serial_counters (tenant_id, next_serial)
+        SELECT tenant_id,
+               max(coalesce(start_serial, 1)
+                   + (coalesce(contact_count, 0) + greatest(coalesce(contacts_per_serial, 25), 1) - 1)
+                     / greatest(coalesce(contacts_per_serial, 25), 1))
+        FROM vcf_batches
+        GROUP BY tenant_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('vcf_serial_counters')
@@ -0,0 +1,38 @@
+"""Add keyset pagination indexes
+
+Revision ID: b066ab9804a4
+Revises: 929cea994b1b
+Create Date: 2026-10-19 09:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b066ab9804a4'
+down_revision: Union[str, None] = '929cea994b1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_campaigns_tenant_created', 'campaigns', ['tenant_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_assignments_status_created', 'assignments', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_users_tenant_role_name', 'users', ['tenant_id', 'role', 'name', 'id'], unique=False)
+    op.create_index('ix_vcf_batches_tenant_created', 'vcf_batches', ['tenant_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_vcf_batches_tenant_status_created', 'vcf_batches', ['tenant_id', 'status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_vcf_batches_agent_assigned', 'vcf_batches', ['agent_id', 'assigned_at', 'id'], unique=False)
+    op.create_index('ix_whatsapp_batches_agent_assigned', 'whatsapp_batches', ['agent_id', 'assigned_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_whatsapp_batches_agent_assigned', table_name='whatsapp_batches')
+    op.drop_index('ix_vcf_batches_agent_assigned', table_name='vcf_batches')
+    op.drop_index('ix_vcf_batches_tenant_status_created', table_name='vcf_batches')
+    op.drop_index('ix_vcf_batches_tenant_created', table_name='vcf_batches')
+    op.drop_index('ix_users_tenant_role_name', table_name='users')
+    op.drop_index('ix_assignments_status_created', table_name='assignments')
+    op.drop_index('ix_campaigns_tenant_created', table_name='campaigns')
@@ -0,0 +1,37 @@
+"""Add job heartbeat and retry columns
+
+Revision ID: b4d6f8a1c3e5
+Revises: a8c1e3f5b7d9
+Create Date: 2026-10-19 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d6f8a1c3e5'
+down_revision: Union[str, None] = 'a8c1e3f5b7d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('jobs', sa.Column('queued_at', sa.DateTime(), nullable=True))
+    op.add_column('jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE jobs SET queued_at = created_at")
+    op.execute("UPDATE jobs SET attempts = 1 WHERE started_at IS NOT NULL")
+    op.create_index(
+        'ix_jobs_unfinished', 'jobs', ['status'], unique=False,
+        postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_unfinished', table_name='jobs')
+    op.drop_column('jobs', 'heartbeat_at')
+    op.drop_column('jobs', 'queued_at')
+    op.drop_column('jobs', 'attempts')
@@ -0,0 +1,50 @@
+"""Add maintained contact pool counters
+
+Revision ID: d7e9a1c3b5f2
+Revises: c2d4f6a8e013
+Create Date: 2026-10-19 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e9a1c3b5f2'
+down_revision: Union[str, None] = 'c2d4f6a8e013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('contact_pool_stats',
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('total_contacts', sa.BigInteger(), nullable=False),
+        sa.Column('assigned', sa.BigInteger(), nullable=False),
+        sa.Column('sources', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('recounted_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+        sa.PrimaryKeyConstraint('tenant_id')
+    )
+    # Seed the counters with an exact count of the existing pool
+    op.execute("""
+        INSERT INTO contact_pool_stats (tenant_id, total_contacts, assigned, sources, updated_at, recounted_at)
+        SELECT tenant_id, SUM(n), SUM(a), jsonb_object_agg(COALESCE(source_file, ''), n),
+               now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc'
+        FROM (
+            SELECT tenant_id, source_file,
+                   COUNT(*) AS n,
+                   COUNT(*) FILTER (WHERE is_assigned IS NOT FALSE) AS a
+            FROM contact_pool
+            GROUP BY tenant_id, source_file
+        ) per_source
+        GROUP BY tenant_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('contact_pool_stats')
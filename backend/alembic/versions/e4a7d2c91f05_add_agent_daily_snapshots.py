@@ -0,0 +1,66 @@
+"""Add agent daily snapshots
+
+Revision ID: e4a7d2c91f05
+Revises: 3c1f6e0a9d27
+Create Date: 2026-10-19 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7d2c91f05'
+down_revision: Union[str, None] = '3c1f6e0a9d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('agent_daily_snapshots',
+        sa.Column('agent_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('morning_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('evening_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('streak', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['agent_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+        sa.PrimaryKeyConstraint('agent_id', 'date')
+    )
+    op.create_index('ix_agent_daily_snapshots_tenant_date', 'agent_daily_snapshots', ['tenant_id', 'date'], unique=False)
+
+    # Backfill from existing progress. Streaks are runs of consecutive days
+    # (gaps-and-islands: date minus row number is constant within a run).
+    op.execute("""
+        WITH days AS (
+            SELECT ap.agent_id, u.tenant_id, ap.date,
+                   COALESCE(SUM(ap.morning_count), 0) AS morning_count,
+                   COALESCE(SUM(ap.evening_count), 0) AS evening_count
+            FROM agent_progress ap
+            JOIN users u ON u.id = ap.agent_id
+            WHERE ap.date IS NOT NULL
+            GROUP BY ap.agent_id, u.tenant_id, ap.date
+        ), runs AS (
+            SELECT days.*,
+                   date - (ROW_NUMBER() OVER (PARTITION BY agent_id ORDER BY date))::int AS run
+            FROM days
+        )
+        INSERT INTO agent_daily_snapshots
+            (agent_id, date, tenant_id, morning_count, evening_count, total_count, streak, updated_at)
+        SELECT agent_id, date, tenant_id, morning_count, evening_count,
+               morning_count + evening_count,
+               ROW_NUMBER() OVER (PARTITION BY agent_id, run ORDER BY date),
+               now() AT TIME ZONE 'utc'
+        FROM runs
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_agent_daily_snapshots_tenant_date', table_name='agent_daily_snapshots')
+    op.drop_table('agent_daily_snapshots')
@@ -0,0 +1,33 @@
+"""Add partial index for claiming unassigned contacts
+
+Revision ID: f3b5d7e9a2c4
+Revises: d7e9a1c3b5f2
+Create Date: 2026-10-19 17:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b5d7e9a2c4'
+down_revision: Union[str, None] = 'd7e9a1c3b5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only unassigned rows are indexed, so the index shrinks as batches are generated
+    op.create_index(
+        'ix_contact_pool_unassigned',
+        'contact_pool',
+        ['tenant_id', 'uploaded_at'],
+        unique=False,
+        postgresql_where=sa.text('NOT is_assigned'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contact_pool_unassigned', table_name='contact_pool')
@@ -44,6 +44,8 @@ async def get_current_user(token: str = Depends(reusable_oauth2)) -> User:
         user = result.scalars().first()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
+        if not user.is_active:
+            raise HTTPException(status_code=403, detail="Inactive user")
         return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
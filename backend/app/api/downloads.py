@@ -0,0 +1,165 @@
+"""
+File download responses with conditional and range request support.
+
+Starlette's FileResponse always sends the whole file, so resumable
+downloads are handled here: a single `Range: bytes=...` is answered with
+206 Partial Content (416 if it cannot be satisfied), `If-Range` falls back
+to the full file when the client's copy is outdated, and `If-None-Match`
+gets a 304. Multi-range requests are answered with the full file, which
+HTTP allows.
+
+The file is opened before the response is returned and streamed from that
+handle, so a file deleted meanwhile (e.g. an evicted cache entry) is still
+served in full. Stored files without a content key get an ETag from their
+size and mtime, so If-Range and If-None-Match work for them too.
+"""
+
+import os
+from typing import AsyncIterator, BinaryIO, Optional, Tuple
+
+import anyio
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+def _quoted(etag: str) -> str:
+    return f'"{etag}"'
+
+
+def content_disposition(filename: str) -> str:
+    return f'attachment; filename="{filename}"'
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Whether the client takes a gzip Content-Encoding (and sent no Range)."""
+    if "range" in request.headers:
+        return False
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() == "gzip" and params.replace(" ", "") != "q=0":
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already names this ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or _quoted(etag) in candidates
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range into inclusive (start, end).
+
+    Returns None when the full file should be sent.
+
+    Raises:
+        ValueError: if the range lies entirely outside the file
+    """
+    if not header or not header.startswith("bytes=") or "," in header or size == 0:
+        return None
+    start_text, sep, end_text = header[len("bytes="):].strip().partition("-")
+    if not sep or not (start_text or end_text) or not all(
+        text.isdigit() for text in (start_text, end_text) if text
+    ):
+        return None  # Malformed: ignore the header
+    if not start_text:
+        # Suffix range: the last N bytes
+        length = int(end_text)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(start_text)
+    end = min(int(end_text), size - 1) if end_text else size - 1
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    if end < start:
+        return None
+    return start, end
+
+
+async def _read_range(f: BinaryIO, start: int, end: int) -> AsyncIterator[bytes]:
+    try:
+        remaining = end - start + 1
+        await anyio.to_thread.run_sync(f.seek, start)
+        while remaining > 0:
+            block = await anyio.to_thread.run_sync(f.read, min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+    finally:
+        f.close()
+
+
+def file_etag(f: BinaryIO) -> str:
+    """Validator of an open file's current version (its size and mtime)."""
+    st = os.fstat(f.fileno())
+    return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+
+def file_download(
+    request: Request,
+    path: str,
+    filename: str,
+    media_type: str,
+    etag: Optional[str] = None
+) -> Response:
+    """
+    Serve a file in full or as the requested byte range. Without an etag,
+    the file's size and mtime stand in for one.
+
+    Raises:
+        FileNotFoundError: if the file does not exist
+    """
+    f = open(path, "rb")
+    return open_file_download(request, f, filename, media_type, etag or file_etag(f))
+
+
+def open_file_download(
+    request: Request,
+    f: BinaryIO,
+    filename: str,
+    media_type: str,
+    etag: Optional[str] = None
+) -> Response:
+    """file_download for an already open file, which the response closes."""
+    headers = {"Accept-Ranges": "bytes"}
+    if etag:
+        headers["ETag"] = _quoted(etag)
+        if not_modified(request, etag):
+            f.close()
+            return Response(status_code=304, headers=headers)
+
+    size = os.fstat(f.fileno()).st_size
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if not if_range or (etag and if_range == _quoted(etag)):
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            f.close()
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        status_code = 206
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers.update({
+        "Content-Length": str(end - start + 1),
+        "Content-Disposition": content_disposition(filename),
+    })
+    return StreamingResponse(
+        _read_range(f, start, end),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
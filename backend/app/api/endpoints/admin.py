@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select, func, desc, update
 from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 from app.api import deps
+from app.api.pagination import PageParams
+from app.core.security import hashing_metrics
 from app.core.database import AsyncSessionLocal
 from app.models import User, Campaign, AnalyticsEvent, UserRole, Assignment, AssignmentStatus, CampaignStatus
+from app.services.export import export_service
 
 router = APIRouter()
 
@@ -19,6 +22,9 @@ class CampaignCreate(BaseModel):
 class AssignmentUpdate(BaseModel):
     status: str 
 
+class AgentActiveUpdate(BaseModel):
+    is_active: bool
+
 class UserOut(BaseModel):
     id: UUID
     name: str
@@ -62,12 +68,20 @@ async def get_dashboard_stats(current_user: User = Depends(deps.get_current_acti
             "top_agents": [{"name": a.name, "score": a.current_score, "balance": a.wallet_balance} for a in top.scalars().all()]
         }
 
+@router.get("/metrics/password-hashing")
+async def get_password_hashing_metrics(current_user: User = Depends(deps.get_current_active_admin)):
+    """Queue and run times of the Argon2 hashing pool on this worker."""
+    return hashing_metrics.snapshot()
+
 # --- Campaigns ---
 @router.get("/campaigns")
-async def get_campaigns(current_user: User = Depends(deps.get_current_active_admin)):
+async def get_campaigns(response: Response, status: Optional[str] = None, page: PageParams = Depends(), current_user: User = Depends(deps.get_current_active_admin)):
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Campaign).where(Campaign.tenant_id == current_user.tenant_id).order_by(desc(Campaign.created_at)))
-        return result.scalars().all()
+        query = select(Campaign).where(Campaign.tenant_id == current_user.tenant_id)
+        if status:
+            query = query.where(Campaign.status == status)
+        result = await session.execute(page.apply(query, Campaign.created_at, Campaign.id))
+        return page.finish(result.scalars().all(), response, key=lambda c: (c.created_at, c.id))
 
 @router.post("/campaigns")
 async def create_campaign(campaign_in: CampaignCreate, current_user: User = Depends(deps.get_current_active_admin)):
@@ -85,26 +99,62 @@ async def create_campaign(campaign_in: CampaignCreate, current_user: User = Depe
 
 # --- Agents ---
 @router.get("/agents")
-async def get_agents(current_user: User = Depends(deps.get_current_active_admin)):
+async def get_agents(
+    response: Response,
+    name: Optional[str] = Query(None, description="Filter by name prefix"),
+    page: PageParams = Depends(),
+    current_user: User = Depends(deps.get_current_active_admin),
+):
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(User).where(User.tenant_id == current_user.tenant_id, User.role == UserRole.AGENT.value))
-        return result.scalars().all()
+        query = select(User).where(User.tenant_id == current_user.tenant_id, User.role == UserRole.AGENT.value)
+        if name:
+            query = query.where(User.name.startswith(name, autoescape=True))
+        result = await session.execute(page.apply(query, User.name, User.id, descending=False))
+        return page.finish(result.scalars().all(), response, key=lambda u: (u.name, u.id))
+
+@router.put("/agents/{agent_id}/active")
+async def set_agent_active(agent_id: UUID, update_data: AgentActiveUpdate, current_user: User = Depends(deps.get_current_active_admin)):
+    """Deactivate (or reactivate) an agent: inactive agents cannot sign in and get no rebalanced batches."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(User)
+            .where(User.id == agent_id, User.tenant_id == current_user.tenant_id, User.role == UserRole.AGENT.value)
+            .values(is_active=update_data.is_active)
+            .returning(User.id)
+        )
+        if result.scalar() is None:
+            raise HTTPException(status_code=404, detail="Agent not found")
+        await session.commit()
+    # Inactive agents drop out of the agent status report
+    await export_service.invalidate_report(current_user.tenant_id)
+    return {"status": "success", "is_active": update_data.is_active}
 
 # --- Assignments ---
 @router.get("/assignments", response_model=List[AssignmentOut])
-async def get_assignments(status: Optional[str] = None, current_user: User = Depends(deps.get_current_active_admin)):
+async def get_assignments(
+    response: Response,
+    status: Optional[str] = None,
+    campaign_id: Optional[UUID] = None,
+    agent_id: Optional[UUID] = None,
+    page: PageParams = Depends(),
+    current_user: User = Depends(deps.get_current_active_admin),
+):
     async with AsyncSessionLocal() as session:
         query = select(Assignment).join(User).join(Campaign).where(User.tenant_id == current_user.tenant_id)
         if status:
             query = query.where(Assignment.status == status)
+        if campaign_id:
+            query = query.where(Assignment.campaign_id == campaign_id)
+        if agent_id:
+            query = query.where(Assignment.agent_id == agent_id)
         
         # Eager load for UI
         from sqlalchemy.orm import selectinload
         query = query.options(selectinload(Assignment.agent), selectinload(Assignment.campaign))
+        query = page.apply(query, Assignment.created_at, Assignment.id)
         
         result = await session.execute(query)
-        assignments = result.scalars().all()
-        return assignments
+        return page.finish(result.scalars().all(), response, key=lambda a: (a.created_at, a.id))
 
 @router.put("/assignments/{assignment_id}")
 async def update_assignment(assignment_id: str, update_data: AssignmentUpdate, current_user: User = Depends(deps.get_current_active_admin)):
@@ -44,9 +44,11 @@ async def login_access_token(form_data: OAuth2PasswordRequestForm = Depends()) -
     # The current User model lacks a password_hash field!
     # I must add password_hash to User model.
     
-    if not user or not user.hashed_password or not security.verify_password(form_data.password, user.hashed_password):
+    if not user or not user.hashed_password or not await security.verify_password_async(form_data.password, user.hashed_password):
             logger.warning(f"Failed login attempt for user: {form_data.username}")
             raise HTTPException(status_code=400, detail="Incorrect email or password")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
     
     logger.info(f"Successful login for user: {form_data.username}")
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -12,7 +12,7 @@ import secrets
 import string
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel, HttpUrl
 from sqlalchemy import select, func
@@ -20,6 +20,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api import deps
+from app.api.pagination import PageParams
 from app.core.database import AsyncSessionLocal
 from app.models import (
     User, Campaign, CampaignStatus, TrackingLink, AnalyticsEvent, UserRole
@@ -122,18 +123,20 @@ async def create_campaign(
 
 @router.get("/admin/campaigns", response_model=List[CampaignResponse])
 async def list_campaigns(
+    response: Response,
     status: Optional[str] = Query(None),
+    page: PageParams = Depends(),
     current_user: User = Depends(deps.get_current_admin_user)
 ):
-    """List all campaigns for the tenant."""
+    """List campaigns for the tenant, newest first (cursor paginated)."""
     async with AsyncSessionLocal() as session:
         query = select(Campaign).where(Campaign.tenant_id == current_user.tenant_id)
         if status:
             query = query.where(Campaign.status == status)
-        query = query.order_by(Campaign.created_at.desc())
+        query = page.apply(query, Campaign.created_at, Campaign.id)
         
         result = await session.execute(query)
-        campaigns = result.scalars().all()
+        campaigns = page.finish(result.scalars().all(), response, key=lambda c: (c.created_at, c.id))
         
         return [
             CampaignResponse(
@@ -240,24 +243,27 @@ async def get_my_campaigns(
 ):
     """Get all active campaigns available to the agent with their tracking links."""
     async with AsyncSessionLocal() as session:
-        # Get all active campaigns for this tenant
+        # Active campaigns for this tenant with the agent's link (if joined)
+        # in a single statement
         campaigns_result = await session.execute(
-            select(Campaign)
+            select(Campaign, TrackingLink)
+            .outerjoin(
+                TrackingLink,
+                (TrackingLink.campaign_id == Campaign.id)
+                & (TrackingLink.agent_id == current_user.id)
+            )
             .where(Campaign.tenant_id == current_user.tenant_id)
             .where(Campaign.status == CampaignStatus.ACTIVE.value)
             .order_by(Campaign.created_at.desc())
         )
-        campaigns = campaigns_result.scalars().all()
         
         result = []
-        for campaign in campaigns:
-            # Check if agent already has a link for this campaign
-            link_result = await session.execute(
-                select(TrackingLink)
-                .where(TrackingLink.campaign_id == campaign.id)
-                .where(TrackingLink.agent_id == current_user.id)
-            )
-            link = link_result.scalars().first()
+        seen = set()
+        for campaign, link in campaigns_result.all():
+            # join_campaign allows one link per agent per campaign; guard anyway
+            if campaign.id in seen:
+                continue
+            seen.add(campaign.id)
             
             my_link = None
             my_earnings = 0.0
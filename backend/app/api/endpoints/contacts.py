@@ -6,47 +6,51 @@ Provides endpoints for:
 - Generating VCF batches
 - Assigning batches to agents
 - Getting pool statistics
-- Downloading VCF files
+- Downloading VCF files (single or as ZIP/gzip bundles)
 """
 
 import os
 import uuid
-from datetime import datetime
+from urllib.parse import urlencode
+from datetime import date, datetime, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.api.downloads import accepts_gzip, content_disposition, file_download, not_modified, open_file_download
+from app.api.endpoints.jobs import enqueue_job
+from app.api.pagination import PageParams
+from app.core.config import settings
 from app.core.database import AsyncSessionLocal
-from app.models import User, VcfBatch, VcfBatchStatus, AgentProgress
+from app.core.security import sign_download, verify_download
+from app.models import User, VcfBatch
+from app.schemas.jobs import Job as JobSchema
 from app.services.contact_pool import contact_pool_service
+from app.services.vcf_bundles import vcf_bundles, gzip_chunks, read_file
+from app.services.vcf_cache import vcf_cache
 from app.services.vcf_generator import vcf_generator
 from app.services.export import export_service
+from app.services.job_handlers import CONTACTS_UPLOAD, VCF_GENERATE, POOL_RECOUNT, BATCH_RECLAIM
+from app.services.progress import progress_service, SESSION_TYPES
+from app.services.progress_snapshots import progress_snapshots
 
 router = APIRouter()
 
 
 # ============== Schemas ==============
 
-class UploadResponse(BaseModel):
-    file_name: str
-    total_rows: int
-    valid_phones: int
-    new_contacts: int
-    duplicates: int
-    invalid_entries: int
-    invalid_samples: List[str]
-
-
 class PoolStatsResponse(BaseModel):
     total_contacts: int
     assigned: int
     unassigned: int
     assignment_rate: float
     sources: List[dict]
+    approximate: bool = False
+    recounted_at: Optional[datetime] = None
 
 
 class VcfBatchResponse(BaseModel):
@@ -60,6 +64,7 @@ class VcfBatchResponse(BaseModel):
     agent_name: Optional[str]
     assigned_at: Optional[datetime]
     created_at: datetime
+    download_url: Optional[str] = None  # Short-lived signed URL (agent listings)
 
 
 class GenerateBatchesRequest(BaseModel):
@@ -69,6 +74,12 @@ class GenerateBatchesRequest(BaseModel):
     max_batches: int = 1
 
 
+class ReclaimBatchesRequest(BaseModel):
+    stale_days: int = Field(3, ge=1, description="Days without progress that make a batch stale")
+    mode: str = Field("return", pattern="^(return|rebalance)$")
+    throughput_days: int = Field(7, ge=1, description="Agent throughput window used for rebalancing")
+
+
 class AssignBatchRequest(BaseModel):
     agent_id: str
 
@@ -80,6 +91,19 @@ class ProgressReportRequest(BaseModel):
     notes: Optional[str] = None
 
 
+class ProgressSyncItem(BaseModel):
+    idempotency_key: str = Field(..., min_length=1, max_length=128)
+    batch_id: uuid.UUID
+    date: date
+    session_type: str  # "morning" or "evening"
+    count: int = Field(..., ge=0)
+    notes: Optional[str] = None
+
+
+class ProgressSyncRequest(BaseModel):
+    reports: List[ProgressSyncItem] = Field(..., max_length=500)
+
+
 class AgentStatusResponse(BaseModel):
     id: str
     name: str
@@ -93,50 +117,62 @@ class AgentStatusResponse(BaseModel):
 
 # ============== Admin Endpoints ==============
 
-@router.post("/admin/contacts/upload", response_model=UploadResponse)
+@router.post("/admin/contacts/upload", response_model=JobSchema, status_code=202)
 async def upload_contacts(
     file: UploadFile = File(...),
     current_user: User = Depends(deps.get_current_admin_user)
 ):
     """
-    Upload an Excel file with phone numbers to the contact pool.
-    Accepts .xlsx files.
+    Upload an Excel, CSV/TSV or vCard file (text files optionally .gz) with
+    phone numbers to the contact pool. The file is processed by a background job; poll
+    /jobs/{id} for progress and the upload statistics.
     """
     # Validate file type
-    if not file.filename.endswith(('.xlsx', '.xls')):
+    if not file.filename.lower().endswith(contact_pool_service.SUPPORTED_EXTENSIONS):
         raise HTTPException(
             status_code=400,
-            detail="Invalid file type. Please upload an Excel file (.xlsx or .xls)"
+            detail="Invalid file type. Please upload an Excel (.xlsx, .xls), CSV/TSV (.csv, .tsv, .txt) or vCard (.vcf) file, text files optionally .gz"
         )
     
-    # Read file content
-    content = await file.read()
+    # Spool to disk; the job parses it and removes it when done
+    file_path = await contact_pool_service.spool_upload(file.file, file.filename)
     
-    async with AsyncSessionLocal() as session:
-        result = await contact_pool_service.upload_contacts(
-            session=session,
-            tenant_id=current_user.tenant_id,
-            file_content=content,
-            file_name=file.filename
-        )
-    
-    return UploadResponse(**result)
+    try:
+        async with AsyncSessionLocal() as session:
+            return await enqueue_job(session, current_user, CONTACTS_UPLOAD, {
+                "file_path": file_path,
+                "file_name": file.filename,
+            })
+    except BaseException:
+        os.remove(file_path)
+        raise
 
 
 @router.get("/admin/contacts/pool/stats", response_model=PoolStatsResponse)
 async def get_pool_stats(
+    approximate: bool = Query(False, description="Estimate totals from planner statistics"),
     current_user: User = Depends(deps.get_current_admin_user)
 ):
     """Get statistics about the contact pool."""
     async with AsyncSessionLocal() as session:
         stats = await contact_pool_service.get_pool_stats(
             session=session,
-            tenant_id=current_user.tenant_id
+            tenant_id=current_user.tenant_id,
+            approximate=approximate
         )
     return PoolStatsResponse(**stats)
 
 
-@router.post("/admin/vcf/generate", response_model=List[VcfBatchResponse])
+@router.post("/admin/contacts/pool/stats/recount", response_model=JobSchema, status_code=202)
+async def recount_pool_stats(
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """Recount the pool counters exactly from the contacts (background job)."""
+    async with AsyncSessionLocal() as session:
+        return await enqueue_job(session, current_user, POOL_RECOUNT, {})
+
+
+@router.post("/admin/vcf/generate", response_model=JobSchema, status_code=202)
 async def generate_vcf_batches(
     request: GenerateBatchesRequest,
     current_user: User = Depends(deps.get_current_admin_user)
@@ -144,66 +180,42 @@ async def generate_vcf_batches(
     """
     Generate VCF batches from the contact pool.
     Each batch contains up to contacts_per_batch contacts.
+    Runs as a background job; the generated batches are in its result.
     """
     async with AsyncSessionLocal() as session:
-        batches = await vcf_generator.generate_multiple_batches(
-            session=session,
-            tenant_id=current_user.tenant_id,
-            prefix=request.prefix,
-            contacts_per_batch=request.contacts_per_batch,
-            contacts_per_serial=request.contacts_per_serial,
-            max_batches=request.max_batches
-        )
-        
-        # Format response
-        response = []
-        for batch in batches:
-            response.append(VcfBatchResponse(
-                id=str(batch.id),
-                file_name=batch.file_name,
-                contact_count=batch.contact_count,
-                prefix=batch.prefix,
-                start_serial=batch.start_serial,
-                status=batch.status,
-                agent_id=str(batch.agent_id) if batch.agent_id else None,
-                agent_name=None,
-                assigned_at=batch.assigned_at,
-                created_at=batch.created_at
-            ))
-        
-        return response
+        return await enqueue_job(session, current_user, VCF_GENERATE, request.model_dump())
 
 
 @router.get("/admin/vcf/batches", response_model=List[VcfBatchResponse])
 async def list_vcf_batches(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status"),
+    agent_id: Optional[uuid.UUID] = Query(None, description="Filter by assigned agent"),
+    page: PageParams = Depends(),
     current_user: User = Depends(deps.get_current_admin_user)
 ):
-    """List all VCF batches for the tenant."""
+    """List VCF batches for the tenant, newest first (cursor paginated)."""
     async with AsyncSessionLocal() as session:
-        query = select(VcfBatch).where(VcfBatch.tenant_id == current_user.tenant_id)
+        # Agent name comes from the same statement (no per-batch lookup)
+        query = (
+            select(VcfBatch, User.name)
+            .outerjoin(User, User.id == VcfBatch.agent_id)
+            .where(VcfBatch.tenant_id == current_user.tenant_id)
+        )
         
         if status:
             query = query.where(VcfBatch.status == status)
+        if agent_id:
+            query = query.where(VcfBatch.agent_id == agent_id)
         
-        query = query.order_by(VcfBatch.created_at.desc())
+        query = page.apply(query, VcfBatch.created_at, VcfBatch.id)
         
         result = await session.execute(query)
-        batches = result.scalars().all()
+        rows = page.finish(result.all(), response, key=lambda r: (r[0].created_at, r[0].id))
         
-        response = []
-        for batch in batches:
-            # Get agent name if assigned
-            agent_name = None
-            if batch.agent_id:
-                agent_result = await session.execute(
-                    select(User).where(User.id == batch.agent_id)
-                )
-                agent = agent_result.scalars().first()
-                if agent:
-                    agent_name = agent.name
-            
-            response.append(VcfBatchResponse(
+        items = []
+        for batch, agent_name in rows:
+            items.append(VcfBatchResponse(
                 id=str(batch.id),
                 file_name=batch.file_name,
                 contact_count=batch.contact_count,
@@ -216,7 +228,21 @@ async def list_vcf_batches(
                 created_at=batch.created_at
             ))
         
-        return response
+        return items
+
+
+@router.post("/admin/vcf/batches/reclaim", response_model=JobSchema, status_code=202)
+async def reclaim_stale_batches(
+    request: ReclaimBatchesRequest,
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """
+    Reclaim batches with no progress for stale_days (background job): return
+    their un-worked contacts to the pool, or with mode=rebalance move
+    untouched ones to agents in proportion to their recent throughput.
+    """
+    async with AsyncSessionLocal() as session:
+        return await enqueue_job(session, current_user, BATCH_RECLAIM, request.model_dump())
 
 
 @router.post("/admin/vcf/batches/{batch_id}/assign", response_model=VcfBatchResponse)
@@ -236,6 +262,8 @@ async def assign_batch_to_agent(
         if not batch:
             raise HTTPException(status_code=404, detail="Batch not found or not available")
         
+        await export_service.invalidate_report(current_user.tenant_id)
+        
         # Get agent name
         agent_result = await session.execute(
             select(User).where(User.id == batch.agent_id)
@@ -286,29 +314,103 @@ async def get_inactive_agents(
 
 @router.get("/admin/export/text")
 async def export_status_text(
+    stale: bool = Query(False, description="Serve a stale cached report while it is rebuilt"),
     current_user: User = Depends(deps.get_current_admin_user)
 ):
-    """Generate a text status report for sharing."""
+    """Generate a text status report for sharing (cached per tenant)."""
     async with AsyncSessionLocal() as session:
-        report = await export_service.generate_text_report(
+        return await export_service.get_cached_report(
             session=session,
-            tenant_id=current_user.tenant_id
+            tenant_id=current_user.tenant_id,
+            stale_while_revalidate=stale
         )
-        return {"report": report}
+
+
+@router.get("/admin/progress/summary")
+async def get_daily_summary(
+    day: Optional[date] = Query(None, alias="date", description="Day to summarize (default: today)"),
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """Get tenant-wide progress totals for a single day."""
+    async with AsyncSessionLocal() as session:
+        return await export_service.get_daily_summary(
+            session=session,
+            tenant_id=current_user.tenant_id,
+            date=day
+        )
+
+
+@router.get("/admin/progress/trend")
+async def get_progress_trend(
+    days: int = Query(30, ge=1, le=366, description="Number of days to include"),
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """Get daily totals and per-agent daily counts for the last N days."""
+    async with AsyncSessionLocal() as session:
+        return await export_service.get_progress_trend(
+            session=session,
+            tenant_id=current_user.tenant_id,
+            days=days
+        )
+
+
+BUNDLE_FORMATS = "^(zip|gzip)$"
+
+
+def bundle_response(batches: List[VcfBatch], bundle_format: str) -> StreamingResponse:
+    """Stream batches as a ZIP (one file per batch) or one gzipped VCF."""
+    if not batches:
+        raise HTTPException(status_code=404, detail="No batches found")
+    stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    if bundle_format == "gzip":
+        body, media_type, file_name = vcf_bundles.stream_gzip(batches), "application/gzip", f"vcf_batches_{stamp}.vcf.gz"
+    else:
+        body, media_type, file_name = vcf_bundles.stream_zip(batches), "application/zip", f"vcf_batches_{stamp}.zip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": content_disposition(file_name)}
+    )
+
+
+@router.get("/admin/vcf/bundle")
+async def download_vcf_bundle(
+    agent_id: Optional[uuid.UUID] = Query(None, description="Only batches of this agent"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    batch_ids: Optional[List[uuid.UUID]] = Query(None, description="Only these batches"),
+    format: str = Query("zip", pattern=BUNDLE_FORMATS, description="zip (file per batch) or gzip (one VCF)"),
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """Download many of the tenant's VCF batches as one compressed bundle."""
+    async with AsyncSessionLocal() as session:
+        batches = await vcf_bundles.select_batches(
+            session=session,
+            tenant_id=current_user.tenant_id,
+            agent_id=agent_id,
+            status=status,
+            batch_ids=batch_ids
+        )
+    return bundle_response(batches, format)
 
 
 # ============== Agent Endpoints ==============
 
 @router.get("/agent/vcf/batches", response_model=List[VcfBatchResponse])
 async def get_my_batches(
+    response: Response,
+    status: Optional[str] = Query(None, description="Filter by status"),
+    page: PageParams = Depends(),
     current_user: User = Depends(deps.get_current_active_user)
 ):
-    """Get VCF batches assigned to the current agent."""
+    """Get VCF batches assigned to the current agent (cursor paginated)."""
     async with AsyncSessionLocal() as session:
         batches = await vcf_generator.get_agent_batches(
             session=session,
-            agent_id=current_user.id
+            agent_id=current_user.id,
+            status=status,
+            page=page
         )
+        batches = page.finish(batches, response, key=lambda b: (b.assigned_at, b.id))
         
         return [VcfBatchResponse(
             id=str(batch.id),
@@ -320,16 +422,92 @@ async def get_my_batches(
             agent_id=str(batch.agent_id) if batch.agent_id else None,
             agent_name=current_user.name,
             assigned_at=batch.assigned_at,
-            created_at=batch.created_at
+            created_at=batch.created_at,
+            download_url=signed_download_url(batch)
         ) for batch in batches]
 
 
+def signed_download_url(batch: VcfBatch) -> str:
+    """Signed URL for download_signed_vcf, valid for VCF_DOWNLOAD_URL_TTL_SECONDS."""
+    file_name = batch.file_name or f"contacts_{batch.id}.vcf"
+    params = sign_download(str(batch.id), file_name, settings.VCF_DOWNLOAD_URL_TTL_SECONDS)
+    return f"{settings.API_V1_STR}/contacts/vcf/signed/{batch.id}?{urlencode(params)}"
+
+
+@router.get("/vcf/signed/{batch_id}")
+async def download_signed_vcf(
+    batch_id: uuid.UUID,
+    request: Request,
+    name: str = Query(...),
+    expires: int = Query(...),
+    sig: str = Query(...)
+):
+    """
+    Download a VCF through a signed URL from the agent's batch list.
+    The signature is checked without any lookup, so stored files are served
+    (and range-resumed) with no database access. With VCF_RENDER_ON_DEMAND
+    the batch is still read to render or find it in the cache.
+    """
+    if not verify_download(str(batch_id), name, expires, sig):
+        raise HTTPException(status_code=403, detail="Invalid or expired download link")
+    
+    if settings.VCF_RENDER_ON_DEMAND:
+        async with AsyncSessionLocal() as session:
+            batch = await session.get(VcfBatch, batch_id)
+            if not batch:
+                raise HTTPException(status_code=404, detail="Batch not found")
+            key, digest = await vcf_generator.render_key(session, batch)
+        if accepts_gzip(request):
+            return gzip_vcf_download(request, batch, name, etag=f"{key}-gzip")
+        return render_vcf_download(request, batch, key, digest, name)
+    
+    # Stored files live at STORAGE_PATH/<file name>; the name is signed
+    file_path = os.path.join(vcf_generator.STORAGE_PATH, os.path.basename(name))
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail="VCF file not found")
+    if accepts_gzip(request):
+        return StreamingResponse(
+            gzip_chunks(read_file(file_path)),
+            media_type="text/vcard",
+            headers={
+                "Content-Encoding": "gzip",
+                "Vary": "Accept-Encoding",
+                "Content-Disposition": content_disposition(name),
+            }
+        )
+    return file_download(request, file_path, name, "text/vcard")
+
+
+@router.get("/agent/vcf/bundle")
+async def download_my_vcf_bundle(
+    status: Optional[str] = Query(None, description="Filter by status"),
+    batch_ids: Optional[List[uuid.UUID]] = Query(None, description="Only these batches"),
+    format: str = Query("zip", pattern=BUNDLE_FORMATS, description="zip (file per batch) or gzip (one VCF)"),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Download the agent's assigned VCF batches as one compressed bundle."""
+    async with AsyncSessionLocal() as session:
+        batches = await vcf_bundles.select_batches(
+            session=session,
+            tenant_id=current_user.tenant_id,
+            agent_id=current_user.id,
+            status=status,
+            batch_ids=batch_ids
+        )
+    return bundle_response(batches, format)
+
+
 @router.get("/agent/vcf/download/{batch_id}")
 async def download_vcf(
     batch_id: str,
+    request: Request,
     current_user: User = Depends(deps.get_current_active_user)
 ):
-    """Download a VCF file for a batch assigned to the agent."""
+    """
+    Download a VCF file for a batch assigned to the agent.
+    With VCF_RENDER_ON_DEMAND the file is rendered from the batch's contacts,
+    or served from the render cache (with ETag and Range support) when hot.
+    """
     async with AsyncSessionLocal() as session:
         result = await session.execute(
             select(VcfBatch)
@@ -341,14 +519,69 @@ async def download_vcf(
         if not batch:
             raise HTTPException(status_code=404, detail="Batch not found")
         
-        if not batch.file_path or not os.path.exists(batch.file_path):
+        file_name = batch.file_name or f"contacts_{batch_id}.vcf"
+        if not vcf_bundles.has_content(batch):
             raise HTTPException(status_code=404, detail="VCF file not found")
         
-        return FileResponse(
-            path=batch.file_path,
-            filename=batch.file_name or f"contacts_{batch_id}.vcf",
-            media_type="text/vcard"
-        )
+        key = digest = None
+        if settings.VCF_RENDER_ON_DEMAND:
+            key, digest = await vcf_generator.render_key(session, batch)
+        
+        if accepts_gzip(request):
+            return gzip_vcf_download(request, batch, file_name, etag=f"{key}-gzip" if key else None)
+        if key:
+            return render_vcf_download(request, batch, key, digest, file_name)
+        return file_download(request, batch.file_path, file_name, "text/vcard")
+
+
+def gzip_vcf_download(
+    request: Request,
+    batch: VcfBatch,
+    file_name: str,
+    etag: Optional[str] = None
+) -> Response:
+    """Serve a batch gzip-encoded on the fly (no ranges)."""
+    headers = {"Vary": "Accept-Encoding"}
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+        if not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+    headers.update({
+        "Content-Encoding": "gzip",
+        "Content-Disposition": content_disposition(file_name),
+    })
+    return StreamingResponse(
+        gzip_chunks(vcf_bundles.batch_content(batch)),
+        media_type="text/vcard",
+        headers=headers
+    )
+
+
+def render_vcf_download(
+    request: Request,
+    batch: VcfBatch,
+    key: str,
+    digest: str,
+    file_name: str
+) -> Response:
+    """
+    Serve an on-demand batch: from the render cache when present, otherwise
+    rendered straight from the database while being written to the cache.
+    Ranges are only honoured from the cache; a cold response is the full file.
+    """
+    cached = vcf_cache.open(key)
+    if cached:
+        return open_file_download(request, cached, file_name, "text/vcard", etag=key)
+    
+    headers = {"ETag": f'"{key}"', "Accept-Ranges": "bytes", "Vary": "Accept-Encoding"}
+    if not_modified(request, key):
+        return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = content_disposition(file_name)
+    return StreamingResponse(
+        vcf_generator.stream_batch(batch, digest, cache_key=key),
+        media_type="text/vcard",
+        headers=headers
+    )
 
 
 @router.post("/agent/progress/report")
@@ -360,113 +593,54 @@ async def report_progress(
     Report progress for adding contacts.
     Session type should be 'morning' or 'evening'.
     """
-    if request.session_type not in ["morning", "evening"]:
+    if request.session_type not in SESSION_TYPES:
         raise HTTPException(
             status_code=400,
             detail="session_type must be 'morning' or 'evening'"
         )
     
     async with AsyncSessionLocal() as session:
-        # Verify batch belongs to agent
-        batch_result = await session.execute(
-            select(VcfBatch)
-            .where(VcfBatch.id == uuid.UUID(request.batch_id))
-            .where(VcfBatch.agent_id == current_user.id)
+        # Batch check, progress upsert, streak, snapshot and XP in two statements
+        result = await progress_service.report(
+            session=session,
+            agent_id=current_user.id,
+            batch_id=uuid.UUID(request.batch_id),
+            session_type=request.session_type,
+            count=request.count,
+            notes=request.notes
         )
-        batch = batch_result.scalars().first()
         
-        if not batch:
+        if result is None:
             raise HTTPException(status_code=404, detail="Batch not found")
         
-        # Find or create today's progress record
-        today = datetime.utcnow().date()
-        progress_result = await session.execute(
-            select(AgentProgress)
-            .where(AgentProgress.agent_id == current_user.id)
-            .where(AgentProgress.vcf_batch_id == batch.id)
-            .where(AgentProgress.date == today)
-        )
-        progress = progress_result.scalars().first()
-        
-        if not progress:
-            progress = AgentProgress(
-                agent_id=current_user.id,
-                vcf_batch_id=batch.id,
-                date=today
-            )
-            session.add(progress)
-        
-        # Update progress
-        now = datetime.utcnow()
-        if request.session_type == "morning":
-            progress.morning_count = request.count
-            progress.morning_reported_at = now
-        else:
-            progress.evening_count = request.count
-            progress.evening_reported_at = now
-        
-        if request.notes:
-            progress.notes = request.notes
-        
-        # Update batch status
-        if batch.status == VcfBatchStatus.ASSIGNED.value:
-            batch.status = VcfBatchStatus.IN_PROGRESS.value
-        
-        # Update agent's last activity
-        current_user.last_activity_at = now
-        
-        # ============== XP System with Streak ==============
-        # Base XP: 1 point per contact
-        base_xp = request.count
+        await session.commit()
+        await export_service.invalidate_report(current_user.tenant_id)
         
-        # Calculate streak (consecutive days with activity)
-        from datetime import timedelta
-        yesterday = today - timedelta(days=1)
-        streak_result = await session.execute(
-            select(AgentProgress)
-            .where(AgentProgress.agent_id == current_user.id)
-            .where(AgentProgress.date == yesterday)
+        return result
+
+
+@router.post("/agent/progress/sync")
+async def sync_progress(
+    request: ProgressSyncRequest,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Apply queued offline progress reports in one transaction.
+    Every report carries an idempotency key, so a device can safely retry
+    the whole sync; already-applied reports come back as "duplicate".
+    """
+    async with AsyncSessionLocal() as session:
+        results = await progress_service.sync(
+            session=session,
+            agent_id=current_user.id,
+            items=request.reports
         )
-        had_activity_yesterday = streak_result.scalars().first() is not None
-        
-        # Streak multiplier: 1.0 base, +0.1 per consecutive day, max 1.5x
-        streak_multiplier = 1.0
-        if had_activity_yesterday:
-            # Count streak days (simplified: just check if yesterday had activity)
-            # A more complex implementation would track actual streak count
-            streak_multiplier = 1.2  # 20% bonus for continuing streak
-        
-        # Bonus for completing both sessions (if both morning and evening done)
-        session_bonus = 0
-        if progress.morning_count > 0 and progress.evening_count > 0:
-            session_bonus = 10  # Extra 10 XP for completing both
-        
-        # Goal completion bonus
-        total_today = progress.morning_count + progress.evening_count
-        goal_bonus = 0
-        if total_today >= 50:
-            goal_bonus = 25  # Bonus for hitting daily goal
-        
-        # Calculate final XP
-        xp_earned = int(base_xp * streak_multiplier) + session_bonus + goal_bonus
-        
-        # Update user score
-        if current_user.current_score is None:
-            current_user.current_score = 0
-        current_user.current_score += xp_earned
-        
         await session.commit()
-        
-        return {
-            "status": "success",
-            "date": today.isoformat(),
-            "morning_count": progress.morning_count,
-            "evening_count": progress.evening_count,
-            "total_today": progress.morning_count + progress.evening_count,
-            "xp_earned": xp_earned,
-            "total_xp": current_user.current_score,
-            "streak_multiplier": streak_multiplier
-        }
+    
+    if any(r["status"] == "applied" for r in results):
+        await export_service.invalidate_report(current_user.tenant_id)
+    
+    return {"results": results}
 
 
 @router.get("/agent/progress/today")
@@ -476,15 +650,10 @@ async def get_today_progress(
     """Get today's progress for the current agent."""
     async with AsyncSessionLocal() as session:
         today = datetime.utcnow().date()
-        result = await session.execute(
-            select(AgentProgress)
-            .where(AgentProgress.agent_id == current_user.id)
-            .where(AgentProgress.date == today)
-        )
-        progress_records = result.scalars().all()
+        snapshot = await progress_snapshots.get_agent_day(session, current_user.id, today)
         
-        total_morning = sum(p.morning_count for p in progress_records)
-        total_evening = sum(p.evening_count for p in progress_records)
+        total_morning = snapshot.morning_count if snapshot else 0
+        total_evening = snapshot.evening_count if snapshot else 0
         
         return {
             "date": today.isoformat(),
@@ -494,3 +663,27 @@ async def get_today_progress(
             "goal": 50,  # 25 morning + 25 evening
             "progress_percent": min(100, round((total_morning + total_evening) / 50 * 100))
         }
+
+
+@router.get("/agent/progress/history")
+async def get_progress_history(
+    days: int = Query(30, ge=1, le=366, description="Number of days to include"),
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """Get the current agent's daily totals for the last N days."""
+    async with AsyncSessionLocal() as session:
+        end = datetime.utcnow().date()
+        start = end - timedelta(days=days - 1)
+        snapshots = await progress_snapshots.get_agent_history(
+            session, current_user.id, start, end
+        )
+        return [
+            {
+                "date": s.date.isoformat(),
+                "morning_count": s.morning_count,
+                "evening_count": s.evening_count,
+                "total": s.total_count,
+                "streak": s.streak
+            }
+            for s in snapshots
+        ]
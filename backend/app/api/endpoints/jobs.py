@@ -0,0 +1,98 @@
+"""
+Background Job Endpoints
+
+Heavy admin operations return a job instead of their result; clients poll
+GET /jobs/{id} until the status is SUCCEEDED, FAILED or CANCELLED. On
+success the operation's payload is in `result`.
+"""
+
+import uuid
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.api.pagination import PagedParams
+from app.core.database import AsyncSessionLocal
+from app.models import User, Job
+from app.schemas import jobs as schemas
+from app.services.jobs import job_service
+
+router = APIRouter()
+
+
+async def enqueue_job(
+    session: AsyncSession,
+    current_user: User,
+    kind: str,
+    params: dict
+) -> Job:
+    """Queue a job for the user's tenant, mapping queue outages to 503."""
+    try:
+        return await job_service.enqueue(
+            session,
+            tenant_id=current_user.tenant_id,
+            kind=kind,
+            params=params,
+            created_by=current_user.id
+        )
+    except RedisError:
+        raise HTTPException(status_code=503, detail="Job queue unavailable, please retry")
+
+
+@router.get("", response_model=List[schemas.Job])
+async def list_jobs(
+    response: Response,
+    kind: Optional[str] = Query(None, description="Filter by job kind"),
+    page: PagedParams = Depends(),
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """The tenant's jobs, newest first."""
+    async with AsyncSessionLocal() as session:
+        query = select(Job).where(Job.tenant_id == current_user.tenant_id)
+        if kind:
+            query = query.where(Job.kind == kind)
+        query = page.apply(query, Job.created_at, Job.id)
+        result = await session.execute(query)
+        return page.finish(result.scalars().all(), response, key=lambda j: (j.created_at, j.id))
+
+
+@router.get("/metrics")
+async def get_job_metrics(
+    hours: int = Query(24, ge=1, le=24 * 30, description="Look-back window"),
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """Queue-wait statistics per job kind and the tenant's live queue state."""
+    async with AsyncSessionLocal() as session:
+        return await job_service.wait_metrics(session, current_user.tenant_id, hours)
+
+
+@router.get("/{job_id}", response_model=schemas.Job)
+async def get_job(
+    job_id: uuid.UUID,
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """Status, progress and (once finished) result of a job."""
+    async with AsyncSessionLocal() as session:
+        job = await job_service.get_job(session, job_id, current_user.tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=schemas.Job)
+async def cancel_job(
+    job_id: uuid.UUID,
+    current_user: User = Depends(deps.get_current_admin_user)
+):
+    """
+    Cancel a job. Queued jobs never start; running jobs stop at their next
+    progress checkpoint and roll back their uncommitted work.
+    """
+    async with AsyncSessionLocal() as session:
+        job = await job_service.cancel(session, job_id, current_user.tenant_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,25 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import func, update
-from typing import List, Any
+from typing import List, Any, Optional
 from app.api import deps
+from app.api.pagination import PageParams
 from app.core.database import get_db
 from app.models import whatsapp as models
 from app.models.tenant import User
 from app.schemas import whatsapp as schemas
-import pandas as pd
-import io
+from app.api.endpoints.jobs import enqueue_job
+from app.schemas.jobs import Job as JobSchema
+from app.services.contact_pool import contact_pool_service
+from app.services.export import export_service
+from app.services.job_handlers import WHATSAPP_UPLOAD
 import uuid
 import os
 from datetime import datetime
 
 router = APIRouter()
 
-STORAGE_DIR = "storage/vcf"
-os.makedirs(STORAGE_DIR, exist_ok=True)
-
-@router.post("/upload", response_model=schemas.WhatsappCampaign)
+@router.post("/upload", response_model=JobSchema, status_code=202)
 async def upload_campaign_file(
     file: UploadFile = File(...),
     name: str = Form(...),
@@ -30,71 +31,33 @@ async def upload_campaign_file(
     if not file.filename.endswith(('.xlsx', '.xls', '.csv')):
         raise HTTPException(400, "Invalid file format. Use CSV or Excel.")
 
-    contents = await file.read()
-    if file.filename.endswith('.csv'):
-        df = pd.read_csv(io.BytesIO(contents))
-    else:
-        df = pd.read_excel(io.BytesIO(contents))
-
-    possible_name_cols = [c for c in df.columns if 'name' in str(c).lower()]
-    possible_phone_cols = [c for c in df.columns if 'phone' in str(c).lower() or 'tel' in str(c).lower() or 'mobile' in str(c).lower()]
-    
-    if not possible_name_cols or not possible_phone_cols:
-         raise HTTPException(400, "Could not identify Name or Phone columns. Please use 'Name' and 'Phone' headers.")
-    
-    col_name = possible_name_cols[0]
-    col_phone = possible_phone_cols[0]
-
-    campaign = models.WhatsappCampaign(
-        name=name,
-        file_name=file.filename,
-        total_contacts=len(df)
-    )
-    db.add(campaign)
-    await db.commit()
-    await db.refresh(campaign)
-
-    # Split
-    total_rows = len(df)
-    for i in range(0, total_rows, batch_size):
-        chunk = df.iloc[i:i+batch_size]
-        vcf_content = ""
-        for _, row in chunk.iterrows():
-            c_name = str(row[col_name]).strip()
-            c_phone = str(row[col_phone]).strip()
-            vcf_content += f"BEGIN:VCARD\nVERSION:3.0\nFN:{c_name}\nTEL:{c_phone}\nEND:VCARD\n"
-        
-        batch_filename = f"{campaign.id}_batch_{i//batch_size}.vcf"
-        file_path = os.path.join(STORAGE_DIR, batch_filename)
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(vcf_content)
-            
-        batch = models.WhatsappBatch(
-            campaign_id=campaign.id,
-            status=models.WhatsappBatchStatus.PENDING.value,
-            vcf_file_path=file_path,
-            contact_count=len(chunk)
-        )
-        db.add(batch)
-    
-    await db.commit()
-    
-    # Reload with batches
-    result = await db.execute(select(models.WhatsappCampaign).where(models.WhatsappCampaign.id == campaign.id))
-    campaign = result.scalars().first()
-    # Force load batches (lazy loading might be issue in async without specific load options, but let's try)
-    # Actually explicit join or selectinload is better, but pydantic ignores missing lazy fields usually or errors.
-    # For now, let's return campaign. Batches might be empty list if not loaded.
-    return campaign
+    # Spool to disk; the import runs as a background job
+    file_path = await contact_pool_service.spool_upload(file.file, file.filename)
+    try:
+        return await enqueue_job(db, current_user, WHATSAPP_UPLOAD, {
+            "file_path": file_path,
+            "file_name": file.filename,
+            "name": name,
+            "batch_size": batch_size,
+        })
+    except BaseException:
+        os.remove(file_path)
+        raise
 
 @router.get("/my-batches", response_model=List[schemas.WhatsappBatch])
 async def read_my_batches(
+    response: Response,
+    batch_status: Optional[str] = Query(None, alias="status"),
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(deps.get_current_user),
 ):
-    result = await db.execute(select(models.WhatsappBatch).filter(models.WhatsappBatch.agent_id == current_user.id))
-    batches = result.scalars().all()
-    return batches
+    query = select(models.WhatsappBatch).filter(models.WhatsappBatch.agent_id == current_user.id)
+    if batch_status:
+        query = query.filter(models.WhatsappBatch.status == batch_status)
+    query = page.apply(query, models.WhatsappBatch.assigned_at, models.WhatsappBatch.id)
+    result = await db.execute(query)
+    return page.finish(result.scalars().all(), response, key=lambda b: (b.assigned_at, b.id))
 
 @router.post("/batches/{batch_id}/report", response_model=schemas.WhatsappDailyReport)
 async def create_report(
@@ -137,6 +100,7 @@ async def create_report(
     )
 
     await db.commit()
+    await export_service.invalidate_report(current_user.tenant_id)
     await db.refresh(report)
     return report
 
@@ -174,5 +138,6 @@ async def assign_batch(
     
     db.add(batch)
     await db.commit()
+    await export_service.invalidate_report(current_user.tenant_id)
     await db.refresh(batch)
     return batch
@@ -0,0 +1,116 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+List endpoints keep returning a plain JSON array so existing clients keep
+working: a request with neither `limit` nor `cursor` gets every row, as
+before pagination existed. Paged requests get the cursor for the next page
+in the X-Next-Cursor response header, which is absent on the last page.
+
+Each endpoint orders by a unique key (a sort column plus the primary key)
+backed by a composite index, so every page is an index range scan no matter
+how deep the client has paged.
+"""
+
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(value: Any, column) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor length mismatch")
+        return [_decode_value(v, c) for v, c in zip(values, columns)]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor") from e
+
+
+class PageParams:
+    """Dependency holding the cursor/limit query parameters."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+        limit: Optional[int] = Query(
+            None, ge=1, le=MAX_PAGE_SIZE,
+            description=f"Page size (default {DEFAULT_PAGE_SIZE} when paging; omit with cursor for all rows)"
+        ),
+    ):
+        self.cursor = cursor
+        # Unpaged (legacy) request: no limit and no cursor
+        self.paged = limit is not None or cursor is not None
+        self.limit = limit or DEFAULT_PAGE_SIZE
+        self._columns: Sequence = ()
+
+    def apply(self, query, *columns, descending: bool = True):
+        """
+        Order the query by the given key columns and seek past the cursor.
+        The last column must make the key unique (normally the primary key).
+        """
+        self._columns = columns
+        if self.cursor:
+            values = decode_cursor(self.cursor, columns)
+            key = tuple_(*columns)
+            query = query.where(key < tuple_(*values) if descending else key > tuple_(*values))
+        order = [c.desc() for c in columns] if descending else [c.asc() for c in columns]
+        query = query.order_by(*order)
+        if not self.paged:
+            return query
+        # Fetch one extra row to know whether another page exists
+        return query.limit(self.limit + 1)
+
+    def finish(self, items: Sequence, response: Response, key: Callable[[Any], Sequence[Any]]) -> List:
+        """Trim the look-ahead row and set the next-page cursor header."""
+        items = list(items)
+        if self.paged and len(items) > self.limit:
+            items = items[:self.limit]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(items[-1]))
+        return items
+
+
+class PagedParams(PageParams):
+    """PageParams for endpoints paged from the start: no unpaged fallback."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    ):
+        super().__init__(cursor=cursor, limit=limit)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -14,11 +14,47 @@ class Settings(BaseSettings):
     DATABASE_URL: Optional[str] = None
 
     REDIS_URL: str = "redis://localhost:6379/0"
+    REPORT_CACHE_TTL_SECONDS: int = 3600
     
     SECRET_KEY: str = "changethisforproduction_secret_key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Argon2 password hashing (runs off the event loop in a thread pool)
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 102400  # KiB
+    ARGON2_PARALLELISM: int = 8
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 8
+
+    # Worker processes for parsing uploaded contact files
+    UPLOAD_PARSE_WORKERS: int = 2
+    # Worker processes for rendering VCF files during multi-batch generation
+    VCF_RENDER_WORKERS: int = 2
+    # Render VCF downloads from the batch's contacts instead of storing files
+    # at generation time; rendered files are kept in a bounded disk cache
+    VCF_RENDER_ON_DEMAND: bool = False
+    VCF_CACHE_DIR: str = "storage/vcf_cache"
+    VCF_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    # Lifetime of the signed download URLs handed out with agent batch lists
+    VCF_DOWNLOAD_URL_TTL_SECONDS: int = 900
+    # Per-tenant Redis set of pool phones used to drop known duplicates early
+    PHONE_FILTER_ENABLED: bool = True
+
+    # Background job workers started inside the API process (0 = use run_job_worker.py only)
+    JOB_WORKERS: int = 2
+    # Fair scheduling: max running jobs per tenant, slot lease (renewed on
+    # every job heartbeat), and scheduling weight per tenant plan tier
+    # (higher weight = larger share of workers)
+    JOB_TENANT_CONCURRENCY: int = 1
+    JOB_LEASE_SECONDS: int = 300
+    JOB_PLAN_WEIGHTS: Dict[str, float] = {"BASIC": 1.0}
+    # Crash recovery: running jobs heartbeat every JOB_HEARTBEAT_SECONDS; one
+    # silent for JOB_STALE_SECONDS is re-queued, up to JOB_MAX_ATTEMPTS runs
+    JOB_HEARTBEAT_SECONDS: int = 30
+    JOB_STALE_SECONDS: int = 300
+    JOB_MAX_ATTEMPTS: int = 3
+
     model_config = SettingsConfigDict(env_file=".env", env_ignore_empty=True)
 
     def assemble_db_url(self):
@@ -0,0 +1,58 @@
+"""
+Query counting helpers.
+
+Used to guard endpoints against N+1 regressions:
+
+    with assert_max_queries(2):
+        await list_vcf_batches(...)
+
+Counting hooks the engine's cursor execution, so every statement sent to
+the database inside the block is counted, whichever session issued it.
+"""
+
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+
+from app.core.database import engine
+
+
+class QueryCounter:
+    """Collects the SQL statements executed while it is active."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(bind=None):
+    """Count statements executed on the engine while the block runs."""
+    target = bind or engine
+    # Async engines dispatch events through their sync counterpart
+    target = getattr(target, "sync_engine", target)
+    counter = QueryCounter()
+    event.listen(target, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(target, "before_cursor_execute", counter._on_execute)
+
+
+@contextmanager
+def assert_max_queries(limit: int, bind=None):
+    """Fail with the offending statements if more than `limit` queries run."""
+    with count_queries(bind) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(counter.statements))
+        raise AssertionError(
+            f"Expected at most {limit} queries, {counter.count} were executed:\n{listing}"
+        )
@@ -1,19 +1,64 @@
+import asyncio
+import hashlib
+import hmac
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 
 ALGORITHM = "HS256"
 
+# Argon2 is CPU and memory heavy (tens of ms per call). argon2-cffi releases
+# the GIL, so a small thread pool keeps the event loop free for redirects.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="argon2",
+)
+_hash_semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+
+
+class HashingMetrics:
+    """In-process counters for the password hashing pool."""
+
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.total_queue_ms = 0.0
+        self.max_queue_ms = 0.0
+        self.total_run_ms = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "avg_queue_ms": round(self.total_queue_ms / self.calls, 2) if self.calls else 0,
+            "max_queue_ms": round(self.max_queue_ms, 2),
+            "avg_run_ms": round(self.total_run_ms / self.calls, 2) if self.calls else 0,
+        }
+
+
+hashing_metrics = HashingMetrics()
+
+
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
+
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -23,3 +68,63 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+async def _run_in_hash_pool(func, *args):
+    """Run a hashing call in the Argon2 pool, capped by the semaphore."""
+    queued_at = time.perf_counter()
+    hashing_metrics.waiting += 1
+    acquired = False
+    try:
+        async with _hash_semaphore:
+            acquired = True
+            hashing_metrics.waiting -= 1
+            started_at = time.perf_counter()
+            queue_ms = (started_at - queued_at) * 1000
+            hashing_metrics.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(_hash_executor, func, *args)
+            finally:
+                hashing_metrics.in_flight -= 1
+                hashing_metrics.calls += 1
+                hashing_metrics.total_queue_ms += queue_ms
+                hashing_metrics.max_queue_ms = max(hashing_metrics.max_queue_ms, queue_ms)
+                hashing_metrics.total_run_ms += (time.perf_counter() - started_at) * 1000
+    finally:
+        if not acquired:
+            # Cancelled while still queued
+            hashing_metrics.waiting -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Non-blocking verify_password for use inside request handlers."""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Non-blocking get_password_hash for use inside request handlers."""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+def _download_signature(batch_id: str, file_name: str, expires: int) -> str:
+    # Domain-separated from JWTs signed with the same key
+    message = f"vcf-download|{batch_id}|{file_name}|{expires}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign_download(batch_id: str, file_name: str, ttl_seconds: int) -> dict:
+    """Query parameters of a short-lived signed VCF download URL."""
+    expires = int(time.time()) + ttl_seconds
+    return {
+        "name": file_name,
+        "expires": expires,
+        "sig": _download_signature(batch_id, file_name, expires),
+    }
+
+
+def verify_download(batch_id: str, file_name: str, expires: int, sig: str) -> bool:
+    """Check a signed download URL without any lookup (constant time)."""
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(_download_signature(batch_id, file_name, expires), sig)
@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.endpoints import redirect
 from app.core.config import settings
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.services.jobs import job_workers
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
@@ -13,11 +15,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 @app.on_event("startup")
 async def startup_event():
     print("Starting up with CORS policy: allow_origin_regex='.*' (ALL ORIGINS ALLOWED)")
+    if settings.JOB_WORKERS > 0:
+        job_workers.start(settings.JOB_WORKERS)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await job_workers.stop()
 
 # Include the Redirect Router (root level for short links)
 app.include_router(redirect.router, tags=["redirect"])
@@ -37,6 +46,10 @@ app.include_router(contacts.router, prefix="/api/v1/contacts", tags=["contacts"]
 from app.api.endpoints import campaigns
 app.include_router(campaigns.router, prefix="/api/v1/campaigns", tags=["campaigns"])
 
+# Background jobs (uploads, VCF generation)
+from app.api.endpoints import jobs
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
+
 # Placeholder for API V1
 # app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -2,5 +2,6 @@ from app.models.tenant import Tenant, User, UserRole
 from app.models.campaign import Campaign, CampaignTarget, Assignment, CampaignStatus, TargetType, AssignmentStatus
 from app.models.analytics import TrackingLink, AnalyticsEvent
 from app.models.whatsapp import WhatsappCampaign, WhatsappBatch, WhatsappDailyReport, WhatsappBatchStatus
-from app.models.contacts import ContactPool, VcfBatch, VcfBatchStatus, AgentProgress
+from app.models.contacts import ContactPool, VcfBatch, VcfBatchStatus, AgentProgress, AgentDailySnapshot, ContactPoolStats, VcfSerialCounter, ProgressSyncKey
 
+from app.models.jobs import Job, JobStatus
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Enum, Float, JSON
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Enum, Float, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.database import Base
@@ -50,6 +50,11 @@ class Campaign(Base):
     assignments = relationship("Assignment", back_populates="campaign")
     tracking_links = relationship("TrackingLink", back_populates="campaign")
 
+    # Keyset pagination (newest first per tenant)
+    __table_args__ = (
+        Index('ix_campaigns_tenant_created', 'tenant_id', 'created_at', 'id'),
+    )
+
 class CampaignTarget(Base):
     __tablename__ = "campaign_targets"
 
@@ -74,3 +79,8 @@ class Assignment(Base):
 
     agent = relationship("User", back_populates="assignments")
     campaign = relationship("Campaign", back_populates="assignments")
+
+    # Keyset pagination of the admin review queue
+    __table_args__ = (
+        Index('ix_assignments_status_created', 'status', 'created_at', 'id'),
+    )
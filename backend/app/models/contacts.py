@@ -5,13 +5,17 @@ These models support the contact distribution system:
 - ContactPool: Raw contacts from Excel uploads
 - VcfBatch: Generated VCF files assigned to agents
 - AgentProgress: Track daily work (morning/evening sessions)
+- AgentDailySnapshot: Per-agent daily rollup of AgentProgress
+- ContactPoolStats: Maintained per-tenant pool counters
+- ProgressSyncKey: Idempotency keys of bulk (offline) progress syncs
 """
 
 import uuid
 from datetime import datetime, date
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Date, Text
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Boolean, ForeignKey, Date, Text, Index, UniqueConstraint, JSON
+from sqlalchemy import text
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from app.core.database import Base
 import enum
 
@@ -21,6 +25,7 @@ class VcfBatchStatus(str, enum.Enum):
     ASSIGNED = "ASSIGNED"     # Assigned to an agent
     IN_PROGRESS = "IN_PROGRESS"  # Agent started working
     COMPLETED = "COMPLETED"   # All contacts reported as added
+    RECLAIMED = "RECLAIMED"   # Went stale; un-worked contacts returned to the pool
 
 
 class ContactPool(Base):
@@ -44,6 +49,14 @@ class ContactPool(Base):
     # Relationships
     tenant = relationship("Tenant")
     vcf_batch = relationship("VcfBatch", back_populates="contacts")
+    
+    # One pool entry per phone per tenant (upload dedupe via ON CONFLICT);
+    # oldest-first claiming of unassigned contacts
+    __table_args__ = (
+        Index('uq_contact_pool_tenant_phone', 'tenant_id', 'phone', unique=True),
+        Index('ix_contact_pool_unassigned', 'tenant_id', 'uploaded_at',
+              postgresql_where=text('NOT is_assigned')),
+    )
 
 
 class VcfBatch(Base):
@@ -81,6 +94,13 @@ class VcfBatch(Base):
     agent = relationship("User", back_populates="vcf_batches")
     contacts = relationship("ContactPool", back_populates="vcf_batch")
     progress_reports = relationship("AgentProgress", back_populates="vcf_batch")
+    
+    # Keyset pagination (admin list by tenant, agent list by assignment time)
+    __table_args__ = (
+        Index('ix_vcf_batches_tenant_created', 'tenant_id', 'created_at', 'id'),
+        Index('ix_vcf_batches_tenant_status_created', 'tenant_id', 'status', 'created_at', 'id'),
+        Index('ix_vcf_batches_agent_assigned', 'agent_id', 'assigned_at', 'id'),
+    )
 
 
 class AgentProgress(Base):
@@ -107,3 +127,74 @@ class AgentProgress(Base):
     # Relationships
     agent = relationship("User", back_populates="progress_reports")
     vcf_batch = relationship("VcfBatch", back_populates="progress_reports")
+    
+    # One row per agent, batch and day (upsert target); per-agent aggregation
+    __table_args__ = (
+        UniqueConstraint('agent_id', 'vcf_batch_id', 'date', name='uq_agent_progress_agent_batch_date'),
+        Index('ix_agent_progress_agent_date', 'agent_id', 'date'),
+    )
+
+
+class AgentDailySnapshot(Base):
+    """
+    One row per agent per day, rolled up from AgentProgress.
+    Upserted by progress reports and repaired by the nightly compaction job,
+    so history/trend views are a single index range scan.
+    """
+    __tablename__ = "agent_daily_snapshots"
+
+    agent_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    
+    morning_count = Column(Integer, nullable=False, default=0)
+    evening_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    streak = Column(Integer, nullable=False, default=1)  # Consecutive active days ending here
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_agent_daily_snapshots_tenant_date', 'tenant_id', 'date'),
+    )
+
+
+class ContactPoolStats(Base):
+    """
+    Maintained per-tenant contact pool counters: totals, assigned count and
+    contacts per source file. Updated in the same transaction as uploads and
+    batch generation; a recount job repairs any drift.
+    """
+    __tablename__ = "contact_pool_stats"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), primary_key=True)
+    total_contacts = Column(BigInteger, nullable=False, default=0)
+    assigned = Column(BigInteger, nullable=False, default=0)
+    sources = Column(JSONB, nullable=False, default=dict)  # {source_file: count}, "" = no file
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    recounted_at = Column(DateTime, nullable=True)
+
+
+class VcfSerialCounter(Base):
+    """
+    Next free VCF serial number of a tenant. Generation reserves its serial
+    range here inside its own transaction, so ranges never overlap across
+    runs and a rolled-back run leaves no gap.
+    """
+    __tablename__ = "vcf_serial_counters"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), primary_key=True)
+    next_serial = Column(BigInteger, nullable=False, default=1)
+
+
+class ProgressSyncKey(Base):
+    """
+    Idempotency key of a progress report applied through the bulk sync
+    endpoint. Retried items return the stored result instead of being
+    applied twice.
+    """
+    __tablename__ = "progress_sync_keys"
+
+    agent_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    idempotency_key = Column(String, primary_key=True)
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,60 @@
+"""
+Background Job Model
+
+Long-running admin operations (contact uploads, VCF generation, WhatsApp
+imports) are recorded here and executed by the job worker:
+- status moves QUEUED -> RUNNING -> SUCCEEDED / FAILED / CANCELLED
+- progress is a 0-100 percentage updated by the handler
+- result holds the handler's JSON payload once it succeeds
+- heartbeat_at is refreshed while a worker runs the job; the reaper re-queues
+  RUNNING jobs whose heartbeat stopped and QUEUED jobs lost from Redis
+"""
+
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Text, Index, JSON, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class Job(Base):
+    """A queued or executed background operation."""
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+
+    kind = Column(String, nullable=False)  # Handler name, e.g. "contacts_upload"
+    status = Column(String, default=JobStatus.QUEUED.value, nullable=False)
+    progress = Column(Integer, default=0, nullable=False)
+    params = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, default=False, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)  # Runs started so far
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    queued_at = Column(DateTime, default=datetime.utcnow)  # Last (re-)queued
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Keyset pagination of a tenant's jobs
+        Index('ix_jobs_tenant_created', 'tenant_id', 'created_at', 'id'),
+        # Reaper scans of unfinished jobs
+        Index(
+            'ix_jobs_unfinished', 'status',
+            postgresql_where=text("status IN ('QUEUED', 'RUNNING')")
+        ),
+    )
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Enum, Float
+from sqlalchemy import Column, String, Integer, DateTime, Date, Boolean, ForeignKey, Enum, Float, Index, true
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.database import Base
@@ -33,11 +33,17 @@ class User(Base):
     wallet_balance = Column(Float, default=0.0)
     hashed_password = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Deactivated users cannot sign in and get no rebalanced batches
+    is_active = Column(Boolean, default=True, server_default=true(), nullable=False)
     
     # Activity tracking (for inactivity alerts)
     last_activity_at = Column(DateTime, default=datetime.utcnow)
     tutorial_completed = Column(Boolean, default=False)
     notification_token = Column(String, nullable=True)  # For push notifications
+    
+    # Consecutive days with progress reports, ending on streak_last_date
+    streak_days = Column(Integer, default=0)
+    streak_last_date = Column(Date, nullable=True)
 
     tenant = relationship("Tenant", back_populates="users")
     assignments = relationship("Assignment", back_populates="agent")
@@ -47,3 +53,10 @@ class User(Base):
     vcf_batches = relationship("VcfBatch", back_populates="agent")
     progress_reports = relationship("AgentProgress", back_populates="agent")
 
+    # Keyset pagination of agent lists (by name)
+    __table_args__ = (
+        Index('ix_users_tenant_role_name', 'tenant_id', 'role', 'name', 'id'),
+        # Inactivity threshold filter in the agent status report
+        Index('ix_users_tenant_last_activity', 'tenant_id', 'last_activity_at'),
+    )
+
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.database import Base
@@ -47,6 +47,11 @@ class WhatsappBatch(Base):
     agent = relationship("app.models.tenant.User")
     daily_reports = relationship("WhatsappDailyReport", back_populates="batch")
 
+    # Keyset pagination of an agent's batches
+    __table_args__ = (
+        Index('ix_whatsapp_batches_agent_assigned', 'agent_id', 'assigned_at', 'id'),
+    )
+
 class WhatsappDailyReport(Base):
     __tablename__ = "whatsapp_daily_reports"
 
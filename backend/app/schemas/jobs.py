@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+from datetime import datetime
+from uuid import UUID
+
+class Job(BaseModel):
+    id: UUID
+    kind: str
+    status: str
+    progress: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,200 @@
+"""
+Stale Batch Reclamation
+
+Keeps contacts flowing when agents stop working their VCF batches. A batch
+is stale when it has been ASSIGNED/IN_PROGRESS for at least N days with no
+AgentProgress report in that window. Everything is set-based SQL, one
+statement per step, however many batches are stale:
+- return: the batch keeps the contacts its agent reported as added (the
+  first ones in file order); the rest go back to the pool and the batch is
+  closed as RECLAIMED. Its stored file is rewritten to the kept contacts
+  (or removed), so nothing that went back to the pool can still be
+  downloaded from it. The new file is rendered before the commit and
+  swapped in right after it, so a failed render rolls the reclaim back
+  instead of leaving a stale file
+- rebalance: untouched stale batches (nothing reported) move whole to
+  active agents with recent throughput, spread in proportion to each
+  agent's contacts added over the last days; agents holding stale batches
+  and deactivated agents get none.
+  Partially worked batches, and everything when no agent is active, are
+  returned as above
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.contacts import VcfBatchStatus
+from app.models.tenant import UserRole
+from app.services.pool_counters import pool_counters
+from app.services.vcf_generator import vcf_generator
+
+RECLAIM_RETURN = "return"
+RECLAIM_REBALANCE = "rebalance"
+
+# Stale batches of a tenant with the number of contacts reported as added.
+# Locked rows (e.g. being assigned right now) are left for the next run.
+_STALE_SQL = """
+    stale AS (
+        SELECT b.id, b.agent_id,
+               least(coalesce(b.contact_count, 0), coalesce((
+                   SELECT sum(coalesce(p.morning_count, 0) + coalesce(p.evening_count, 0))
+                   FROM agent_progress p
+                   WHERE p.agent_id = b.agent_id AND p.vcf_batch_id = b.id
+               ), 0)) AS worked
+        FROM vcf_batches b
+        WHERE b.tenant_id = :tenant_id
+          AND b.status IN (:assigned, :in_progress)
+          AND b.agent_id IS NOT NULL
+          AND b.assigned_at < :cutoff
+          AND NOT EXISTS (
+              SELECT 1 FROM agent_progress p
+              WHERE p.agent_id = b.agent_id AND p.vcf_batch_id = b.id AND p.date >= :since
+          )
+        FOR UPDATE OF b SKIP LOCKED
+    )
+"""
+
+_REBALANCE_SQL = f"""
+    WITH {_STALE_SQL},
+    untouched AS (
+        SELECT id, row_number() OVER (ORDER BY id) AS n, count(*) OVER () AS m
+        FROM stale
+        WHERE worked = 0
+    ),
+    throughput AS (
+        SELECT s.agent_id, sum(s.total_count)::float8 AS weight
+        FROM agent_daily_snapshots s
+        JOIN users u ON u.id = s.agent_id
+        WHERE s.tenant_id = :tenant_id
+          AND s.date >= :throughput_since
+          AND u.role = :agent_role
+          AND u.is_active
+          AND s.agent_id NOT IN (SELECT agent_id FROM stale)
+        GROUP BY s.agent_id
+        HAVING sum(s.total_count) > 0
+    ),
+    ranges AS (
+        SELECT agent_id,
+               sum(weight) OVER (ORDER BY agent_id) - weight AS lo,
+               sum(weight) OVER (ORDER BY agent_id) AS hi,
+               sum(weight) OVER () AS total
+        FROM throughput
+    ),
+    targets AS (
+        -- Batch n of m lands where (n - 0.5) / m falls on the cumulative weights
+        SELECT u.id, r.agent_id
+        FROM untouched u
+        JOIN ranges r
+          ON (u.n - 0.5)::float8 / u.m * r.total >= r.lo
+         AND (u.n - 0.5)::float8 / u.m * r.total < r.hi
+    ),
+    moved AS (
+        UPDATE vcf_batches b
+        SET agent_id = t.agent_id, status = :assigned, assigned_at = :now
+        FROM targets t
+        WHERE b.id = t.id
+        RETURNING b.agent_id
+    )
+    SELECT agent_id, count(*) FROM moved GROUP BY agent_id
+"""
+
+_RETURN_SQL = f"""
+    WITH {_STALE_SQL},
+    ranked AS (
+        SELECT c.id, c.vcf_batch_id,
+               row_number() OVER (PARTITION BY c.vcf_batch_id ORDER BY c.uploaded_at, c.id) AS n
+        FROM contact_pool c
+        JOIN stale s ON c.vcf_batch_id = s.id
+    ),
+    released AS (
+        UPDATE contact_pool c
+        SET is_assigned = false, vcf_batch_id = NULL
+        FROM ranked r
+        JOIN stale s ON s.id = r.vcf_batch_id
+        WHERE c.id = r.id AND r.n > s.worked
+        RETURNING 1
+    ),
+    closed AS (
+        UPDATE vcf_batches b
+        SET status = :reclaimed, contact_count = s.worked, completed_at = :now
+        FROM stale s
+        WHERE b.id = s.id
+        RETURNING b.id
+    )
+    SELECT (SELECT array_agg(id) FROM closed), (SELECT count(*) FROM released)
+"""
+
+
+class BatchReclaimService:
+    """Service for reclaiming and rebalancing stale VCF batches."""
+
+    async def reclaim_stale(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        stale_days: int = 3,
+        mode: str = RECLAIM_RETURN,
+        throughput_days: int = 7
+    ) -> dict:
+        """
+        Reclaim a tenant's stale batches and commit.
+
+        Args:
+            stale_days: Days without progress (and since assignment) that make a batch stale
+            mode: RECLAIM_RETURN or RECLAIM_REBALANCE
+            throughput_days: Window for the agent throughput used as rebalancing weight
+        """
+        now = datetime.utcnow()
+        # Progress and snapshot dates are UTC days
+        today = now.date()
+        params = {
+            "tenant_id": tenant_id,
+            "assigned": VcfBatchStatus.ASSIGNED.value,
+            "in_progress": VcfBatchStatus.IN_PROGRESS.value,
+            "reclaimed": VcfBatchStatus.RECLAIMED.value,
+            "cutoff": now - timedelta(days=stale_days),
+            "since": today - timedelta(days=stale_days),
+            "now": now,
+        }
+
+        moved_to: Dict[str, int] = {}
+        if mode == RECLAIM_REBALANCE:
+            result = await session.execute(text(_REBALANCE_SQL), {
+                **params,
+                "throughput_since": today - timedelta(days=throughput_days),
+                "agent_role": UserRole.AGENT.value,
+            })
+            moved_to = {str(agent_id): count for agent_id, count in result.all()}
+
+        # Moved batches were just re-assigned, so only the rest is still stale
+        result = await session.execute(text(_RETURN_SQL), params)
+        reclaimed_ids, returned = result.one()
+        reclaimed_ids = reclaimed_ids or []
+
+        # Returned contacts may be claimed into new batches as soon as this
+        # commits, so the old files must stop listing them by then
+        staged = await vcf_generator.stage_batch_files(session, reclaimed_ids) if reclaimed_ids else []
+        try:
+            # Returned contacts are unassigned again
+            await pool_counters.record_assigned(session, tenant_id, -returned)
+            await session.commit()
+        except BaseException:
+            vcf_generator.discard_batch_files(staged)
+            raise
+        vcf_generator.swap_batch_files(staged)
+
+        return {
+            "mode": mode,
+            "stale_days": stale_days,
+            "moved_batches": sum(moved_to.values()),
+            "moved_to": moved_to,
+            "reclaimed_batches": len(reclaimed_ids),
+            "returned_contacts": returned,
+        }
+
+
+# Singleton instance
+batch_reclaim = BatchReclaimService()
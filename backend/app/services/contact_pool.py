@@ -1,26 +1,240 @@
 """
 Contact Pool Service
 
-Handles Excel file parsing and contact pool management.
-Supports .xlsx and .xls files with phone numbers.
+Handles contact file parsing and contact pool management.
+Supports Excel (.xlsx/.xls), delimited text (.csv/.tsv/.txt) and vCard
+(.vcf) files with phone numbers; text files may be gzip-compressed.
+
+Uploads are spooled to disk and parsed in a worker process - openpyxl in
+read-only (streaming) mode for workbooks, the csv module row by row for text
+files, the streaming vCard parser card by card - so neither the event loop
+nor memory scales with the size of the file. Normalized phones come back in fixed-size chunks.
 """
 
+import asyncio
+import csv
+import gzip
+import io
+import itertools
 import os
+import shutil
+import tempfile
 import uuid
-import re
+import openpyxl
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing
 from datetime import datetime
-from typing import List, Optional, Tuple
-from io import BytesIO
-from sqlalchemy import select, func
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from redis.exceptions import RedisError
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.models.contacts import ContactPool
+from app.services.phone_filter import phone_filter
+from app.services.pool_counters import pool_counters, NO_SOURCE
+from app.services.phones import clean_phone_number, normalize_phone, REJECT_EMPTY
+from app.services.vcard import parse_vcards
+
+HEADER_VALUES = {'phone', 'phone number', 'טלפון', 'מספר', 'number', 'mobile'}
+# Header substrings identifying the phone column of a delimited file
+PHONE_HEADER_HINTS = ('phone', 'tel', 'mobile', 'טלפון', 'נייד')
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+DELIMITED_EXTENSIONS = ('.csv', '.tsv', '.txt', '.csv.gz', '.tsv.gz', '.txt.gz')
+VCARD_EXTENSIONS = ('.vcf', '.vcard', '.vcf.gz')
+INVALID_SAMPLE_SIZE = 10
+# Rows examined to detect the phone column when a file has no usable header
+COLUMN_SAMPLE_ROWS = 1000
+SNIFF_BYTES = 64 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+# Per-upload temp table the parsed phones are COPYed into
+STAGING_TABLE = "contact_pool_staging"
+
+_parse_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_parse_executor() -> ProcessPoolExecutor:
+    # Created lazily so importing the app does not fork workers
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ProcessPoolExecutor(max_workers=settings.UPLOAD_PARSE_WORKERS)
+    return _parse_executor
+
+
+class _PhoneChunkWriter:
+    """
+    Parse-worker accumulator: normalizes raw cells and writes the phones to
+    newline-delimited chunk files. Phones are deduplicated within a chunk
+    only; repeats across chunks are left to the database (see
+    upload_contacts), so worker memory is bounded by the chunk size.
+    """
+    
+    def __init__(self, chunk_dir: str, chunk_size: int):
+        self.chunk_dir = chunk_dir
+        self.chunk_size = chunk_size
+        self.valid_rows = 0
+        self.chunk_paths: List[str] = []
+        self.chunk: List[str] = []
+        self.chunk_seen = set()
+        self.total_rows = 0
+        self.invalid_count = 0
+        self.invalid_samples: List[str] = []
+        self.invalid_reasons: Dict[str, int] = {}
+    
+    def add(self, raw_value: str) -> None:
+        self.total_rows += 1
+        
+        # Skip obvious header cells
+        if raw_value.lower() in HEADER_VALUES:
+            return
+        
+        phone, reason = normalize_phone(raw_value)
+        if phone is None:
+            # Only track non-empty invalid entries
+            if reason != REJECT_EMPTY:
+                self.invalid_count += 1
+                self.invalid_reasons[reason] = self.invalid_reasons.get(reason, 0) + 1
+                if len(self.invalid_samples) < INVALID_SAMPLE_SIZE:
+                    self.invalid_samples.append(raw_value)
+            return
+        
+        self.valid_rows += 1
+        if phone in self.chunk_seen:  # Repeat within this chunk
+            return
+        self.chunk_seen.add(phone)
+        self.chunk.append(phone)
+        if len(self.chunk) >= self.chunk_size:
+            self._flush()
+    
+    def _flush(self) -> None:
+        path = os.path.join(self.chunk_dir, f"chunk_{len(self.chunk_paths):06d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.chunk))
+        self.chunk_paths.append(path)
+        self.chunk.clear()
+        self.chunk_seen.clear()
+    
+    def finish(self) -> dict:
+        if self.chunk:
+            self._flush()
+        
+        return {
+            "chunk_paths": self.chunk_paths,
+            "total_rows": self.total_rows,
+            "valid_rows": self.valid_rows,
+            "invalid_entries": self.invalid_count,
+            "invalid_samples": self.invalid_samples,
+            "invalid_reasons": self.invalid_reasons,
+        }
+
+
+def _parse_excel_to_chunks(file_path: str, chunk_dir: str, chunk_size: int) -> dict:
+    """
+    Worker-process entry point: stream every cell of every sheet through a
+    _PhoneChunkWriter.
+    """
+    writer = _PhoneChunkWriter(chunk_dir, chunk_size)
+    
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            for row in sheet.iter_rows(values_only=True):
+                for value in row:
+                    if value is not None:
+                        writer.add(str(value))
+    finally:
+        workbook.close()
+    
+    return writer.finish()
+
+
+def _open_text(file_path: str) -> io.TextIOBase:
+    """Open a delimited file as text, transparently un-gzipping it."""
+    with open(file_path, "rb") as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    raw = gzip.open(file_path, "rb") if compressed else open(file_path, "rb")
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+
+
+def _detect_delimiter(file_path: str, file_name: str) -> str:
+    if file_name.lower().endswith(('.tsv', '.tsv.gz')):
+        return "\t"
+    with _open_text(file_path) as f:
+        sample = f.read(SNIFF_BYTES)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
+
+def _detect_phone_column(head: List[List[str]]) -> Tuple[int, bool]:
+    """
+    Pick the phone column from the first rows of a file.
+    Returns (column index, whether the first row is a header).
+    """
+    if not head:
+        return 0, False
+    
+    # A header naming the column, as the WhatsApp uploader expects
+    for index, cell in enumerate(head[0]):
+        label = cell.strip().lower()
+        if label in HEADER_VALUES or any(hint in label for hint in PHONE_HEADER_HINTS):
+            return index, True
+    
+    # Otherwise the column with the most valid phones in the sample
+    width = max(len(row) for row in head)
+    best_index, best_valid = 0, -1
+    for index in range(width):
+        column = [row[index] if index < len(row) else None for row in head]
+        valid = sum(1 for value in column if normalize_phone(value)[0])
+        if valid > best_valid:
+            best_index, best_valid = index, valid
+    return best_index, False
+
+
+def _parse_delimited_to_chunks(file_path: str, file_name: str, chunk_dir: str, chunk_size: int) -> dict:
+    """
+    Worker-process entry point: read a CSV/TSV file (optionally gzipped)
+    row by row and feed its phone column through a _PhoneChunkWriter.
+    """
+    writer = _PhoneChunkWriter(chunk_dir, chunk_size)
+    csv.field_size_limit(1024 * 1024)
+    delimiter = _detect_delimiter(file_path, file_name)
+    
+    with _open_text(file_path) as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        head = list(itertools.islice(reader, COLUMN_SAMPLE_ROWS))
+        column, has_header = _detect_phone_column(head)
+        
+        for row in itertools.chain(head[1:] if has_header else head, reader):
+            if column < len(row) and row[column]:
+                writer.add(row[column])
+    
+    return writer.finish()
+
+
+def _parse_vcard_to_chunks(file_path: str, chunk_dir: str, chunk_size: int) -> dict:
+    """
+    Worker-process entry point: stream the cards of a vCard file (optionally
+    gzipped) and feed every phone through a _PhoneChunkWriter.
+    """
+    writer = _PhoneChunkWriter(chunk_dir, chunk_size)
+    
+    with _open_text(file_path) as f:
+        for card in parse_vcards(f):
+            for tel in card.tels:
+                writer.add(tel)
+    
+    return writer.finish()
 
 
 class ContactPoolService:
-    """Service for managing contact pool from Excel uploads."""
+    """Service for managing contact pool from Excel, CSV and vCard uploads."""
+    
+    SUPPORTED_EXTENSIONS = EXCEL_EXTENSIONS + DELIMITED_EXTENSIONS + VCARD_EXTENSIONS
     
     UPLOAD_PATH = "storage/uploads"
+    CHUNK_SIZE = 10000
     
     def __init__(self):
         os.makedirs(self.UPLOAD_PATH, exist_ok=True)
@@ -30,182 +244,241 @@ class ContactPoolService:
         Clean and validate phone number.
         Returns None if invalid.
         """
-        if not phone:
-            return None
-        
-        # Convert to string and strip
-        phone = str(phone).strip()
+        return clean_phone_number(phone)
+    
+    async def spool_upload(self, file_obj, file_name: str) -> str:
+        """
+        Copy an upload stream to a temporary file under UPLOAD_PATH without
+        blocking the event loop. Caller removes the file when done.
+        """
+        suffix = os.path.splitext(file_name)[1]
+        fd, path = tempfile.mkstemp(prefix="upload_", suffix=suffix, dir=self.UPLOAD_PATH)
         
-        # Remove common formatting characters
-        phone = re.sub(r'[\s\-\(\)\.]', '', phone)
+        def copy():
+            with os.fdopen(fd, "wb") as dst:
+                shutil.copyfileobj(file_obj, dst, 1024 * 1024)
         
-        # Remove any non-digit characters except leading +
-        if phone.startswith('+'):
-            phone = '+' + re.sub(r'[^\d]', '', phone[1:])
-        else:
-            phone = re.sub(r'[^\d]', '', phone)
-        
-        # Validate length (minimum 7 digits for valid phone)
-        digits_only = re.sub(r'[^\d]', '', phone)
-        if len(digits_only) < 7 or len(digits_only) > 15:
-            return None
-        
-        # Normalize Israeli numbers
-        if phone.startswith('0') and len(phone) == 10:
-            # Israeli format: 0501234567 -> +972501234567
-            phone = '+972' + phone[1:]
-        elif phone.startswith('972'):
-            phone = '+' + phone
-        elif not phone.startswith('+'):
-            # Assume Israeli if no country code
-            if len(phone) == 9:  # Missing leading 0
-                phone = '+972' + phone
-            else:
-                phone = '+' + phone
-        
-        return phone
+        try:
+            await asyncio.to_thread(copy)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path
+    
+    def is_excel(self, file_name: str) -> bool:
+        return file_name.lower().endswith(EXCEL_EXTENSIONS)
     
-    async def parse_excel_file(
+    def is_vcard(self, file_name: str) -> bool:
+        return file_name.lower().endswith(VCARD_EXTENSIONS)
+    
+    async def parse_contacts_file(
         self,
-        file_content: bytes,
-        file_name: str
-    ) -> Tuple[List[str], List[str], int]:
+        file_path: str,
+        file_name: str,
+        stats: dict
+    ) -> AsyncIterator[List[str]]:
         """
-        Parse Excel file and extract phone numbers.
+        Parse an Excel, delimited or vCard file and yield normalized phones in
+        chunks of CHUNK_SIZE, unique within a chunk (a phone may repeat across
+        chunks).
         
         Args:
-            file_content: Raw file bytes
-            file_name: Original filename
-        
-        Returns:
-            Tuple of (valid_phones, invalid_entries, total_rows)
+            file_path: Spooled upload on disk
+            file_name: Original file name (selects the parser)
+            stats: Filled with total_rows, valid_rows, invalid_entries,
+                invalid_samples and chunk_count once parsing has finished
         """
+        chunk_dir = tempfile.mkdtemp(prefix="chunks_", dir=self.UPLOAD_PATH)
         try:
-            import openpyxl
-        except ImportError:
-            raise ImportError("openpyxl is required. Install with: pip install openpyxl")
-        
-        valid_phones = []
-        invalid_entries = []
-        
-        # Load workbook from bytes
-        workbook = openpyxl.load_workbook(BytesIO(file_content), data_only=True)
-        sheet = workbook.active
-        
-        total_rows = 0
-        
-        for row in sheet.iter_rows(min_row=1):  # Start from row 1 (handle header if exists)
-            for cell in row:
-                if cell.value is None:
-                    continue
-                
-                total_rows += 1
-                raw_value = str(cell.value)
-                
-                # Skip obvious header cells
-                if raw_value.lower() in ['phone', 'phone number', 'טלפון', 'מספר', 'number', 'mobile']:
-                    continue
-                
-                cleaned = self.clean_phone_number(raw_value)
-                if cleaned:
-                    if cleaned not in valid_phones:  # Deduplicate
-                        valid_phones.append(cleaned)
-                else:
-                    if raw_value.strip():  # Only track non-empty invalid entries
-                        invalid_entries.append(raw_value)
-        
-        return valid_phones, invalid_entries, total_rows
+            loop = asyncio.get_running_loop()
+            if self.is_excel(file_name):
+                result = await loop.run_in_executor(
+                    _get_parse_executor(), _parse_excel_to_chunks,
+                    file_path, chunk_dir, self.CHUNK_SIZE
+                )
+            elif self.is_vcard(file_name):
+                result = await loop.run_in_executor(
+                    _get_parse_executor(), _parse_vcard_to_chunks,
+                    file_path, chunk_dir, self.CHUNK_SIZE
+                )
+            else:
+                result = await loop.run_in_executor(
+                    _get_parse_executor(), _parse_delimited_to_chunks,
+                    file_path, file_name, chunk_dir, self.CHUNK_SIZE
+                )
+            stats.update({k: v for k, v in result.items() if k != "chunk_paths"})
+            stats["chunk_count"] = len(result["chunk_paths"])
+            
+            for chunk_path in result["chunk_paths"]:
+                with open(chunk_path, encoding="utf-8") as f:
+                    phones = f.read().split("\n")
+                os.remove(chunk_path)
+                yield phones
+        finally:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+    
+    async def _copy_to_staging(
+        self,
+        session: AsyncSession,
+        records: List[Tuple[uuid.UUID, str]]
+    ) -> None:
+        """COPY (id, phone) records into the transaction's staging table."""
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            STAGING_TABLE, records=records, columns=["id", "phone"]
+        )
     
     async def upload_contacts(
         self,
         session: AsyncSession,
         tenant_id: uuid.UUID,
-        file_content: bytes,
-        file_name: str
+        file_path: str,
+        file_name: str,
+        on_progress: Optional[Callable[[float], Awaitable[None]]] = None
     ) -> dict:
         """
-        Upload contacts from Excel file to the pool.
+        Upload contacts from a spooled Excel or CSV/TSV file to the pool.
+        on_progress, if given, is awaited with the fraction done (0-1).
+        
+        Phones already in the tenant's presence filter are counted as
+        duplicates and never sent to the database. The rest are COPYed into
+        a temp staging table, then moved into contact_pool with one
+        INSERT ... ON CONFLICT DO NOTHING; the unique (tenant_id, phone)
+        index confirms which of them are really new and also drops phones
+        repeated within the file. Unique phone counts come from the staged
+        rows in the same statement.
         
         Returns:
             Dict with upload statistics
         """
-        valid_phones, invalid_entries, total_rows = await self.parse_excel_file(
-            file_content, file_name
-        )
+        stats = {}
+        use_filter = await phone_filter.ensure_ready(tenant_id)
+        pending_key = phone_filter.pending_key(tenant_id, uuid.uuid4())
+        known_duplicates = 0
         
-        # Check for existing phones in pool (for this tenant)
-        existing_result = await session.execute(
-            select(ContactPool.phone)
-            .where(ContactPool.tenant_id == tenant_id)
-            .where(ContactPool.phone.in_(valid_phones))
-        )
-        existing_phones = set(row[0] for row in existing_result)
-        
-        # Filter out duplicates
-        new_phones = [p for p in valid_phones if p not in existing_phones]
-        
-        # Create contact records
-        contacts = []
-        for phone in new_phones:
-            contact = ContactPool(
-                tenant_id=tenant_id,
-                phone=phone,
-                source_file=file_name,
-                uploaded_at=datetime.utcnow()
-            )
-            contacts.append(contact)
-            session.add(contact)
+        try:
+            await session.execute(text(
+                f"CREATE TEMP TABLE {STAGING_TABLE} (id uuid NOT NULL, phone text NOT NULL) ON COMMIT DROP"
+            ))
+            
+            copied = 0
+            async with aclosing(self.parse_contacts_file(file_path, file_name, stats)) as chunks:
+                async for phones in chunks:
+                    if use_filter:
+                        known = await phone_filter.known(tenant_id, phones)
+                        if known is None:
+                            use_filter = False
+                        else:
+                            candidates = [p for p, is_known in zip(phones, known) if not is_known]
+                            known_duplicates += len(phones) - len(candidates)
+                            phones = candidates
+                    
+                    await self._copy_to_staging(session, [(uuid.uuid4(), phone) for phone in phones])
+                    
+                    if use_filter:
+                        try:
+                            await phone_filter.stage(pending_key, phones)
+                        except RedisError:
+                            use_filter = False
+                    
+                    copied += 1
+                    if on_progress:
+                        # Parsing is the first half of the work, staging most of the rest
+                        await on_progress(0.5 + 0.4 * copied / stats["chunk_count"])
+            
+            new_count, staged_phones = await self._insert_staged(session, tenant_id, file_name)
+            await pool_counters.record_upload(session, tenant_id, file_name, new_count)
+            await session.commit()
+        except BaseException:
+            await phone_filter.discard_pending(pending_key)
+            raise
         
-        await session.commit()
+        # Only committed phones may enter the filter
+        if use_filter:
+            await phone_filter.commit_pending(tenant_id, pending_key)
+        else:
+            await phone_filter.discard_pending(pending_key)
         
+        # Known duplicates are counted per occurrence, staged phones once each
+        valid_phones = staged_phones + known_duplicates
         return {
             "file_name": file_name,
-            "total_rows": total_rows,
-            "valid_phones": len(valid_phones),
-            "new_contacts": len(new_phones),
-            "duplicates": len(valid_phones) - len(new_phones),
-            "invalid_entries": len(invalid_entries),
-            "invalid_samples": invalid_entries[:10]  # Sample of invalid entries
+            "total_rows": stats["total_rows"],
+            "valid_phones": valid_phones,
+            "new_contacts": new_count,
+            "duplicates": valid_phones - new_count,
+            "known_duplicates": known_duplicates,  # Dropped by the presence filter
+            "invalid_entries": stats["invalid_entries"],
+            "invalid_samples": stats["invalid_samples"],  # Sample of invalid entries
+            "invalid_reasons": stats["invalid_reasons"]
         }
     
+    async def _insert_staged(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        file_name: str
+    ) -> Tuple[int, int]:
+        """
+        Move staged phones into contact_pool.
+
+        Returns:
+            (phones that were new, distinct phones staged)
+        """
+        result = await session.execute(
+            text(f"""
+                WITH inserted AS (
+                    INSERT INTO contact_pool (id, tenant_id, phone, source_file, uploaded_at, is_assigned)
+                    SELECT id, :tenant_id, phone, :source_file, :uploaded_at, false
+                    FROM {STAGING_TABLE}
+                    ON CONFLICT (tenant_id, phone) DO NOTHING
+                    RETURNING 1
+                )
+                SELECT (SELECT count(*) FROM inserted),
+                       (SELECT count(DISTINCT phone) FROM {STAGING_TABLE})
+            """),
+            {"tenant_id": tenant_id, "source_file": file_name, "uploaded_at": datetime.utcnow()}
+        )
+        new_count, staged_phones = result.one()
+        return new_count, staged_phones
+    
     async def get_pool_stats(
         self,
         session: AsyncSession,
-        tenant_id: uuid.UUID
+        tenant_id: uuid.UUID,
+        approximate: bool = False
     ) -> dict:
-        """Get statistics about the contact pool."""
-        # Total contacts
-        total_result = await session.execute(
-            select(func.count(ContactPool.id))
-            .where(ContactPool.tenant_id == tenant_id)
-        )
-        total = total_result.scalar() or 0
+        """
+        Get statistics about the contact pool from the maintained counters
+        (a single row). With approximate=True, totals come from planner
+        statistics instead.
+        """
+        counters = await pool_counters.get(session, tenant_id)
+        sources = counters.sources if counters else {}
         
-        # Unassigned contacts
-        unassigned_result = await session.execute(
-            select(func.count(ContactPool.id))
-            .where(ContactPool.tenant_id == tenant_id)
-            .where(ContactPool.is_assigned == False)
-        )
-        unassigned = unassigned_result.scalar() or 0
+        if approximate:
+            estimate = await pool_counters.estimate(session, tenant_id)
+            total = estimate["total_contacts"]
+            unassigned = estimate["unassigned"]
+        else:
+            total = counters.total_contacts if counters else 0
+            unassigned = total - (counters.assigned if counters else 0)
         
         # Assigned contacts
         assigned = total - unassigned
         
-        # Contacts by source file
-        sources_result = await session.execute(
-            select(ContactPool.source_file, func.count(ContactPool.id))
-            .where(ContactPool.tenant_id == tenant_id)
-            .group_by(ContactPool.source_file)
-        )
-        sources = [{"file": row[0], "count": row[1]} for row in sources_result]
-        
         return {
             "total_contacts": total,
             "assigned": assigned,
             "unassigned": unassigned,
             "assignment_rate": round(assigned / total * 100, 1) if total > 0 else 0,
-            "sources": sources
+            "sources": [
+                {"file": file if file != NO_SOURCE else None, "count": count}
+                for file, count in sources.items()
+            ],
+            "approximate": approximate,
+            "recounted_at": counters.recounted_at if counters else None
         }
     
     async def get_unassigned_contacts(
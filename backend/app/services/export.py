@@ -5,74 +5,118 @@ Generates text reports and exports for managers.
 Includes agent status, progress tracking, and inactivity alerts.
 """
 
+import asyncio
+import json
+import logging
 import uuid
 from datetime import datetime, timedelta
 from typing import List, Optional
-from sqlalchemy import select, func, and_
+from redis.exceptions import RedisError
+from sqlalchemy import select, func, and_, or_, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import redis_client
 from app.models.tenant import User, UserRole
 from app.models.contacts import VcfBatch, VcfBatchStatus, AgentProgress
+from app.services.progress_snapshots import progress_snapshots
+
+logger = logging.getLogger(__name__)
 
 
 class ExportService:
     """Service for generating manager reports and exports."""
     
+    def __init__(self):
+        # Keep references so background refreshes are not garbage collected
+        self._background_tasks = set()
+    
     async def get_agent_status_list(
         self,
         session: AsyncSession,
-        tenant_id: uuid.UUID
+        tenant_id: uuid.UUID,
+        inactive_since: Optional[datetime] = None
     ) -> List[dict]:
         """
         Get status of all agents for a tenant.
         Includes activity status and progress.
+        
+        Computed in a single statement: today's and lifetime progress and the
+        active batch are lateral subqueries per agent, so the cost does not
+        grow with round trips as the agent count grows.
+        
+        Args:
+            inactive_since: Only include agents whose last activity is at or
+                before this time.
         """
-        # Get all agents for tenant
-        result = await session.execute(
-            select(User)
+        now = datetime.utcnow()
+        today = now.date()
+        
+        # Per-agent progress totals (today's split plus lifetime)
+        progress = (
+            select(
+                func.coalesce(
+                    func.sum(AgentProgress.morning_count).filter(AgentProgress.date == today), 0
+                ).label("today_morning"),
+                func.coalesce(
+                    func.sum(AgentProgress.evening_count).filter(AgentProgress.date == today), 0
+                ).label("today_evening"),
+                func.coalesce(
+                    func.sum(
+                        func.coalesce(AgentProgress.morning_count, 0) +
+                        func.coalesce(AgentProgress.evening_count, 0)
+                    ), 0
+                ).label("total_added"),
+            )
+            .where(AgentProgress.agent_id == User.id)
+            .lateral("progress")
+        )
+        
+        # Currently assigned batch, if any
+        active_batch = (
+            select(VcfBatch.id, VcfBatch.contact_count)
+            .where(VcfBatch.agent_id == User.id)
+            .where(VcfBatch.status.in_([
+                VcfBatchStatus.ASSIGNED.value,
+                VcfBatchStatus.IN_PROGRESS.value
+            ]))
+            .limit(1)
+            .lateral("active_batch")
+        )
+        
+        query = (
+            select(
+                User,
+                progress.c.today_morning,
+                progress.c.today_evening,
+                progress.c.total_added,
+                active_batch.c.id.label("active_batch_id"),
+                active_batch.c.contact_count.label("batch_contacts"),
+            )
+            .join(progress, true())
+            .outerjoin(active_batch, true())
             .where(User.tenant_id == tenant_id)
             .where(User.role == UserRole.AGENT.value)
+            .where(User.is_active.is_(True))
             .order_by(User.name)
         )
-        agents = result.scalars().all()
         
-        now = datetime.utcnow()
-        agent_statuses = []
+        if inactive_since is not None:
+            # Split on NULL so both branches can use their indexes
+            query = query.where(or_(
+                User.last_activity_at <= inactive_since,
+                and_(User.last_activity_at.is_(None), User.created_at <= inactive_since)
+            ))
+        
+        result = await session.execute(query)
         
-        for agent in agents:
+        agent_statuses = []
+        for agent, today_morning, today_evening, total_added, active_batch_id, batch_contacts in result.all():
             # Calculate inactivity
             last_activity = agent.last_activity_at or agent.created_at
             inactive_days = (now - last_activity).days
             
-            # Get today's progress
-            today = datetime.utcnow().date()
-            progress_result = await session.execute(
-                select(AgentProgress)
-                .where(AgentProgress.agent_id == agent.id)
-                .where(AgentProgress.date == today)
-            )
-            today_progress = progress_result.scalars().first()
-            
-            # Get total progress
-            total_result = await session.execute(
-                select(
-                    func.sum(AgentProgress.morning_count + AgentProgress.evening_count)
-                )
-                .where(AgentProgress.agent_id == agent.id)
-            )
-            total_added = total_result.scalar() or 0
-            
-            # Get assigned batch info
-            batch_result = await session.execute(
-                select(VcfBatch)
-                .where(VcfBatch.agent_id == agent.id)
-                .where(VcfBatch.status.in_([
-                    VcfBatchStatus.ASSIGNED.value,
-                    VcfBatchStatus.IN_PROGRESS.value
-                ]))
-            )
-            active_batch = batch_result.scalars().first()
-            
             # Determine status
             if inactive_days >= 5:
                 status = "INACTIVE"
@@ -92,15 +136,12 @@ class ExportService:
                 "status_icon": status_icon,
                 "inactive_days": inactive_days,
                 "last_activity": last_activity.isoformat() if last_activity else None,
-                "today_morning": today_progress.morning_count if today_progress else 0,
-                "today_evening": today_progress.evening_count if today_progress else 0,
-                "today_total": (
-                    (today_progress.morning_count if today_progress else 0) +
-                    (today_progress.evening_count if today_progress else 0)
-                ),
+                "today_morning": today_morning,
+                "today_evening": today_evening,
+                "today_total": today_morning + today_evening,
                 "total_added": total_added,
-                "has_active_batch": active_batch is not None,
-                "batch_contacts": active_batch.contact_count if active_batch else 0,
+                "has_active_batch": active_batch_id is not None,
+                "batch_contacts": (batch_contacts or 0) if active_batch_id is not None else 0,
                 "tutorial_completed": agent.tutorial_completed
             })
         
@@ -113,42 +154,34 @@ class ExportService:
         inactive_threshold_days: int = 1
     ) -> List[dict]:
         """Get agents who haven't been active for specified days."""
-        all_agents = await self.get_agent_status_list(session, tenant_id)
-        return [a for a in all_agents if a["inactive_days"] >= inactive_threshold_days]
+        cutoff = datetime.utcnow() - timedelta(days=inactive_threshold_days)
+        return await self.get_agent_status_list(session, tenant_id, inactive_since=cutoff)
     
-    async def generate_text_report(
-        self,
-        session: AsyncSession,
-        tenant_id: uuid.UUID
-    ) -> str:
-        """
-        Generate a text status report for managers.
-        Can be copied and shared via WhatsApp/email.
-        """
-        agent_statuses = await self.get_agent_status_list(session, tenant_id)
-        
-        # Calculate summary stats
-        total_agents = len(agent_statuses)
-        active_today = sum(1 for a in agent_statuses if a["today_total"] > 0)
+    def _summarize(self, agent_statuses: List[dict]) -> dict:
+        """Summary counters shown at the top of the manager report."""
         inactive_count = sum(1 for a in agent_statuses if a["status"] == "INACTIVE")
         warning_count = sum(1 for a in agent_statuses if a["status"] == "WARNING")
-        
-        total_today = sum(a["today_total"] for a in agent_statuses)
-        total_all_time = sum(a["total_added"] for a in agent_statuses)
-        
-        # Build report
-        now = datetime.utcnow()
+        return {
+            "total_agents": len(agent_statuses),
+            "active_today": sum(1 for a in agent_statuses if a["today_total"] > 0),
+            "inactive_count": inactive_count,
+            "warning_count": warning_count,
+            "total_today": sum(a["today_total"] for a in agent_statuses),
+            "total_all_time": sum(a["total_added"] for a in agent_statuses),
+        }
+    
+    def _render_report(self, agent_statuses: List[dict], summary: dict, now: datetime) -> str:
         report_lines = [
             "=== LEGION PRM STATUS REPORT ===",
             f"Generated: {now.strftime('%Y-%m-%d %H:%M')} UTC",
             "",
             "SUMMARY",
             "-------",
-            f"Total Agents: {total_agents}",
-            f"Active Today: {active_today}",
-            f"Inactive (>1 day): {warning_count + inactive_count}",
-            f"Contacts Added Today: {total_today}",
-            f"Total Contacts Added: {total_all_time}",
+            f"Total Agents: {summary['total_agents']}",
+            f"Active Today: {summary['active_today']}",
+            f"Inactive (>1 day): {summary['warning_count'] + summary['inactive_count']}",
+            f"Contacts Added Today: {summary['total_today']}",
+            f"Total Contacts Added: {summary['total_all_time']}",
             "",
             "AGENT DETAILS",
             "-------------"
@@ -175,37 +208,180 @@ class ExportService:
         
         return "\n".join(report_lines)
     
+    async def generate_text_report(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID
+    ) -> str:
+        """
+        Generate a text status report for managers.
+        Can be copied and shared via WhatsApp/email.
+        """
+        report = await self._build_report(session, tenant_id)
+        return report["report"]
+    
+    async def _build_report(self, session: AsyncSession, tenant_id: uuid.UUID) -> dict:
+        agent_statuses = await self.get_agent_status_list(session, tenant_id)
+        summary = self._summarize(agent_statuses)
+        now = datetime.utcnow()
+        return {
+            "report": self._render_report(agent_statuses, summary, now),
+            "summary": summary,
+            "generated_at": now.isoformat(),
+        }
+    
+    # ============== Report Cache ==============
+    #
+    # One Redis hash per tenant holds the rendered report, its summary and
+    # two counters: `version` is bumped by invalidate_report() whenever
+    # progress or activity changes for the tenant, `built_version` records
+    # the version the cached copy was built from. A hit is a single HGETALL.
+    
+    def _report_key(self, tenant_id: uuid.UUID) -> str:
+        return f"report:{tenant_id}"
+    
+    async def invalidate_report(self, tenant_id: uuid.UUID) -> None:
+        """
+        Mark the tenant's cached report stale. Call after every write the
+        report reads: progress reports/syncs, batch generation, assignment and
+        reclamation, agent changes and WhatsApp reports.
+        """
+        key = self._report_key(tenant_id)
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.hincrby(key, "version", 1)
+                pipe.expire(key, settings.REPORT_CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Could not invalidate report cache for {tenant_id}: {e}")
+    
+    async def _store_report(self, tenant_id: uuid.UUID, report: dict, version: int) -> None:
+        key = self._report_key(tenant_id)
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={
+                    "report": report["report"],
+                    "summary": json.dumps(report["summary"]),
+                    "generated_at": report["generated_at"],
+                    "built_version": version,
+                })
+                pipe.expire(key, settings.REPORT_CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Could not cache report for {tenant_id}: {e}")
+    
+    async def _refresh_report(self, tenant_id: uuid.UUID, version: int) -> dict:
+        async with AsyncSessionLocal() as session:
+            report = await self._build_report(session, tenant_id)
+        await self._store_report(tenant_id, report, version)
+        return report
+    
+    async def _refresh_in_background(self, tenant_id: uuid.UUID, version: int) -> None:
+        lock_key = f"{self._report_key(tenant_id)}:refreshing"
+        try:
+            # Only one worker rebuilds a given tenant's report at a time
+            if not await redis_client.set(lock_key, "1", nx=True, ex=60):
+                return
+            try:
+                await self._refresh_report(tenant_id, version)
+            finally:
+                await redis_client.delete(lock_key)
+        except Exception as e:
+            logger.error(f"Background report refresh failed for {tenant_id}: {e}")
+    
+    async def get_cached_report(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        stale_while_revalidate: bool = False
+    ) -> dict:
+        """
+        Get the manager report and summary, served from Redis when fresh.
+        
+        With stale_while_revalidate, an invalidated copy is returned
+        immediately and rebuilt in the background.
+        """
+        try:
+            cached = await redis_client.hgetall(self._report_key(tenant_id))
+        except RedisError as e:
+            logger.warning(f"Report cache unavailable for {tenant_id}: {e}")
+            cached = {}
+        
+        version = int(cached.get("version", 0))
+        if "report" in cached:
+            generated_at = datetime.fromisoformat(cached["generated_at"])
+            # Inactivity and "today" totals depend on the date
+            same_day = generated_at.date() == datetime.utcnow().date()
+            fresh = same_day and int(cached.get("built_version", -1)) == version
+            if fresh or (stale_while_revalidate and same_day):
+                if not fresh:
+                    task = asyncio.create_task(self._refresh_in_background(tenant_id, version))
+                    self._background_tasks.add(task)
+                    task.add_done_callback(self._background_tasks.discard)
+                return {
+                    "report": cached["report"],
+                    "summary": json.loads(cached["summary"]),
+                    "generated_at": cached["generated_at"],
+                    "stale": not fresh,
+                }
+        
+        report = await self._build_report(session, tenant_id)
+        await self._store_report(tenant_id, report, version)
+        return {**report, "stale": False}
+    
     async def get_daily_summary(
         self,
         session: AsyncSession,
         tenant_id: uuid.UUID,
         date: Optional[datetime] = None
     ) -> dict:
-        """Get summary statistics for a specific date."""
+        """Get summary statistics for a specific date (from daily snapshots)."""
         if date is None:
             date = datetime.utcnow().date()
+        elif isinstance(date, datetime):
+            date = date.date()
         
-        # Get progress for the date
-        result = await session.execute(
-            select(AgentProgress)
-            .join(User)
-            .where(User.tenant_id == tenant_id)
-            .where(AgentProgress.date == date)
-        )
-        progress_records = result.scalars().all()
+        trend = await progress_snapshots.get_tenant_trend(session, tenant_id, date, date)
+        if trend:
+            return trend[0]
+        return {
+            "date": date.isoformat(),
+            "agents_reported": 0,
+            "morning_total": 0,
+            "evening_total": 0,
+            "day_total": 0
+        }
+    
+    async def get_progress_trend(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        days: int = 30
+    ) -> dict:
+        """
+        Daily totals plus per-agent daily counts for the last `days` days.
+        Reads only the snapshot table (one range scan per query).
+        """
+        end = datetime.utcnow().date()
+        start = end - timedelta(days=days - 1)
         
-        total_morning = sum(p.morning_count for p in progress_records)
-        total_evening = sum(p.evening_count for p in progress_records)
-        agents_reported = len(progress_records)
+        snapshots = await progress_snapshots.get_tenant_snapshots(session, tenant_id, start, end)
+        agents = {}
+        for snap in snapshots:
+            agents.setdefault(str(snap.agent_id), []).append({
+                "date": snap.date.isoformat(),
+                "morning": snap.morning_count,
+                "evening": snap.evening_count,
+                "total": snap.total_count,
+                "streak": snap.streak
+            })
         
         return {
-            "date": date.isoformat(),
-            "agents_reported": agents_reported,
-            "morning_total": total_morning,
-            "evening_total": total_evening,
-            "day_total": total_morning + total_evening
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "days": await progress_snapshots.get_tenant_trend(session, tenant_id, start, end),
+            "agents": agents
         }
 
-
 # Singleton instance
 export_service = ExportService()
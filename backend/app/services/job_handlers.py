@@ -0,0 +1,138 @@
+"""
+Job Handlers
+
+The background operations the job worker knows how to run. Each handler
+receives a JobContext and returns a JSON-serialisable result payload. The
+registered cost is the kind's relative weight in fair scheduling.
+"""
+
+import asyncio
+import os
+from contextlib import contextmanager
+
+from app.core.database import AsyncSessionLocal
+from app.services.batch_reclaim import batch_reclaim
+from app.services.contact_pool import contact_pool_service
+from app.services.export import export_service
+from app.services.jobs import job_service, JobContext
+from app.services.pool_counters import pool_counters
+from app.services.vcf_generator import vcf_generator
+from app.services.whatsapp_import import whatsapp_import
+
+CONTACTS_UPLOAD = "contacts_upload"
+VCF_GENERATE = "vcf_generate"
+WHATSAPP_UPLOAD = "whatsapp_upload"
+POOL_RECOUNT = "pool_recount"
+BATCH_RECLAIM = "batch_reclaim"
+
+
+@contextmanager
+def _spooled(file_path: str):
+    """
+    Remove a spooled upload once its job is done with it. A job interrupted
+    by worker shutdown is re-queued, so it keeps its file for the next run.
+    """
+    interrupted = False
+    try:
+        yield
+    except asyncio.CancelledError:
+        interrupted = True
+        raise
+    finally:
+        if not interrupted and os.path.exists(file_path):
+            os.remove(file_path)
+
+
+@job_service.handler(CONTACTS_UPLOAD, cost=4)
+async def run_contacts_upload(ctx: JobContext) -> dict:
+    """Parse a spooled Excel upload into the tenant's contact pool."""
+    file_path = ctx.params["file_path"]
+    with _spooled(file_path):
+        await ctx.progress(1)
+        async with AsyncSessionLocal() as session:
+            return await contact_pool_service.upload_contacts(
+                session=session,
+                tenant_id=ctx.tenant_id,
+                file_path=file_path,
+                file_name=ctx.params["file_name"],
+                on_progress=ctx.scaled(0, 99)
+            )
+
+
+@job_service.handler(VCF_GENERATE, cost=2)
+async def run_vcf_generate(ctx: JobContext) -> dict:
+    """Generate VCF batches from the tenant's unassigned contacts."""
+    async with AsyncSessionLocal() as session:
+        batches = await vcf_generator.generate_multiple_batches(
+            session=session,
+            tenant_id=ctx.tenant_id,
+            prefix=ctx.params["prefix"],
+            contacts_per_batch=ctx.params["contacts_per_batch"],
+            contacts_per_serial=ctx.params["contacts_per_serial"],
+            max_batches=ctx.params["max_batches"],
+            on_progress=ctx.scaled(0, 99)
+        )
+        if batches:
+            await export_service.invalidate_report(ctx.tenant_id)
+        return {
+            "batches": [
+                {
+                    "id": str(batch.id),
+                    "file_name": batch.file_name,
+                    "contact_count": batch.contact_count,
+                    "prefix": batch.prefix,
+                    "start_serial": batch.start_serial,
+                    "status": batch.status,
+                    "created_at": batch.created_at.isoformat() if batch.created_at else None,
+                }
+                for batch in batches
+            ]
+        }
+
+
+@job_service.handler(WHATSAPP_UPLOAD, cost=4)
+async def run_whatsapp_upload(ctx: JobContext) -> dict:
+    """Import a spooled CSV/Excel file as a WhatsApp campaign."""
+    file_path = ctx.params["file_path"]
+    with _spooled(file_path):
+        async with AsyncSessionLocal() as session:
+            campaign = await whatsapp_import.import_campaign(
+                session=session,
+                file_path=file_path,
+                file_name=ctx.params["file_name"],
+                name=ctx.params["name"],
+                batch_size=ctx.params["batch_size"],
+                on_progress=ctx.scaled(0, 99)
+            )
+            return {
+                "campaign_id": str(campaign.id),
+                "name": campaign.name,
+                "total_contacts": campaign.total_contacts,
+            }
+
+
+@job_service.handler(POOL_RECOUNT, cost=2)
+async def run_pool_recount(ctx: JobContext) -> dict:
+    """Repair the tenant's pool counters with an exact recount."""
+    async with AsyncSessionLocal() as session:
+        stats = await pool_counters.recount(session, ctx.tenant_id)
+        return {
+            "total_contacts": stats.total_contacts,
+            "assigned": stats.assigned,
+            "sources": len(stats.sources),
+        }
+
+
+@job_service.handler(BATCH_RECLAIM, cost=2)
+async def run_batch_reclaim(ctx: JobContext) -> dict:
+    """Return or rebalance the tenant's stale VCF batches."""
+    async with AsyncSessionLocal() as session:
+        result = await batch_reclaim.reclaim_stale(
+            session=session,
+            tenant_id=ctx.tenant_id,
+            stale_days=ctx.params["stale_days"],
+            mode=ctx.params["mode"],
+            throughput_days=ctx.params["throughput_days"]
+        )
+    await export_service.invalidate_report(ctx.tenant_id)
+    return result
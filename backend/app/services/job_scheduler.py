@@ -0,0 +1,176 @@
+"""
+Fair Job Scheduler
+
+Decides which queued job a worker runs next, so one tenant queueing many
+heavy jobs cannot starve the others:
+- Every tenant has its own FIFO list of job ids
+- Tenants with queued work sit in a sorted set scored by virtual time
+  (start-time fair queueing); a worker always serves the lowest score
+- Dispatching a job advances its tenant's score by cost / weight, where the
+  cost depends on the job kind and the weight on the tenant's plan
+- A tenant at its concurrency cap is skipped until one of its jobs finishes
+
+Selection and bookkeeping run in Lua so concurrent workers never dispatch
+past a cap. Running slots are leases, renewed while their job runs, so a
+crashed worker cannot hold a tenant's slot forever and a long job does not
+lose its slot to the cap.
+"""
+
+import time
+import uuid
+from typing import Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+TENANTS_KEY = "jobs:tenants"
+VCLOCK_KEY = "jobs:vclock"
+WAKEUP_KEY = "jobs:wakeup"
+TENANT_QUEUE_PREFIX = "jobs:tenant:"
+RUNNING_PREFIX = "jobs:running:"
+
+# How many idle-worker wakeup tokens to keep around
+WAKEUP_BACKLOG = 64
+# Tenants examined per dispatch attempt
+SCAN_LIMIT = 100
+
+_ENQUEUE_LUA = """
+redis.call('LPUSH', KEYS[3], ARGV[2])
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    -- A tenant (re)joining starts at the current virtual time
+    local vclock = tonumber(redis.call('GET', KEYS[2]) or '0')
+    redis.call('ZADD', KEYS[1], vclock, ARGV[1])
+end
+return redis.call('LLEN', KEYS[3])
+"""
+
+_DISPATCH_LUA = """
+local now = tonumber(ARGV[1])
+local cap = tonumber(ARGV[3])
+local tenants = redis.call('ZRANGE', KEYS[1], 0, tonumber(ARGV[4]) - 1, 'WITHSCORES')
+for i = 1, #tenants, 2 do
+    local tenant = tenants[i]
+    local score = tonumber(tenants[i + 1])
+    local queue = ARGV[5] .. tenant
+    local running = ARGV[6] .. tenant
+    redis.call('ZREMRANGEBYSCORE', running, '-inf', now)
+    if redis.call('ZCARD', running) < cap then
+        local item = redis.call('RPOP', queue)
+        if item then
+            local sep = string.find(item, '|', 1, true)
+            local job_id = string.sub(item, 1, sep - 1)
+            local cost = tonumber(string.sub(item, sep + 1))
+            redis.call('ZADD', running, ARGV[2], job_id)
+            redis.call('SET', KEYS[2], score)
+            if redis.call('LLEN', queue) > 0 then
+                redis.call('ZADD', KEYS[1], score + cost, tenant)
+            else
+                redis.call('ZREM', KEYS[1], tenant)
+            end
+            return {tenant, job_id}
+        end
+        redis.call('ZREM', KEYS[1], tenant)
+    end
+end
+return nil
+"""
+
+
+class FairJobScheduler:
+    """Per-tenant job queues with weighted fair dispatch and concurrency caps."""
+
+    def __init__(self):
+        self._enqueue = redis_client.register_script(_ENQUEUE_LUA)
+        self._dispatch = redis_client.register_script(_DISPATCH_LUA)
+
+    def tenant_weight(self, plan_tier: Optional[str]) -> float:
+        return float(settings.JOB_PLAN_WEIGHTS.get(plan_tier or "", 1))
+
+    async def enqueue(
+        self,
+        tenant_id: uuid.UUID,
+        job_id: uuid.UUID,
+        cost: float,
+        weight: float = 1.0
+    ) -> int:
+        """Queue a job for its tenant. Returns the tenant's queue depth."""
+        depth = await self._enqueue(
+            keys=[TENANTS_KEY, VCLOCK_KEY, f"{TENANT_QUEUE_PREFIX}{tenant_id}"],
+            args=[str(tenant_id), f"{job_id}|{cost / weight}"],
+        )
+        await self._wake()
+        return depth
+
+    async def next_job(self) -> Optional[Tuple[uuid.UUID, uuid.UUID]]:
+        """
+        Claim the next job to run as (tenant_id, job_id), or None if every
+        tenant with queued work is at its concurrency cap.
+        """
+        now = time.time()
+        item = await self._dispatch(
+            keys=[TENANTS_KEY, VCLOCK_KEY],
+            args=[
+                now,
+                now + settings.JOB_LEASE_SECONDS,
+                settings.JOB_TENANT_CONCURRENCY,
+                SCAN_LIMIT,
+                TENANT_QUEUE_PREFIX,
+                RUNNING_PREFIX,
+            ],
+        )
+        if not item:
+            return None
+        return uuid.UUID(item[0]), uuid.UUID(item[1])
+
+    async def release(self, tenant_id: uuid.UUID, job_id: uuid.UUID) -> None:
+        """Free the tenant slot held by a finished job."""
+        await redis_client.zrem(f"{RUNNING_PREFIX}{tenant_id}", str(job_id))
+        await self._wake()
+
+    async def renew(self, tenant_id: uuid.UUID, job_id: uuid.UUID) -> bool:
+        """
+        Extend a running job's slot lease by JOB_LEASE_SECONDS. False if the
+        slot was already gone (its lease expired or it was released).
+        """
+        renewed = await redis_client.zadd(
+            f"{RUNNING_PREFIX}{tenant_id}",
+            {str(job_id): time.time() + settings.JOB_LEASE_SECONDS},
+            xx=True,
+            ch=True,
+        )
+        return bool(renewed)
+
+    async def tracked_jobs(self, tenant_id: uuid.UUID) -> Set[str]:
+        """Ids of a tenant's jobs that are queued or hold a running slot."""
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.lrange(f"{TENANT_QUEUE_PREFIX}{tenant_id}", 0, -1)
+            pipe.zrange(f"{RUNNING_PREFIX}{tenant_id}", 0, -1)
+            queued, running = await pipe.execute()
+        return {item.split("|", 1)[0] for item in queued} | set(running)
+
+    async def wait_for_work(self, timeout: int) -> None:
+        """Block an idle worker until work may be available (or timeout)."""
+        await redis_client.blpop(WAKEUP_KEY, timeout=timeout)
+
+    async def _wake(self) -> None:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.lpush(WAKEUP_KEY, 1)
+            pipe.ltrim(WAKEUP_KEY, 0, WAKEUP_BACKLOG - 1)
+            await pipe.execute()
+
+    async def tenant_stats(self, tenant_id: uuid.UUID) -> dict:
+        """Live queue depth and running count of a tenant."""
+        running_key = f"{RUNNING_PREFIX}{tenant_id}"
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.llen(f"{TENANT_QUEUE_PREFIX}{tenant_id}")
+            pipe.zcount(running_key, time.time(), "+inf")
+            queued, running = await pipe.execute()
+        return {
+            "queued": queued,
+            "running": running,
+            "concurrency_cap": settings.JOB_TENANT_CONCURRENCY,
+        }
+
+
+# Singleton instance
+job_scheduler = FairJobScheduler()
@@ -0,0 +1,525 @@
+"""
+Background Job Service
+
+Runs heavy admin operations outside the HTTP request:
+- enqueue() records a Job row and queues its id with the fair scheduler
+- JobWorker takes the next id the scheduler picks and runs the handler
+  registered for the job's kind
+- Handlers report percent progress through JobContext, which is also where
+  a cancellation request is noticed
+- Workers run inside the API process (JOB_WORKERS) or standalone via
+  run_job_worker.py; both share the same queue
+- A running job heartbeats; the reaper re-queues jobs whose worker died
+  mid-run or after popping them, and worker shutdown re-queues its jobs
+  instead of failing them
+"""
+
+import asyncio
+import logging
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from redis.exceptions import RedisError
+from sqlalchemy import select, update, func, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.jobs import Job, JobStatus
+from app.models.tenant import Tenant
+from app.services.job_scheduler import job_scheduler
+
+logger = logging.getLogger(__name__)
+
+IDLE_WAIT_SECONDS = 1
+SHUTDOWN_GRACE_SECONDS = 10
+REAP_INTERVAL_SECONDS = 60
+# A QUEUED job is only taken as lost from Redis once it is this old, which
+# covers the gap between committing its row and pushing it to the queue
+LOST_QUEUED_GRACE_SECONDS = 60
+
+FINISHED_STATUSES = {JobStatus.SUCCEEDED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value}
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler once cancellation of its job was requested."""
+
+
+class JobContext:
+    """Handed to a job handler; carries its parameters and reports progress."""
+
+    def __init__(self, job_id: uuid.UUID, tenant_id: uuid.UUID, params: dict):
+        self.job_id = job_id
+        self.tenant_id = tenant_id
+        self.params = params or {}
+        self._last_progress = 0
+
+    async def progress(self, percent: int) -> None:
+        """
+        Record progress (0-100). Raises JobCancelled if the job has been
+        cancelled, so handlers stop at their next checkpoint.
+        """
+        percent = max(0, min(100, int(percent)))
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == self.job_id)
+                .values(progress=max(percent, self._last_progress))
+                .returning(Job.cancel_requested)
+            )
+            cancel_requested = result.scalar()
+            await session.commit()
+        self._last_progress = max(percent, self._last_progress)
+        if cancel_requested:
+            raise JobCancelled()
+
+    def scaled(self, start: int, end: int) -> Callable[[float], Awaitable[None]]:
+        """Progress callback mapping a 0-1 fraction onto start..end percent."""
+        async def report(fraction: float) -> None:
+            await self.progress(start + (end - start) * fraction)
+        return report
+
+
+JobHandler = Callable[[JobContext], Awaitable[dict]]
+
+
+class JobService:
+    """Service for queueing, inspecting and cancelling background jobs."""
+
+    def __init__(self):
+        self._handlers: Dict[str, JobHandler] = {}
+        self._costs: Dict[str, float] = {}
+
+    def handler(self, kind: str, cost: float = 1.0):
+        """
+        Decorator registering the coroutine that executes jobs of a kind.
+        cost is the job's relative weight in fair scheduling.
+        """
+        def register(func: JobHandler) -> JobHandler:
+            self._handlers[kind] = func
+            self._costs[kind] = cost
+            return func
+        return register
+
+    def get_handler(self, kind: str) -> Optional[JobHandler]:
+        return self._handlers.get(kind)
+
+    async def enqueue(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        kind: str,
+        params: dict,
+        created_by: Optional[uuid.UUID] = None
+    ) -> Job:
+        """
+        Create a job and queue it for a worker.
+
+        Raises:
+            RedisError: if the job could not be queued (the row is marked FAILED)
+        """
+        now = datetime.utcnow()
+        job = Job(
+            tenant_id=tenant_id,
+            created_by=created_by,
+            kind=kind,
+            status=JobStatus.QUEUED.value,
+            progress=0,
+            params=params,
+            cancel_requested=False,
+            attempts=0,
+            created_at=now,
+            queued_at=now,
+        )
+        session.add(job)
+        tenant = await session.get(Tenant, tenant_id)
+        await session.commit()
+
+        try:
+            await self._push(tenant_id, job.id, kind, tenant.plan_tier if tenant else None)
+        except RedisError:
+            job.status = JobStatus.FAILED.value
+            job.error = "Could not queue job"
+            job.finished_at = datetime.utcnow()
+            await session.commit()
+            raise
+        return job
+
+    async def get_job(
+        self,
+        session: AsyncSession,
+        job_id: uuid.UUID,
+        tenant_id: uuid.UUID
+    ) -> Optional[Job]:
+        """A job of the given tenant, or None."""
+        result = await session.execute(
+            select(Job).where(Job.id == job_id).where(Job.tenant_id == tenant_id)
+        )
+        return result.scalars().first()
+
+    async def cancel(
+        self,
+        session: AsyncSession,
+        job_id: uuid.UUID,
+        tenant_id: uuid.UUID
+    ) -> Optional[Job]:
+        """
+        Request cancellation. Queued jobs are cancelled immediately; running
+        jobs stop at their handler's next progress checkpoint.
+        """
+        job = await self.get_job(session, job_id, tenant_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+
+        job.cancel_requested = True
+        if job.status == JobStatus.QUEUED.value:
+            job.status = JobStatus.CANCELLED.value
+            job.finished_at = datetime.utcnow()
+        await session.commit()
+        return job
+
+    async def wait_metrics(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        hours: int = 24
+    ) -> dict:
+        """
+        Queue-wait (created -> started) statistics per job kind for jobs a
+        tenant started in the last `hours`, plus its live queue state.
+        """
+        wait = extract("epoch", Job.started_at - Job.created_at)
+        result = await session.execute(
+            select(
+                Job.kind,
+                func.count(Job.id),
+                func.avg(wait),
+                func.percentile_cont(0.5).within_group(wait),
+                func.percentile_cont(0.95).within_group(wait),
+                func.max(wait),
+            )
+            .where(Job.tenant_id == tenant_id)
+            .where(Job.started_at >= datetime.utcnow() - timedelta(hours=hours))
+            .group_by(Job.kind)
+        )
+        by_kind = {
+            row[0]: {
+                "started": row[1],
+                "avg_wait_seconds": round(float(row[2] or 0), 3),
+                "p50_wait_seconds": round(float(row[3] or 0), 3),
+                "p95_wait_seconds": round(float(row[4] or 0), 3),
+                "max_wait_seconds": round(float(row[5] or 0), 3),
+            }
+            for row in result.all()
+        }
+        try:
+            live = await job_scheduler.tenant_stats(tenant_id)
+        except RedisError:
+            live = None
+        return {"window_hours": hours, "by_kind": by_kind, "queue": live}
+
+    async def reap(self) -> dict:
+        """
+        Recover jobs whose worker went away:
+        - RUNNING jobs without a heartbeat for JOB_STALE_SECONDS are re-queued,
+          or cancelled / FAILED if cancellation was requested or they already
+          used JOB_MAX_ATTEMPTS runs
+        - QUEUED jobs missing from the Redis queue (popped by a worker that
+          died before claiming them, or re-queued while Redis was down) are
+          pushed again
+
+        Safe to run from several processes at once: every transition is a
+        conditional update, and a job pushed twice is only claimed once.
+        """
+        now = datetime.utcnow()
+        stale = (
+            (Job.status == JobStatus.RUNNING.value)
+            & (func.coalesce(Job.heartbeat_at, Job.started_at) < now - timedelta(seconds=settings.JOB_STALE_SECONDS))
+        )
+        async with AsyncSessionLocal() as session:
+            cancelled = await session.execute(
+                update(Job)
+                .where(stale)
+                .where(Job.cancel_requested.is_(True))
+                .values(status=JobStatus.CANCELLED.value, finished_at=now)
+                .returning(Job.id)
+            )
+            cancelled = cancelled.scalars().all()
+            failed = await session.execute(
+                update(Job)
+                .where(stale)
+                .where(Job.attempts >= settings.JOB_MAX_ATTEMPTS)
+                .values(status=JobStatus.FAILED.value, finished_at=now, error="Worker lost")
+                .returning(Job.id)
+            )
+            failed = failed.scalars().all()
+            requeued = await session.execute(
+                update(Job)
+                .where(stale)
+                .values(status=JobStatus.QUEUED.value, queued_at=now, started_at=None, heartbeat_at=None)
+                .returning(Job.id, Job.tenant_id, Job.kind)
+            )
+            requeued = requeued.all()
+            await session.commit()
+
+            # Queued jobs Redis no longer knows about
+            result = await session.execute(
+                select(Job.id, Job.tenant_id)
+                .where(Job.status == JobStatus.QUEUED.value)
+                .where(Job.queued_at < now - timedelta(seconds=LOST_QUEUED_GRACE_SECONDS))
+            )
+            lost = []
+            tracked: Dict[uuid.UUID, set] = {}
+            for job_id, tenant_id in result.all():
+                if tenant_id not in tracked:
+                    tracked[tenant_id] = await job_scheduler.tracked_jobs(tenant_id)
+                if str(job_id) not in tracked[tenant_id]:
+                    lost.append(job_id)
+            if lost:
+                # Re-stamping queued_at claims them against concurrent reapers
+                result = await session.execute(
+                    update(Job)
+                    .where(Job.id.in_(lost))
+                    .where(Job.status == JobStatus.QUEUED.value)
+                    .where(Job.queued_at < now - timedelta(seconds=LOST_QUEUED_GRACE_SECONDS))
+                    .values(queued_at=now)
+                    .returning(Job.id, Job.tenant_id, Job.kind)
+                )
+                lost = result.all()
+                await session.commit()
+
+            plans = {}
+            for job_id, tenant_id, kind in [*requeued, *lost]:
+                if tenant_id not in plans:
+                    tenant = await session.get(Tenant, tenant_id)
+                    plans[tenant_id] = tenant.plan_tier if tenant else None
+                await self._push(tenant_id, job_id, kind, plans[tenant_id])
+
+        if cancelled or failed or requeued or lost:
+            logger.warning(
+                f"Job reaper: {len(requeued)} stalled and {len(lost)} lost job(s) re-queued, "
+                f"{len(failed)} failed, {len(cancelled)} cancelled"
+            )
+        return {
+            "requeued": len(requeued),
+            "lost": len(lost),
+            "failed": len(failed),
+            "cancelled": len(cancelled),
+        }
+
+    async def _push(
+        self,
+        tenant_id: uuid.UUID,
+        job_id: uuid.UUID,
+        kind: str,
+        plan_tier: Optional[str]
+    ) -> None:
+        await job_scheduler.enqueue(
+            tenant_id,
+            job_id,
+            cost=self._costs.get(kind, 1.0),
+            weight=job_scheduler.tenant_weight(plan_tier),
+        )
+
+    async def _claim(self, job_id: uuid.UUID) -> Optional[Job]:
+        """Move a queued job to RUNNING; None if it was cancelled or claimed."""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .where(Job.status == JobStatus.QUEUED.value)
+                .values(
+                    status=JobStatus.RUNNING.value,
+                    started_at=now,
+                    heartbeat_at=now,
+                    attempts=Job.attempts + 1,
+                )
+                .returning(Job)
+            )
+            job = result.scalars().first()
+            await session.commit()
+            return job
+
+    async def _finish(self, job_id: uuid.UUID, status: JobStatus, **values) -> None:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(status=status.value, finished_at=datetime.utcnow(), **values)
+            )
+            await session.commit()
+
+    async def _requeue(self, job: Job) -> None:
+        """
+        Put a job interrupted by worker shutdown back in the queue. If the
+        push fails the job stays QUEUED and the reaper pushes it later.
+        """
+        now = datetime.utcnow()
+        running = (Job.id == job.id) & (Job.status == JobStatus.RUNNING.value)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Job)
+                .where(running)
+                .where(Job.cancel_requested.is_(False))
+                .values(status=JobStatus.QUEUED.value, queued_at=now, started_at=None, heartbeat_at=None)
+                .returning(Job.id)
+            )
+            requeued = result.scalar() is not None
+            if not requeued:
+                # Its cancellation was requested meanwhile
+                await session.execute(
+                    update(Job)
+                    .where(running)
+                    .values(status=JobStatus.CANCELLED.value, finished_at=now)
+                )
+            tenant = await session.get(Tenant, job.tenant_id) if requeued else None
+            await session.commit()
+        if not requeued:
+            return
+        try:
+            await self._push(job.tenant_id, job.id, job.kind, tenant.plan_tier if tenant else None)
+        except RedisError as e:
+            logger.warning(f"Could not re-queue job {job.id}, leaving it to the reaper: {e}")
+
+    async def _heartbeat(self, job: Job) -> None:
+        """
+        Keep a running job's heartbeat and tenant slot lease fresh until
+        cancelled, so a job outliving JOB_LEASE_SECONDS keeps counting
+        against its tenant's concurrency cap.
+        """
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                if not await job_scheduler.renew(job.tenant_id, job.id):
+                    logger.warning(f"Job {job.id} lost its tenant slot lease")
+            except RedisError as e:
+                logger.warning(f"Could not renew job slot {job.id}: {e}")
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(
+                        update(Job)
+                        .where(Job.id == job.id)
+                        .where(Job.status == JobStatus.RUNNING.value)
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    await session.commit()
+            except Exception as e:
+                # A missed beat only matters once JOB_STALE_SECONDS have passed
+                logger.warning(f"Job {job.id} heartbeat failed: {e}")
+
+    async def execute(self, job_id: uuid.UUID) -> None:
+        """Run one job to completion, recording its outcome."""
+        job = await self._claim(job_id)
+        if job is None:
+            return
+
+        handler = self.get_handler(job.kind)
+        if handler is None:
+            await self._finish(job.id, JobStatus.FAILED, error=f"Unknown job kind: {job.kind}")
+            return
+
+        context = JobContext(job.id, job.tenant_id, job.params)
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            result = await handler(context)
+        except asyncio.CancelledError:
+            heartbeat.cancel()
+            await self._requeue(job)
+            raise
+        except JobCancelled:
+            await self._finish(job.id, JobStatus.CANCELLED)
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}\n{traceback.format_exc()}")
+            await self._finish(job.id, JobStatus.FAILED, error=str(e) or type(e).__name__)
+        else:
+            await self._finish(job.id, JobStatus.SUCCEEDED, progress=100, result=result)
+        finally:
+            heartbeat.cancel()
+
+
+class JobWorker:
+    """Runs jobs one at a time, in the order the fair scheduler picks them."""
+
+    def __init__(self, service: JobService):
+        self.service = service
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                item = await job_scheduler.next_job()
+                if item is None:
+                    await job_scheduler.wait_for_work(IDLE_WAIT_SECONDS)
+                    continue
+            except RedisError as e:
+                logger.warning(f"Job queue unavailable: {e}")
+                await asyncio.sleep(IDLE_WAIT_SECONDS)
+                continue
+
+            tenant_id, job_id = item
+            try:
+                await self.service.execute(job_id)
+            except Exception as e:
+                # Keep the worker alive if recording the outcome failed
+                logger.error(f"Job worker error on {job_id}: {e}")
+            finally:
+                try:
+                    await job_scheduler.release(tenant_id, job_id)
+                except RedisError as e:
+                    # The slot's lease expires on its own
+                    logger.warning(f"Could not release job slot {job_id}: {e}")
+
+
+class WorkerPool:
+    """A set of JobWorker tasks running on the current event loop."""
+
+    def __init__(self, service: JobService):
+        self.service = service
+        self._workers: List[JobWorker] = []
+        self._tasks: List[asyncio.Task] = []
+        self._reaper: Optional[asyncio.Task] = None
+
+    def start(self, count: int) -> None:
+        # Importing the handlers registers them with the service
+        import app.services.job_handlers  # noqa: F401
+
+        for _ in range(count):
+            worker = JobWorker(self.service)
+            self._workers.append(worker)
+            self._tasks.append(asyncio.create_task(worker.run()))
+        self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def _reap_forever(self) -> None:
+        """Run the reaper at startup and then every REAP_INTERVAL_SECONDS."""
+        while True:
+            try:
+                await self.service.reap()
+            except Exception as e:
+                logger.warning(f"Job reaper failed: {e}")
+            await asyncio.sleep(REAP_INTERVAL_SECONDS)
+
+    async def stop(self, timeout: float = SHUTDOWN_GRACE_SECONDS) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        for worker in self._workers:
+            worker.stop()
+        # Workers notice the stop flag after their current pop/job; jobs still
+        # running after the grace period are interrupted and re-queued
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout) if self._tasks else ((), ())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._workers.clear()
+        self._tasks.clear()
+
+
+# Singleton instances
+job_service = JobService()
+job_workers = WorkerPool(job_service)
@@ -0,0 +1,146 @@
+"""
+Phone Presence Filter
+
+A per-tenant Redis set of every phone in contact_pool, checked by uploads
+before anything is sent to Postgres. Phones found in the set are known
+duplicates and are dropped; only the rest are COPYed and confirmed by the
+unique index.
+
+The set may lag behind the table but must never contain a phone the table
+does not have, otherwise a new contact would be dropped:
+- Uploads stage their candidate phones in a pending set and merge it into
+  the filter only after their transaction commits
+- A filter is only consulted once a full rebuild from contact_pool has
+  marked it ready; anything missed since just goes to the database
+"""
+
+import logging
+import uuid
+from typing import List, Optional
+from redis.exceptions import RedisError
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import redis_client
+from app.models.contacts import ContactPool
+
+logger = logging.getLogger(__name__)
+
+REBUILD_BATCH_SIZE = 10000
+# Kept under Lua's unpack() limit
+MERGE_BATCH_SIZE = 5000
+PENDING_TTL_SECONDS = 24 * 3600
+REBUILD_LOCK_SECONDS = 3600
+
+_MERGE_LUA = """
+local moved = redis.call('SPOP', KEYS[1], ARGV[1])
+if #moved > 0 then
+    redis.call('SADD', KEYS[2], unpack(moved))
+end
+return #moved
+"""
+
+
+class PhonePresenceFilter:
+    """Service maintaining the per-tenant phone presence sets."""
+
+    def __init__(self):
+        self._merge = redis_client.register_script(_MERGE_LUA)
+
+    def _key(self, tenant_id: uuid.UUID) -> str:
+        return f"contact_pool:phones:{tenant_id}"
+
+    def _ready_key(self, tenant_id: uuid.UUID) -> str:
+        return f"{self._key(tenant_id)}:ready"
+
+    def pending_key(self, tenant_id: uuid.UUID, upload_id: uuid.UUID) -> str:
+        return f"{self._key(tenant_id)}:pending:{upload_id}"
+
+    async def ensure_ready(self, tenant_id: uuid.UUID) -> bool:
+        """
+        Whether the tenant's filter can be used, rebuilding it first if it
+        is missing. Returns False if Redis is down or another worker is
+        already rebuilding it.
+        """
+        if not settings.PHONE_FILTER_ENABLED:
+            return False
+        try:
+            if await redis_client.exists(self._ready_key(tenant_id)):
+                return True
+            return await self.rebuild(tenant_id)
+        except RedisError as e:
+            logger.warning(f"Phone filter unavailable for {tenant_id}: {e}")
+            return False
+
+    async def rebuild(self, tenant_id: uuid.UUID) -> bool:
+        """
+        Rebuild a tenant's filter from contact_pool into a scratch key and
+        swap it in. Returns False if a rebuild is already running.
+        """
+        key = self._key(tenant_id)
+        lock_key = f"{key}:rebuilding"
+        if not await redis_client.set(lock_key, 1, nx=True, ex=REBUILD_LOCK_SECONDS):
+            return False
+
+        scratch_key = f"{key}:scratch"
+        try:
+            await redis_client.delete(scratch_key)
+            async with AsyncSessionLocal() as session:
+                phones = await session.stream_scalars(
+                    select(ContactPool.phone)
+                    .where(ContactPool.tenant_id == tenant_id)
+                    .execution_options(yield_per=REBUILD_BATCH_SIZE)
+                )
+                async for partition in phones.partitions(REBUILD_BATCH_SIZE):
+                    await redis_client.sadd(scratch_key, *partition)
+
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if await redis_client.exists(scratch_key):
+                    pipe.rename(scratch_key, key)
+                else:
+                    pipe.delete(key)  # Tenant has no contacts yet
+                pipe.set(self._ready_key(tenant_id), 1)
+                await pipe.execute()
+            return True
+        finally:
+            await redis_client.delete(lock_key)
+
+    async def known(self, tenant_id: uuid.UUID, phones: List[str]) -> Optional[List[bool]]:
+        """Membership of each phone in the filter, or None if Redis failed."""
+        if not phones:
+            return []
+        try:
+            return [bool(m) for m in await redis_client.smismember(self._key(tenant_id), phones)]
+        except RedisError as e:
+            logger.warning(f"Phone filter lookup failed for {tenant_id}: {e}")
+            return None
+
+    async def stage(self, pending_key: str, phones: List[str]) -> None:
+        """Record phones of an in-flight upload (merged after its commit)."""
+        if not phones:
+            return
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.sadd(pending_key, *phones)
+            pipe.expire(pending_key, PENDING_TTL_SECONDS)
+            await pipe.execute()
+
+    async def commit_pending(self, tenant_id: uuid.UUID, pending_key: str) -> None:
+        """Merge a committed upload's phones into the tenant's filter."""
+        try:
+            while await self._merge(keys=[pending_key, self._key(tenant_id)], args=[MERGE_BATCH_SIZE]):
+                pass
+        except RedisError as e:
+            # Unmerged phones just keep going to the database
+            logger.warning(f"Could not update phone filter for {tenant_id}: {e}")
+
+    async def discard_pending(self, pending_key: str) -> None:
+        """Drop the staged phones of an upload that rolled back."""
+        try:
+            await redis_client.delete(pending_key)
+        except RedisError as e:
+            logger.warning(f"Could not discard pending phones {pending_key}: {e}")
+
+
+# Singleton instance
+phone_filter = PhonePresenceFilter()
@@ -0,0 +1,86 @@
+"""
+Phone Normalization
+
+Turns raw phone cells into E.164 numbers.
+- normalize_phone handles a single value, returning the normalized number
+  or a reject reason
+- clean_phone_number is the same without the reason
+
+Cells are cleaned with plain str.replace calls for the usual separators
+(much cheaper than regex substitution or str.translate on short strings);
+the regexes only run for the rare cell that still has something other than
+ASCII digits in it (letters, Unicode spaces, other punctuation). Rules,
+including the Israeli defaults:
+- 0XXXXXXXXX (10 digits) -> +972XXXXXXXXX
+- 972... -> +972...
+- 9 digits without a country code -> +972 prefixed
+- anything else without a + gets one
+"""
+
+import re
+from typing import Optional, Tuple
+
+# Reject reasons reported per row by normalize_phone
+REJECT_EMPTY = "empty"
+REJECT_TOO_SHORT = "too_short"
+REJECT_TOO_LONG = "too_long"
+
+MIN_DIGITS = 7
+MAX_DIGITS = 15
+
+_FORMATTING = re.compile(r'[\s\-\(\)\.]')
+_NON_DIGITS = re.compile(r'[^\d]')
+
+
+def normalize_phone(value) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Normalize one raw phone value.
+
+    Returns:
+        (E.164 number, None), or (None, reason) with reason one of
+        REJECT_EMPTY / REJECT_TOO_SHORT / REJECT_TOO_LONG.
+        None, NaN and blank values count as empty.
+    """
+    if value is None or value != value:
+        return None, REJECT_EMPTY
+    text = str(value).strip()
+    if not text:
+        return None, REJECT_EMPTY
+
+    plus = text[0] == "+"
+    digits = text[1:] if plus else text
+    if not (digits.isascii() and digits.isdigit()):
+        # Usual separators: dashes, spaces, parentheses, dots
+        digits = digits.replace("-", "").replace(" ", "").replace("(", "").replace(")", "").replace(".", "")
+    if not (digits.isascii() and digits.isdigit()):
+        # Anything else: full rules (a + may follow a separator, e.g. "(+972)")
+        compact = _FORMATTING.sub('', text)
+        plus = compact.startswith('+')
+        digits = _NON_DIGITS.sub('', compact)
+
+    # Validate length (minimum 7 digits for valid phone)
+    length = len(digits)
+    if length < MIN_DIGITS:
+        return None, REJECT_TOO_SHORT
+    if length > MAX_DIGITS:
+        return None, REJECT_TOO_LONG
+
+    # Israeli defaults only apply when there was no leading +
+    if plus:
+        return '+' + digits, None
+    if length == 10 and digits[0] == '0':
+        # Israeli format: 0501234567 -> +972501234567
+        return '+972' + digits[1:], None
+    if length == 9 and not digits.startswith('972'):
+        # Assume Israeli if no country code (missing leading 0)
+        return '+972' + digits, None
+    return '+' + digits, None
+
+
+def clean_phone_number(phone: str) -> Optional[str]:
+    """
+    Clean and validate phone number.
+    Returns None if invalid.
+    """
+    return normalize_phone(phone)[0]
+
@@ -0,0 +1,164 @@
+"""
+Pool Counter Service
+
+Maintains ContactPoolStats, the single-row-per-tenant summary of the contact
+pool that the stats endpoint reads instead of counting contact_pool:
+- Uploads add their new contacts to the total and their source file
+- Batch generation (and anything else that claims contacts) adds to assigned;
+  reclaiming stale batches subtracts the contacts it returns
+- recount() rebuilds a tenant's row exactly from contact_pool
+- estimate() answers from planner statistics without touching the counters
+"""
+
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import BigInteger, Text, select, func, literal, text
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.contacts import ContactPool, ContactPoolStats
+
+# Key used in `sources` for contacts without a source file
+NO_SOURCE = ""
+
+
+class PoolCounterService:
+    """Service for reading and maintaining per-tenant pool counters."""
+
+    async def record_upload(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        source_file: Optional[str],
+        count: int
+    ) -> None:
+        """Add an upload's new contacts (caller commits)."""
+        if count <= 0:
+            return
+        source = source_file or NO_SOURCE
+        stmt = insert(ContactPoolStats).values(
+            tenant_id=tenant_id,
+            total_contacts=count,
+            assigned=0,
+            sources={source: count},
+            updated_at=datetime.utcnow(),
+        )
+        existing = func.coalesce(ContactPoolStats.sources[source].astext.cast(BigInteger), 0)
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[ContactPoolStats.tenant_id],
+            set_={
+                "total_contacts": ContactPoolStats.total_contacts + count,
+                "sources": func.jsonb_set(
+                    ContactPoolStats.sources,
+                    literal([source], ARRAY(Text)),
+                    func.to_jsonb(existing + count),
+                ),
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ))
+
+    async def record_assigned(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        count: int
+    ) -> None:
+        """
+        Move contacts from unassigned to assigned, or back with a negative
+        count (caller commits).
+        """
+        if count == 0:
+            return
+        stmt = insert(ContactPoolStats).values(
+            tenant_id=tenant_id,
+            total_contacts=0,
+            assigned=count,
+            sources={},
+            updated_at=datetime.utcnow(),
+        )
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[ContactPoolStats.tenant_id],
+            set_={
+                "assigned": ContactPoolStats.assigned + count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ))
+
+    async def get(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID
+    ) -> Optional[ContactPoolStats]:
+        """Primary key lookup of a tenant's counters."""
+        return await session.get(ContactPoolStats, tenant_id)
+
+    async def recount(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID
+    ) -> ContactPoolStats:
+        """
+        Rebuild a tenant's counters exactly from contact_pool and commit.
+        The counter row is locked first, so uploads committing meanwhile
+        apply their increments on top of the recount instead of being lost.
+        """
+        await session.execute(
+            insert(ContactPoolStats)
+            .values(tenant_id=tenant_id, total_contacts=0, assigned=0, sources={})
+            .on_conflict_do_nothing(index_elements=[ContactPoolStats.tenant_id])
+        )
+        await session.execute(
+            select(ContactPoolStats.tenant_id)
+            .where(ContactPoolStats.tenant_id == tenant_id)
+            .with_for_update()
+        )
+
+        result = await session.execute(
+            select(
+                ContactPool.source_file,
+                func.count(ContactPool.id),
+                # NULL is_assigned counts as assigned, as it always has
+                func.count(ContactPool.id).filter(ContactPool.is_assigned.isnot(False)),
+            )
+            .where(ContactPool.tenant_id == tenant_id)
+            .group_by(ContactPool.source_file)
+        )
+        rows = result.all()
+
+        now = datetime.utcnow()
+        stats = await session.get(ContactPoolStats, tenant_id, populate_existing=True)
+        stats.total_contacts = sum(row[1] for row in rows)
+        stats.assigned = sum(row[2] for row in rows)
+        stats.sources = {(row[0] or NO_SOURCE): row[1] for row in rows}
+        stats.updated_at = now
+        stats.recounted_at = now
+        await session.commit()
+        return stats
+
+    async def _planner_rows(self, session: AsyncSession, where: str) -> int:
+        result = await session.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM contact_pool WHERE {where}"))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def estimate(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID
+    ) -> dict:
+        """
+        Approximate total/unassigned counts from the planner's row estimates
+        (table statistics), without reading contact_pool or the counters.
+        """
+        # Rendered from a UUID object, so safe to inline
+        tenant = f"tenant_id = '{uuid.UUID(str(tenant_id))}'"
+        total = await self._planner_rows(session, tenant)
+        unassigned = min(total, await self._planner_rows(session, f"{tenant} AND is_assigned = false"))
+        return {"total_contacts": total, "unassigned": unassigned}
+
+
+# Singleton instance
+pool_counters = PoolCounterService()
@@ -0,0 +1,373 @@
+"""
+Progress Reporting Service
+
+Records agent morning/evening progress and awards XP.
+
+A report is two statements:
+1. Mark the batch in progress, upsert the (agent, batch, date) progress row
+   and advance the agent's streak counter (data-modifying CTEs)
+2. Roll the day into the daily snapshot and add the earned XP
+
+Bulk syncs (offline devices) apply many idempotency-keyed reports in one
+transaction with a fixed number of set-based statements.
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, update, case, func, literal, tuple_
+from sqlalchemy.dialects.postgresql import insert, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Date, DateTime, Integer, Text
+
+from app.models.tenant import User
+from app.models.contacts import (
+    VcfBatch, VcfBatchStatus, AgentProgress, AgentDailySnapshot, ProgressSyncKey
+)
+from app.services.progress_snapshots import progress_snapshots
+
+SESSION_TYPES = ("morning", "evening")
+DAILY_GOAL = 50
+
+
+def streak_multiplier(streak_days: int) -> float:
+    """1.0 base, +0.1 per consecutive day after the first, max 1.5x."""
+    return round(min(1.5, 1.0 + 0.1 * max(0, (streak_days or 1) - 1)), 2)
+
+
+def calculate_xp(count: int, streak_days: int, morning_count: int, evening_count: int) -> int:
+    """XP for one report: streak-weighted base plus session and goal bonuses."""
+    # Base XP: 1 point per contact
+    xp = int(count * streak_multiplier(streak_days))
+
+    # Bonus for completing both sessions
+    if morning_count > 0 and evening_count > 0:
+        xp += 10
+
+    # Goal completion bonus
+    if morning_count + evening_count >= DAILY_GOAL:
+        xp += 25
+
+    return xp
+
+
+class ProgressService:
+    """Service for recording agent progress reports."""
+
+    def progress_statement(
+        self,
+        agent_id: uuid.UUID,
+        batch_id: uuid.UUID,
+        day: date,
+        session_type: str,
+        count: int,
+        notes: Optional[str],
+        now: datetime
+    ):
+        """
+        Statement 1: returns (streak_days, morning_count, evening_count),
+        or no row if the batch is not assigned to the agent.
+        """
+        # Only the agent's own batch; ASSIGNED -> IN_PROGRESS on first report
+        batch = (
+            update(VcfBatch)
+            .where(VcfBatch.id == batch_id)
+            .where(VcfBatch.agent_id == agent_id)
+            .values(status=case(
+                (VcfBatch.status == VcfBatchStatus.ASSIGNED.value, VcfBatchStatus.IN_PROGRESS.value),
+                else_=VcfBatch.status
+            ))
+            .returning(VcfBatch.id)
+            .cte("batch")
+        )
+
+        count_col = f"{session_type}_count"
+        reported_col = f"{session_type}_reported_at"
+        other_count_col = "evening_count" if session_type == "morning" else "morning_count"
+
+        progress_insert = insert(AgentProgress).from_select(
+            ["id", "agent_id", "vcf_batch_id", "date", count_col, reported_col, other_count_col, "notes"],
+            select(
+                literal(uuid.uuid4(), UUID(as_uuid=True)),
+                literal(agent_id, UUID(as_uuid=True)),
+                batch.c.id,
+                literal(day, Date),
+                literal(count, Integer),
+                literal(now, DateTime),
+                literal(0, Integer),
+                literal(notes, Text),
+            )
+        )
+        progress = (
+            progress_insert.on_conflict_do_update(
+                index_elements=[AgentProgress.agent_id, AgentProgress.vcf_batch_id, AgentProgress.date],
+                set_={
+                    count_col: progress_insert.excluded[count_col],
+                    reported_col: progress_insert.excluded[reported_col],
+                    "notes": func.coalesce(progress_insert.excluded.notes, AgentProgress.notes),
+                },
+            )
+            .returning(AgentProgress.agent_id, AgentProgress.morning_count, AgentProgress.evening_count)
+            .cte("progress")
+        )
+
+        # Streak: unchanged if already counted (same or backdated day),
+        # +1 if the last active day was the day before, else restart
+        return (
+            update(User)
+            .where(User.id == progress.c.agent_id)
+            .values(
+                streak_days=case(
+                    (User.streak_last_date >= day, func.coalesce(User.streak_days, 1)),
+                    (User.streak_last_date == day - timedelta(days=1), func.coalesce(User.streak_days, 0) + 1),
+                    else_=1
+                ),
+                streak_last_date=func.greatest(func.coalesce(User.streak_last_date, day), day),
+                last_activity_at=now,
+            )
+            .returning(User.streak_days, progress.c.morning_count, progress.c.evening_count)
+            .execution_options(synchronize_session=False)
+        )
+
+    def award_statement(self, agent_id: uuid.UUID, day: date, xp: int):
+        """Statement 2: refresh the daily snapshot and add XP; returns the new score."""
+        snapshot = (
+            progress_snapshots.upsert_statement(day, agent_id)
+            .returning(AgentDailySnapshot.agent_id)
+            .cte("snapshot")
+        )
+        return (
+            update(User)
+            .where(User.id == agent_id)
+            .values(current_score=func.coalesce(User.current_score, 0) + xp)
+            .returning(User.current_score)
+            .add_cte(snapshot)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def report(
+        self,
+        session: AsyncSession,
+        agent_id: uuid.UUID,
+        batch_id: uuid.UUID,
+        session_type: str,
+        count: int,
+        notes: Optional[str] = None,
+        day: Optional[date] = None
+    ) -> Optional[dict]:
+        """
+        Record a morning/evening count for a batch and award XP (caller commits).
+
+        Returns:
+            Result dict, or None if the batch is not assigned to the agent
+        """
+        now = datetime.utcnow()
+        day = day or now.date()
+
+        result = await session.execute(
+            self.progress_statement(agent_id, batch_id, day, session_type, count, notes, now)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        streak_days, morning_count, evening_count = row
+        morning_count = morning_count or 0
+        evening_count = evening_count or 0
+
+        xp_earned = calculate_xp(count, streak_days, morning_count, evening_count)
+        result = await session.execute(self.award_statement(agent_id, day, xp_earned))
+        total_xp = result.scalar()
+
+        return {
+            "status": "success",
+            "date": day.isoformat(),
+            "morning_count": morning_count,
+            "evening_count": evening_count,
+            "total_today": morning_count + evening_count,
+            "xp_earned": xp_earned,
+            "total_xp": total_xp,
+            "streak_days": streak_days,
+            "streak_multiplier": streak_multiplier(streak_days)
+        }
+
+    async def sync(
+        self,
+        session: AsyncSession,
+        agent_id: uuid.UUID,
+        items: List
+    ) -> List[dict]:
+        """
+        Apply a batch of offline progress reports (caller commits).
+        
+        Each item has idempotency_key, batch_id, date, session_type, count
+        and notes. Items are applied in order, as if reported one by one;
+        keys seen before return their stored result.
+        
+        Returns:
+            One result dict per item, in input order
+        """
+        now = datetime.utcnow()
+        today = now.date()
+        
+        # Serialize syncs for this agent; also gives us the streak state
+        agent_row = (await session.execute(
+            select(User.streak_days, User.streak_last_date)
+            .where(User.id == agent_id)
+            .with_for_update()
+        )).first()
+        streak, last_date = (agent_row[0] or 0), agent_row[1]
+        
+        keys = list({item.idempotency_key for item in items})
+        stored = dict((await session.execute(
+            select(ProgressSyncKey.idempotency_key, ProgressSyncKey.result)
+            .where(ProgressSyncKey.agent_id == agent_id)
+            .where(ProgressSyncKey.idempotency_key.in_(keys))
+        )).all())
+        
+        batch_ids = list({item.batch_id for item in items})
+        owned = set((await session.execute(
+            select(VcfBatch.id)
+            .where(VcfBatch.agent_id == agent_id)
+            .where(VcfBatch.id.in_(batch_ids))
+        )).scalars().all())
+        
+        # Triage
+        results: List[Optional[dict]] = [None] * len(items)
+        to_apply = []
+        seen_keys = set()
+        for i, item in enumerate(items):
+            key = item.idempotency_key
+            if key in stored:
+                results[i] = {**(stored[key] or {}), "idempotency_key": key, "status": "duplicate"}
+            elif key in seen_keys:
+                results[i] = {"idempotency_key": key, "status": "duplicate"}
+            elif item.session_type not in SESSION_TYPES:
+                results[i] = {"idempotency_key": key, "status": "error", "detail": "Invalid session_type"}
+            elif item.batch_id not in owned:
+                results[i] = {"idempotency_key": key, "status": "error", "detail": "Batch not found"}
+            elif item.date > today:
+                results[i] = {"idempotency_key": key, "status": "error", "detail": "Date is in the future"}
+            else:
+                to_apply.append((i, item))
+            seen_keys.add(key)
+        
+        if not to_apply:
+            return results
+        
+        # Current counts for every (batch, date) touched
+        pairs = list({(item.batch_id, item.date) for _, item in to_apply})
+        existing = await session.execute(
+            select(
+                AgentProgress.vcf_batch_id, AgentProgress.date,
+                AgentProgress.morning_count, AgentProgress.evening_count
+            )
+            .where(AgentProgress.agent_id == agent_id)
+            .where(tuple_(AgentProgress.vcf_batch_id, AgentProgress.date).in_(pairs))
+        )
+        rows = {
+            (batch_id, day): {
+                "morning_count": morning or 0,
+                "evening_count": evening or 0,
+                "morning_reported_at": None,
+                "evening_reported_at": None,
+                "notes": None,
+            }
+            for batch_id, day, morning, evening in existing.all()
+        }
+        
+        # Streak as of each reported day (same rules as a single report)
+        streak_on = {}
+        for day in sorted({item.date for _, item in to_apply}):
+            if last_date is None or day > last_date:
+                streak = streak + 1 if last_date is not None and day == last_date + timedelta(days=1) else 1
+                last_date = day
+            streak_on[day] = streak or 1
+        
+        # Replay items in order against running counts
+        total_xp = 0
+        new_keys = []
+        for i, item in to_apply:
+            row = rows.setdefault((item.batch_id, item.date), {
+                "morning_count": 0, "evening_count": 0,
+                "morning_reported_at": None, "evening_reported_at": None, "notes": None,
+            })
+            row[f"{item.session_type}_count"] = item.count
+            row[f"{item.session_type}_reported_at"] = now
+            if item.notes:
+                row["notes"] = item.notes
+            
+            xp = calculate_xp(item.count, streak_on[item.date], row["morning_count"], row["evening_count"])
+            total_xp += xp
+            results[i] = {
+                "idempotency_key": item.idempotency_key,
+                "status": "applied",
+                "batch_id": str(item.batch_id),
+                "date": item.date.isoformat(),
+                "morning_count": row["morning_count"],
+                "evening_count": row["evening_count"],
+                "xp_earned": xp,
+                "streak_multiplier": streak_multiplier(streak_on[item.date]),
+            }
+            new_keys.append({
+                "agent_id": agent_id,
+                "idempotency_key": item.idempotency_key,
+                "result": results[i],
+                "created_at": now,
+            })
+        
+        # Set-based writes
+        # One row per touched (batch, date), carrying its final counts.
+        # Single reports don't take the agent lock, so a session column no
+        # replayed item touched (reported_at still NULL) keeps the stored
+        # value rather than the one read above.
+        upsert = insert(AgentProgress).values([
+            {"id": uuid.uuid4(), "agent_id": agent_id, "vcf_batch_id": batch_id, "date": day, **rows[(batch_id, day)]}
+            for batch_id, day in pairs
+        ])
+        await session.execute(upsert.on_conflict_do_update(
+            index_elements=[AgentProgress.agent_id, AgentProgress.vcf_batch_id, AgentProgress.date],
+            set_={
+                "morning_count": case(
+                    (upsert.excluded.morning_reported_at.is_not(None), upsert.excluded.morning_count),
+                    else_=AgentProgress.morning_count
+                ),
+                "evening_count": case(
+                    (upsert.excluded.evening_reported_at.is_not(None), upsert.excluded.evening_count),
+                    else_=AgentProgress.evening_count
+                ),
+                "morning_reported_at": func.coalesce(upsert.excluded.morning_reported_at, AgentProgress.morning_reported_at),
+                "evening_reported_at": func.coalesce(upsert.excluded.evening_reported_at, AgentProgress.evening_reported_at),
+                "notes": func.coalesce(upsert.excluded.notes, AgentProgress.notes),
+            },
+        ))
+        
+        await session.execute(
+            update(VcfBatch)
+            .where(VcfBatch.id.in_({batch_id for batch_id, _ in pairs}))
+            .where(VcfBatch.status == VcfBatchStatus.ASSIGNED.value)
+            .values(status=VcfBatchStatus.IN_PROGRESS.value)
+            .execution_options(synchronize_session=False)
+        )
+        
+        await session.execute(
+            update(User)
+            .where(User.id == agent_id)
+            .values(
+                current_score=func.coalesce(User.current_score, 0) + total_xp,
+                streak_days=streak,
+                streak_last_date=last_date,
+                last_activity_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        
+        for day in sorted({day for _, day in pairs}):
+            await session.execute(progress_snapshots.upsert_statement(day, agent_id))
+        
+        await session.execute(insert(ProgressSyncKey).values(new_keys).on_conflict_do_nothing())
+        
+        return results
+
+
+# Singleton instance
+progress_service = ProgressService()
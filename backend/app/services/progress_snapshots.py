@@ -0,0 +1,181 @@
+"""
+Progress Snapshot Service
+
+Maintains AgentDailySnapshot, the per-agent daily rollup of AgentProgress.
+- Progress reports upsert the reporting agent's row for that day
+- The nightly compaction job rebuilds recent days for every agent
+- Summary/trend reads go straight to the snapshot table
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, func, and_, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.tenant import User
+from app.models.contacts import AgentProgress, AgentDailySnapshot
+
+
+class ProgressSnapshotService:
+    """Service for writing and reading daily agent progress snapshots."""
+
+    def upsert_statement(self, day: date, agent_id: Optional[uuid.UUID] = None):
+        """
+        INSERT ... SELECT of the day's totals per agent, ON CONFLICT update.
+        The streak continues from the previous day's snapshot, if any.
+        """
+        prev = aliased(AgentDailySnapshot, name="prev")
+        morning = func.coalesce(func.sum(AgentProgress.morning_count), 0)
+        evening = func.coalesce(func.sum(AgentProgress.evening_count), 0)
+
+        totals = (
+            select(
+                User.tenant_id,
+                AgentProgress.agent_id,
+                AgentProgress.date,
+                morning,
+                evening,
+                morning + evening,
+                func.coalesce(prev.streak, 0) + 1,
+                literal(datetime.utcnow()),
+            )
+            .select_from(AgentProgress)
+            .join(User, User.id == AgentProgress.agent_id)
+            .outerjoin(prev, and_(
+                prev.agent_id == AgentProgress.agent_id,
+                prev.date == day - timedelta(days=1)
+            ))
+            .where(AgentProgress.date == day)
+            .group_by(User.tenant_id, AgentProgress.agent_id, AgentProgress.date, prev.streak)
+        )
+        if agent_id is not None:
+            totals = totals.where(AgentProgress.agent_id == agent_id)
+
+        stmt = insert(AgentDailySnapshot).from_select(
+            [
+                "tenant_id", "agent_id", "date", "morning_count",
+                "evening_count", "total_count", "streak", "updated_at",
+            ],
+            totals,
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[AgentDailySnapshot.agent_id, AgentDailySnapshot.date],
+            set_={
+                "morning_count": stmt.excluded.morning_count,
+                "evening_count": stmt.excluded.evening_count,
+                "total_count": stmt.excluded.total_count,
+                "streak": stmt.excluded.streak,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+
+    async def upsert_agent_day(
+        self,
+        session: AsyncSession,
+        agent_id: uuid.UUID,
+        day: date
+    ) -> None:
+        """Refresh one agent's snapshot for a day (caller commits)."""
+        await session.execute(self.upsert_statement(day, agent_id))
+
+    async def compact(
+        self,
+        session: AsyncSession,
+        start: date,
+        end: date
+    ) -> int:
+        """
+        Rebuild snapshots for every agent from start to end (inclusive).
+        Days are processed in order so streaks carry forward correctly.
+
+        Returns:
+            Number of snapshot rows written
+        """
+        written = 0
+        day = start
+        while day <= end:
+            result = await session.execute(self.upsert_statement(day))
+            written += result.rowcount or 0
+            day += timedelta(days=1)
+        await session.commit()
+        return written
+
+    async def get_agent_day(
+        self,
+        session: AsyncSession,
+        agent_id: uuid.UUID,
+        day: date
+    ) -> Optional[AgentDailySnapshot]:
+        """Primary key lookup of one agent's snapshot."""
+        return await session.get(AgentDailySnapshot, (agent_id, day))
+
+    async def get_agent_history(
+        self,
+        session: AsyncSession,
+        agent_id: uuid.UUID,
+        start: date,
+        end: date
+    ) -> List[AgentDailySnapshot]:
+        """An agent's snapshots for a date range, oldest first."""
+        result = await session.execute(
+            select(AgentDailySnapshot)
+            .where(AgentDailySnapshot.agent_id == agent_id)
+            .where(AgentDailySnapshot.date.between(start, end))
+            .order_by(AgentDailySnapshot.date)
+        )
+        return result.scalars().all()
+
+    async def get_tenant_snapshots(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        start: date,
+        end: date
+    ) -> List[AgentDailySnapshot]:
+        """All agents' snapshots for a tenant and date range."""
+        result = await session.execute(
+            select(AgentDailySnapshot)
+            .where(AgentDailySnapshot.tenant_id == tenant_id)
+            .where(AgentDailySnapshot.date.between(start, end))
+            .order_by(AgentDailySnapshot.date, AgentDailySnapshot.agent_id)
+        )
+        return result.scalars().all()
+
+    async def get_tenant_trend(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        start: date,
+        end: date
+    ) -> List[dict]:
+        """Per-day totals for a tenant over a date range."""
+        result = await session.execute(
+            select(
+                AgentDailySnapshot.date,
+                func.count(AgentDailySnapshot.agent_id),
+                func.sum(AgentDailySnapshot.morning_count),
+                func.sum(AgentDailySnapshot.evening_count),
+                func.sum(AgentDailySnapshot.total_count),
+            )
+            .where(AgentDailySnapshot.tenant_id == tenant_id)
+            .where(AgentDailySnapshot.date.between(start, end))
+            .group_by(AgentDailySnapshot.date)
+            .order_by(AgentDailySnapshot.date)
+        )
+        return [
+            {
+                "date": row[0].isoformat(),
+                "agents_reported": row[1],
+                "morning_total": row[2] or 0,
+                "evening_total": row[3] or 0,
+                "day_total": row[4] or 0,
+            }
+            for row in result.all()
+        ]
+
+
+# Singleton instance
+progress_snapshots = ProgressSnapshotService()
@@ -0,0 +1,208 @@
+"""
+vCard Codec
+
+The one place vCard text is produced and read:
+- encode_card / encode_cards render vCard 3.0 cards, escaping names per
+  RFC 2426 so `;`, `,`, `\\` and newlines can no longer break a card
+  (phones are kept on one line).
+  encode_cards is the batch form over name/phone sequences, used by the
+  VCF generator and the WhatsApp importer
+- international_tel is the phone fixup VCF batches have always applied
+- parse_vcards reads cards from any iterable of lines (a file, a stream),
+  one card at a time: folded lines, property groups, parameters, tel: URIs
+  and vCard 2.1 quoted-printable values are handled
+"""
+
+import quopri
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+TEL_TYPE_CELL = "CELL"
+
+_LINE_BREAKS = re.compile(r"[\r\n]+")
+_ESCAPES = str.maketrans({"\\": "\\\\", ";": "\\;", ",": "\\,", "\n": "\\n"})
+_ESCAPED = re.compile(r"\\(.?)", re.DOTALL)
+_UNESCAPES = {"n": "\n", "N": "\n", "\\": "\\", ";": ";", ",": ","}
+
+
+class VCard(NamedTuple):
+    """A parsed card: display name (may be empty) and its phone numbers."""
+    name: str
+    tels: List[str]
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT value (RFC 2426 section 4)."""
+    # Plain membership tests: far cheaper than a regex search per name
+    if value.isalnum() or not (
+        "\\" in value or ";" in value or "," in value or "\n" in value or "\r" in value
+    ):
+        return value
+    if "\r" in value:
+        value = value.replace("\r\n", "\n").replace("\r", "\n")
+    return value.translate(_ESCAPES)
+
+
+def unescape_text(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _ESCAPED.sub(lambda match: _UNESCAPES.get(match.group(1), match.group(1)), value)
+
+
+def international_tel(phone: str) -> str:
+    """Strip spaces/dashes and add a + prefix (+972 for local 0-numbers)."""
+    phone = phone.strip().replace(" ", "").replace("-", "")
+    if not phone.startswith("+"):
+        # Assume Israeli number if no country code
+        if phone.startswith("0"):
+            phone = "+972" + phone[1:]
+        else:
+            phone = "+" + phone
+    return phone
+
+
+def _tel_params(tel_type: Optional[str]) -> str:
+    return f";TYPE={tel_type}" if tel_type else ""
+
+
+def encode_card(name: str, tel: str, tel_type: Optional[str] = TEL_TYPE_CELL) -> str:
+    """Render one vCard 3.0 card."""
+    return next(encode_cards((name,), (tel,), tel_type))
+
+
+def encode_cards(
+    names: Iterable[str],
+    tels: Iterable[str],
+    tel_type: Optional[str] = TEL_TYPE_CELL,
+    escaped: bool = False
+) -> Iterator[str]:
+    """
+    Lazily render one card per (name, tel) pair. With escaped=True the
+    names are taken as already escaped (e.g. built from escape_text output).
+    """
+    params = _tel_params(tel_type)
+    # Checks are inlined and the card is an f-string: this loop is the hot
+    # path of every VCF render, and plain names must cost next to nothing
+    for name, tel in zip(names, tels):
+        if not (escaped or name.isalnum()):
+            name = escape_text(name)
+        if "\n" in tel or "\r" in tel:
+            # TEL is not a TEXT value (no backslash escapes); only keep it on one line
+            tel = _LINE_BREAKS.sub(" ", tel)
+        yield f"BEGIN:VCARD\nVERSION:3.0\nFN:{name}\nTEL{params}:{tel}\nEND:VCARD\n"
+
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Join folded continuation lines and quoted-printable soft breaks."""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if current is not None and line[:1] in (" ", "\t"):
+            current += line[1:]
+            continue
+        if current is not None and current.endswith("=") and "QUOTED-PRINTABLE" in current.split(":", 1)[0].upper():
+            # vCard 2.1 soft line break inside a quoted-printable value
+            current = current[:-1] + line
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _split_property(line: str):
+    """(NAME, {PARAM: value}, raw value) of a content line, or None."""
+    head, sep, value = line.partition(":")
+    if not sep:
+        return None
+    if ";" not in head:
+        return head.rsplit(".", 1)[-1].upper(), {}, value
+    parts = head.split(";")
+    name = parts[0].rsplit(".", 1)[-1].upper()  # Drop any group prefix
+    params = {}
+    for param in parts[1:]:
+        key, eq, param_value = param.partition("=")
+        if eq:
+            params[key.upper()] = param_value
+        elif key.upper() in ("QUOTED-PRINTABLE", "BASE64"):
+            # vCard 2.1 bare encoding parameter
+            params["ENCODING"] = key
+        else:
+            # vCard 2.1 bare type parameter (e.g. TEL;CELL)
+            params.setdefault("TYPE", key)
+    return name, params, value
+
+
+def _is_quoted_printable(params: dict) -> bool:
+    return params.get("ENCODING", "").upper() == "QUOTED-PRINTABLE"
+
+
+def _decode_value(params: dict, value: str) -> str:
+    if _is_quoted_printable(params):
+        charset = params.get("CHARSET", "utf-8")
+        try:
+            return quopri.decodestring(value.encode("ascii", "replace")).decode(charset, "replace")
+        except LookupError:
+            return quopri.decodestring(value.encode("ascii", "replace")).decode("utf-8", "replace")
+    return unescape_text(value)
+
+
+def _tel_value(value: str) -> str:
+    if value[:4].lower() == "tel:":
+        value = value[4:]
+    return value.split(";", 1)[0].strip()  # Drop URI parameters (;ext=...)
+
+
+def parse_vcards(lines: Iterable[str]) -> Iterator[VCard]:
+    """
+    Stream the cards in an iterable of lines. Cards without a phone are
+    still yielded (with an empty tels list); text outside cards is ignored.
+    """
+    in_card = False
+    name = ""
+    structured_name = ""
+    tels: List[str] = []
+    for line in _unfold(lines):
+        prop = _split_property(line)
+        if prop is None:
+            continue
+        prop_name, params, value = prop
+        if prop_name == "BEGIN" and value.strip().upper() == "VCARD":
+            in_card, name, structured_name, tels = True, "", "", []
+        elif not in_card:
+            continue
+        elif prop_name == "END" and value.strip().upper() == "VCARD":
+            in_card = False
+            yield VCard(name or structured_name, tels)
+        elif prop_name == "FN":
+            name = _decode_value(params, value).strip()
+        elif prop_name == "N":
+            # Family;Given;... -> "Given Family"
+            if _is_quoted_printable(params):
+                parts = _decode_value(params, value).split(";")
+            else:
+                parts = [unescape_text(part) for part in _split_components(value)]
+            structured_name = " ".join(part.strip() for part in reversed(parts[:2]) if part.strip())
+        elif prop_name == "TEL":
+            tel = _tel_value(value)
+            if tel:
+                tels.append(tel)
+
+
+def _split_components(value: str) -> List[str]:
+    """Split a structured value on unescaped semicolons."""
+    parts, current, escaped = [], [], False
+    for char in value:
+        if escaped:
+            current.append("\\" + char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == ";":
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts
@@ -0,0 +1,165 @@
+"""
+VCF Bundle Service
+
+Streams several VCF batches as one compressed download:
+- ZIP: one .vcf entry per batch, deflated entry by entry into an
+  unseekable sink that is drained after every write, so the archive is
+  never held in memory (entries use data descriptors)
+- gzip: the batches concatenated into a single gzipped .vcf, which phones
+  import as one contact file
+
+Batch contents come from the stored file, or with VCF_RENDER_ON_DEMAND from
+the render cache / the batch's contacts. vCard text compresses ~10x.
+"""
+
+import asyncio
+import io
+import os
+import uuid
+import zipfile
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, BinaryIO, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.contacts import VcfBatch
+from app.services.vcf_cache import vcf_cache
+from app.services.vcf_generator import vcf_generator
+
+READ_BLOCK_SIZE = 64 * 1024
+MAX_BUNDLE_BATCHES = 200
+COMPRESS_LEVEL = 6
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target collecting bytes until drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def read_stream(f: BinaryIO) -> AsyncIterator[bytes]:
+    """Read an open file in blocks, closing it when done."""
+    with f:
+        while True:
+            block = await asyncio.to_thread(f.read, READ_BLOCK_SIZE)
+            if not block:
+                break
+            yield block
+
+
+def read_file(path: str) -> AsyncIterator[bytes]:
+    """
+    Raises:
+        FileNotFoundError: if the file does not exist (opened right away)
+    """
+    return read_stream(open(path, "rb"))
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip a byte stream incrementally."""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = await asyncio.to_thread(compressor.compress, chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class VcfBundleService:
+    """Service for streaming compressed multi-batch VCF downloads."""
+
+    async def select_batches(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        agent_id: Optional[uuid.UUID] = None,
+        status: Optional[str] = None,
+        batch_ids: Optional[List[uuid.UUID]] = None
+    ) -> List[VcfBatch]:
+        """Batches of a tenant matching the filters, oldest first (capped)."""
+        query = select(VcfBatch).where(VcfBatch.tenant_id == tenant_id)
+        if agent_id:
+            query = query.where(VcfBatch.agent_id == agent_id)
+        if status:
+            query = query.where(VcfBatch.status == status)
+        if batch_ids:
+            query = query.where(VcfBatch.id.in_(batch_ids))
+        result = await session.execute(
+            query.order_by(VcfBatch.created_at, VcfBatch.id).limit(MAX_BUNDLE_BATCHES)
+        )
+        return result.scalars().all()
+
+    def has_content(self, batch: VcfBatch) -> bool:
+        if settings.VCF_RENDER_ON_DEMAND:
+            return True
+        return bool(batch.file_path) and os.path.exists(batch.file_path)
+
+    async def batch_content(self, batch: VcfBatch) -> AsyncIterator[bytes]:
+        """A batch's VCF bytes, from wherever this deployment keeps them."""
+        if not settings.VCF_RENDER_ON_DEMAND:
+            async for block in read_file(batch.file_path):
+                yield block
+            return
+
+        async with AsyncSessionLocal() as session:
+            key, digest = await vcf_generator.render_key(session, batch)
+        cached = vcf_cache.open(key)
+        chunks = read_stream(cached) if cached else vcf_generator.stream_batch(batch, digest, cache_key=key)
+        async for chunk in chunks:
+            yield chunk
+
+    async def stream_zip(self, batches: List[VcfBatch]) -> AsyncIterator[bytes]:
+        """ZIP archive with one entry per batch (missing files are skipped)."""
+        sink = _ChunkSink()
+        names = set()
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as archive:
+            for batch in batches:
+                if not self.has_content(batch):
+                    continue
+                name = batch.file_name or f"contacts_{batch.id}.vcf"
+                if name in names:
+                    name = f"{batch.id}_{name}"
+                names.add(name)
+
+                info = zipfile.ZipInfo(name, date_time=(batch.created_at or datetime.utcnow()).timetuple()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with archive.open(info, mode="w", force_zip64=True) as entry:
+                    async for chunk in self.batch_content(batch):
+                        await asyncio.to_thread(entry.write, chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                yield sink.drain()
+        # Central directory
+        yield sink.drain()
+
+    async def stream_gzip(self, batches: List[VcfBatch]) -> AsyncIterator[bytes]:
+        """All batches concatenated into one gzipped VCF."""
+        async def contents():
+            for batch in batches:
+                if self.has_content(batch):
+                    async for chunk in self.batch_content(batch):
+                        yield chunk
+
+        async for data in gzip_chunks(contents()):
+            yield data
+
+
+# Singleton instance
+vcf_bundles = VcfBundleService()
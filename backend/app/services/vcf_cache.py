@@ -0,0 +1,102 @@
+"""
+VCF Render Cache
+
+Size-bounded local disk cache of rendered VCF files, used when batches are
+rendered on demand instead of being stored at generation time:
+- Entries are keyed by a hash of everything that determines the content
+  (render settings plus the batch's phones), so a key never goes stale and
+  doubles as the download ETag
+- Entries are written to a temp file while the response streams and only
+  become visible once complete
+- Hits refresh the entry's mtime; the least recently used entries are
+  evicted once the cache outgrows VCF_CACHE_MAX_BYTES. Hits are handed out
+  as open files, which stay readable if the entry is evicted meanwhile
+"""
+
+import logging
+import os
+import uuid
+from typing import BinaryIO, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class VcfCacheEntry:
+    """An entry being written; invisible to readers until committed."""
+
+    def __init__(self, cache: "VcfCache", key: str):
+        self.cache = cache
+        self.path = cache.path(key)
+        self.tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        self.size = 0
+        self._file = open(self.tmp_path, "wb")
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+        self.size += len(data)
+
+    def commit(self) -> None:
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+        self.cache.evict()
+
+    def discard(self) -> None:
+        self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class VcfCache:
+    """Content-keyed LRU cache of rendered VCF files on local disk."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.vcf")
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """A cached entry opened for reading (marked as recently used), or None."""
+        try:
+            f = open(self.path(key), "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(f.fileno())
+        except OSError:
+            pass  # Evicted since it was opened: still readable, just not refreshed
+        return f
+
+    def create(self, key: str) -> VcfCacheEntry:
+        return VcfCacheEntry(self, key)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits its bound."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".vcf") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue  # Evicted concurrently
+            total -= size
+            if total <= self.max_bytes:
+                break
+        logger.debug(f"VCF cache evicted down to {total} bytes")
+
+
+# Singleton instance
+vcf_cache = VcfCache(settings.VCF_CACHE_DIR, settings.VCF_CACHE_MAX_BYTES)
@@ -6,16 +6,59 @@ Serial naming logic:
 - Each contact gets a name like "LEG001"
 - The serial number increments every N contacts (default: 25)
 - This allows agents to add 25 contacts at a time with the same name prefix
+- Serial ranges are reserved from a per-tenant counter, so separate
+  generation runs never reuse a serial
+- With VCF_RENDER_ON_DEMAND, no files are stored at generation time;
+  downloads render from the batch's contacts (see stream_batch)
 """
 
+import asyncio
+import hashlib
 import os
 import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Tuple
-from sqlalchemy import select, update
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Tuple
+from sqlalchemy import select, update, text, func, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.contacts import ContactPool, VcfBatch, VcfBatchStatus
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.contacts import ContactPool, VcfBatch, VcfBatchStatus, VcfSerialCounter
+from app.services.pool_counters import pool_counters
+from app.services.vcard import encode_card, encode_cards, escape_text, international_tel
+from app.services.vcf_cache import vcf_cache
+from app.services.vcf_writer import write_vcf, write_vcf_atomic
+
+if TYPE_CHECKING:
+    from app.api.pagination import PageParams
+
+# Part of every render cache key; bump when the vCard output format changes
+RENDER_VERSION = 1
+STREAM_BATCH_SIZE = 1000
+
+_render_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_render_executor() -> ProcessPoolExecutor:
+    # Created lazily so importing the app does not fork workers
+    global _render_executor
+    if _render_executor is None:
+        _render_executor = ProcessPoolExecutor(max_workers=settings.VCF_RENDER_WORKERS)
+    return _render_executor
+
+
+def _render_batch_file(
+    path: str,
+    phones: List[str],
+    prefix: str,
+    start_serial: int,
+    contacts_per_serial: int
+) -> int:
+    # Runs in a render worker process
+    return write_vcf_atomic(path, vcf_generator.render_batch(phones, prefix, start_serial, contacts_per_serial))
 
 
 class VcfGeneratorService:
@@ -29,21 +72,7 @@ class VcfGeneratorService:
     
     def generate_vcard(self, name: str, phone: str) -> str:
         """Generate a single vCard entry."""
-        # Clean phone number (remove spaces, ensure + prefix for international)
-        phone = phone.strip().replace(" ", "").replace("-", "")
-        if not phone.startswith("+"):
-            # Assume Israeli number if no country code
-            if phone.startswith("0"):
-                phone = "+972" + phone[1:]
-            else:
-                phone = "+" + phone
-        
-        return f"""BEGIN:VCARD
-VERSION:3.0
-FN:{name}
-TEL;TYPE=CELL:{phone}
-END:VCARD
-"""
+        return encode_card(name, international_tel(phone))
     
     def generate_serial_name(self, prefix: str, serial: int) -> str:
         """
@@ -52,6 +81,128 @@ END:VCARD
         """
         return f"{prefix}{serial:03d}"
     
+    def render_batch(
+        self,
+        phones: List[str],
+        prefix: str,
+        start_serial: int,
+        contacts_per_serial: int,
+        offset: int = 0
+    ) -> Iterator[str]:
+        """
+        Lazily render a batch's vCards. Every contacts_per_serial contacts
+        share one serial name, starting at start_serial. offset is the
+        position of phones[0] within the batch.
+        """
+        # Serial digits never need escaping, so escaping the prefix once covers every name
+        prefix = escape_text(prefix)
+        names = (
+            self.generate_serial_name(prefix, start_serial + index // contacts_per_serial)
+            for index in range(offset, offset + len(phones))
+        )
+        return encode_cards(names, map(international_tel, phones), escaped=True)
+    
+    async def claim_contacts(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        batch_id: uuid.UUID,
+        limit: int
+    ) -> List[str]:
+        """
+        Atomically assign up to `limit` of the oldest unassigned contacts to
+        a batch and return their phones, oldest first (caller commits).
+        Rows locked by a concurrent claim are skipped, so parallel generators
+        never share contacts and never wait on each other.
+        """
+        claimable = (
+            select(ContactPool.id)
+            .where(ContactPool.tenant_id == tenant_id)
+            .where(ContactPool.is_assigned == False)
+            .order_by(ContactPool.uploaded_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            update(ContactPool)
+            .where(ContactPool.id.in_(claimable.scalar_subquery()))
+            .values(vcf_batch_id=batch_id, is_assigned=True)
+            .returning(ContactPool.phone, ContactPool.uploaded_at, ContactPool.id)
+            .execution_options(synchronize_session=False)
+        )
+        # Same order stream_batch renders in
+        rows = sorted(result.all(), key=lambda row: (row[1] or datetime.min, row[2]))
+        return [row[0] for row in rows]
+    
+    async def claim_contacts_for_batches(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        batch_ids: List[uuid.UUID],
+        contacts_per_batch: int
+    ) -> List[List[str]]:
+        """
+        Claim contacts for several batches with one statement (caller
+        commits). The oldest unassigned contacts fill the batches in order,
+        so only the last non-empty batch can be short. Returns the phones of
+        each batch, oldest first; trailing batches may get none.
+        """
+        result = await session.execute(
+            text("""
+                WITH claimable AS (
+                    SELECT id, uploaded_at
+                    FROM contact_pool
+                    WHERE tenant_id = :tenant_id AND is_assigned = false
+                    ORDER BY uploaded_at
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                ), numbered AS (
+                    SELECT id, row_number() OVER (ORDER BY uploaded_at, id) - 1 AS n
+                    FROM claimable
+                )
+                UPDATE contact_pool AS c
+                SET is_assigned = true,
+                    vcf_batch_id = (CAST(:batch_ids AS uuid[]))[numbered.n / :per_batch + 1]
+                FROM numbered
+                WHERE c.id = numbered.id
+                RETURNING numbered.n, c.phone
+            """),
+            {
+                "tenant_id": tenant_id,
+                "limit": len(batch_ids) * contacts_per_batch,
+                "batch_ids": list(batch_ids),
+                "per_batch": contacts_per_batch,
+            }
+        )
+        phones: List[List[str]] = [[] for _ in batch_ids]
+        for n, phone in sorted(result.all()):
+            phones[n // contacts_per_batch].append(phone)
+        return phones
+    
+    async def allocate_serials(
+        self,
+        session: AsyncSession,
+        tenant_id: uuid.UUID,
+        count: int
+    ) -> int:
+        """
+        Reserve `count` consecutive serials for a tenant and return the first
+        (caller commits). The counter row stays locked until commit, so
+        concurrent runs get disjoint ranges and a rolled-back run hands its
+        range back instead of leaving a gap.
+        """
+        stmt = insert(VcfSerialCounter).values(tenant_id=tenant_id, next_serial=1 + count)
+        result = await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[VcfSerialCounter.tenant_id],
+                set_={"next_serial": VcfSerialCounter.next_serial + count},
+            ).returning(VcfSerialCounter.next_serial)
+        )
+        return result.scalar_one() - count
+    
+    def serials_needed(self, contact_count: int, contacts_per_serial: int) -> int:
+        return (contact_count + contacts_per_serial - 1) // contacts_per_serial
+    
     async def generate_vcf_batch(
         self,
         session: AsyncSession,
@@ -59,7 +210,7 @@ END:VCARD
         prefix: str = "LEG",
         contacts_per_batch: int = 1500,
         contacts_per_serial: int = 25,
-        start_serial: int = 1
+        start_serial: Optional[int] = None
     ) -> Optional[VcfBatch]:
         """
         Generate a VCF batch from unassigned contacts in the pool.
@@ -70,69 +221,43 @@ END:VCARD
             prefix: Serial name prefix (e.g., "LEG")
             contacts_per_batch: Max contacts per VCF file
             contacts_per_serial: How many contacts share the same serial name
-            start_serial: Starting serial number
+            start_serial: Starting serial number (reserved from the tenant's
+                counter when omitted)
         
         Returns:
             VcfBatch object if contacts were available, None otherwise
         """
-        # Fetch unassigned contacts
-        result = await session.execute(
-            select(ContactPool)
-            .where(ContactPool.tenant_id == tenant_id)
-            .where(ContactPool.is_assigned == False)
-            .order_by(ContactPool.uploaded_at)
-            .limit(contacts_per_batch)
-        )
-        contacts = result.scalars().all()
-        
-        if not contacts:
-            return None
-        
-        # Create VCF batch record
+        # Create VCF batch record (claimed contacts reference it)
         batch = VcfBatch(
             tenant_id=tenant_id,
             prefix=prefix,
-            start_serial=start_serial,
             contacts_per_serial=contacts_per_serial,
-            contact_count=len(contacts),
+            contact_count=0,
             status=VcfBatchStatus.PENDING.value
         )
         session.add(batch)
-        await session.flush()  # Get the batch ID
-        
-        # Generate VCF content
-        vcf_content = ""
-        current_serial = start_serial
-        contacts_in_current_serial = 0
-        
-        for contact in contacts:
-            # Generate serial name
-            serial_name = self.generate_serial_name(prefix, current_serial)
-            
-            # Add vCard entry
-            vcf_content += self.generate_vcard(serial_name, contact.phone)
-            
-            # Update contact assignment
-            contact.vcf_batch_id = batch.id
-            contact.is_assigned = True
-            
-            # Increment serial counter
-            contacts_in_current_serial += 1
-            if contacts_in_current_serial >= contacts_per_serial:
-                current_serial += 1
-                contacts_in_current_serial = 0
-        
-        # Save VCF file
-        file_name = f"batch_{batch.id}_{prefix}_{start_serial}.vcf"
-        file_path = os.path.join(self.STORAGE_PATH, file_name)
-        
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(vcf_content)
-        
-        # Update batch with file info
-        batch.file_path = file_path
-        batch.file_name = file_name
+        await session.flush()
         
+        phones = await self.claim_contacts(session, tenant_id, batch.id, contacts_per_batch)
+        if not phones:
+            await session.rollback()
+            return None
+        batch.contact_count = len(phones)
+        
+        if start_serial is None:
+            start_serial = await self.allocate_serials(
+                session, tenant_id, self.serials_needed(len(phones), contacts_per_serial)
+            )
+        batch.start_serial = start_serial
+        
+        batch.file_name = f"batch_{batch.id}_{prefix}_{start_serial}.vcf"
+        if not settings.VCF_RENDER_ON_DEMAND:
+            # Save VCF file (rendered and written in a worker thread)
+            batch.file_path = os.path.join(self.STORAGE_PATH, batch.file_name)
+            await write_vcf(batch.file_path, self.render_batch(phones, prefix, start_serial, contacts_per_serial))
+        
+        # Last statement before commit: keeps the tenant's counter row lock short
+        await pool_counters.record_assigned(session, tenant_id, len(phones))
         await session.commit()
         
         return batch
@@ -144,38 +269,225 @@ END:VCARD
         prefix: str = "LEG",
         contacts_per_batch: int = 1500,
         contacts_per_serial: int = 25,
-        max_batches: int = 10
+        max_batches: int = 10,
+        on_progress: Optional[Callable[[float], Awaitable[None]]] = None
     ) -> List[VcfBatch]:
         """
-        Generate multiple VCF batches until pool is exhausted or max reached.
+        Generate up to max_batches VCF batches in one pass: contacts for all
+        batches are claimed with a single statement, one serial range is
+        reserved for the whole run, and the files are rendered concurrently
+        in worker processes. Everything commits together.
+        on_progress, if given, is awaited with the fraction done as files finish.
         
         Returns:
             List of generated VcfBatch objects
         """
-        batches = []
-        current_serial = 1
-        
-        for _ in range(max_batches):
-            batch = await self.generate_vcf_batch(
-                session=session,
+        batches = [
+            VcfBatch(
                 tenant_id=tenant_id,
                 prefix=prefix,
-                contacts_per_batch=contacts_per_batch,
                 contacts_per_serial=contacts_per_serial,
-                start_serial=current_serial
+                contact_count=0,
+                status=VcfBatchStatus.PENDING.value
             )
-            
-            if batch is None:
-                break  # No more contacts
-            
-            batches.append(batch)
-            
-            # Calculate next starting serial
-            # Each batch has (contacts_per_batch / contacts_per_serial) serials
-            serials_used = (batch.contact_count + contacts_per_serial - 1) // contacts_per_serial
-            current_serial += serials_used
-        
-        return batches
+            for _ in range(max_batches)
+        ]
+        session.add_all(batches)
+        await session.flush()
+        
+        claimed = await self.claim_contacts_for_batches(
+            session, tenant_id, [batch.id for batch in batches], contacts_per_batch
+        )
+        filled = [(batch, phones) for batch, phones in zip(batches, claimed) if phones]
+        if not filled:
+            await session.rollback()
+            return []
+        for batch in batches[len(filled):]:
+            await session.delete(batch)
+        
+        serial_counts = [self.serials_needed(len(phones), contacts_per_serial) for _, phones in filled]
+        next_serial = await self.allocate_serials(session, tenant_id, sum(serial_counts))
+        for (batch, phones), serials in zip(filled, serial_counts):
+            batch.start_serial = next_serial
+            batch.contact_count = len(phones)
+            batch.file_name = f"batch_{batch.id}_{prefix}_{next_serial}.vcf"
+            if not settings.VCF_RENDER_ON_DEMAND:
+                batch.file_path = os.path.join(self.STORAGE_PATH, batch.file_name)
+            next_serial += serials
+        
+        if settings.VCF_RENDER_ON_DEMAND:
+            # Files are rendered when downloaded
+            filled_contacts = sum(len(phones) for _, phones in filled)
+            await pool_counters.record_assigned(session, tenant_id, filled_contacts)
+            await session.commit()
+            if on_progress:
+                await on_progress(1.0)
+            return [batch for batch, _ in filled]
+        
+        executor = _get_render_executor()
+        futures = [
+            executor.submit(
+                _render_batch_file,
+                batch.file_path, phones, prefix, batch.start_serial, contacts_per_serial
+            )
+            for batch, phones in filled
+        ]
+        renders = [asyncio.wrap_future(future) for future in futures]
+        try:
+            for done, render in enumerate(asyncio.as_completed(renders), start=1):
+                await render
+                if on_progress:
+                    await on_progress(done / len(renders))
+        except BaseException:
+            # The batches roll back with the transaction; drop their files too.
+            # Renders already running can't be stopped, and would put their
+            # file back after we removed it, so wait for them first.
+            for future in futures:
+                future.cancel()
+            await asyncio.gather(*renders, return_exceptions=True)
+            for batch, _ in filled:
+                if os.path.exists(batch.file_path):
+                    os.remove(batch.file_path)
+            raise
+        
+        await pool_counters.record_assigned(session, tenant_id, sum(len(phones) for _, phones in filled))
+        await session.commit()
+        
+        return [batch for batch, _ in filled]
+    
+    async def stage_batch_files(
+        self,
+        session: AsyncSession,
+        batch_ids: List[uuid.UUID]
+    ) -> List[Tuple[str, Optional[str]]]:
+        """
+        Re-render the stored files of batches whose contacts changed after
+        generation (e.g. reclaimed) from the contacts they still hold, as
+        seen by the caller's open transaction. Batches without a stored file
+        are skipped; a batch left with no contacts loses its file_path.
+
+        Nothing visible changes yet: new files are written next to the old
+        ones. Once the transaction commits, apply them with swap_batch_files;
+        if it does not, drop them with discard_batch_files.
+
+        Returns:
+            (stored path, staged path, or None if the file is to be removed)
+        """
+        result = await session.execute(
+            select(VcfBatch)
+            .where(VcfBatch.id.in_(batch_ids))
+            .where(VcfBatch.file_path.is_not(None))
+        )
+        batches = result.scalars().all()
+        if not batches:
+            return []
+        
+        result = await session.execute(
+            select(ContactPool.vcf_batch_id, ContactPool.phone)
+            .where(ContactPool.vcf_batch_id.in_([batch.id for batch in batches]))
+            .order_by(ContactPool.vcf_batch_id, ContactPool.uploaded_at, ContactPool.id)
+        )
+        phones_by_batch = defaultdict(list)
+        for batch_id, phone in result:
+            phones_by_batch[batch_id].append(phone)
+        
+        staged: List[Tuple[str, Optional[str]]] = []
+        try:
+            for batch in batches:
+                phones = phones_by_batch.get(batch.id)
+                if phones:
+                    staged_path = f"{batch.file_path}.staged"
+                    staged.append((batch.file_path, staged_path))
+                    await asyncio.to_thread(
+                        _render_batch_file,
+                        staged_path, phones, batch.prefix, batch.start_serial, batch.contacts_per_serial
+                    )
+                else:
+                    staged.append((batch.file_path, None))
+                    batch.file_path = None
+        except BaseException:
+            self.discard_batch_files(staged)
+            raise
+        return staged
+    
+    def swap_batch_files(self, staged: List[Tuple[str, Optional[str]]]) -> None:
+        """Put files from stage_batch_files in place (after the commit)."""
+        for path, staged_path in staged:
+            if staged_path is not None:
+                os.replace(staged_path, path)
+            elif os.path.exists(path):
+                os.remove(path)
+    
+    def discard_batch_files(self, staged: List[Tuple[str, Optional[str]]]) -> None:
+        """Drop files from stage_batch_files, leaving the stored ones as they were."""
+        for _, staged_path in staged:
+            if staged_path is not None and os.path.exists(staged_path):
+                os.remove(staged_path)
+    
+    def _batch_contacts(self, batch_id: uuid.UUID):
+        return (
+            select(ContactPool.phone)
+            .where(ContactPool.vcf_batch_id == batch_id)
+            .order_by(ContactPool.uploaded_at, ContactPool.id)
+        )
+    
+    async def render_key(self, session: AsyncSession, batch: VcfBatch) -> Tuple[str, str]:
+        """
+        Cache key (also the download ETag) of a batch's rendered file and
+        the digest of its phones it was derived from. Computed in the
+        database from the phones alone, without rendering anything.
+        """
+        result = await session.execute(
+            select(func.md5(func.coalesce(func.string_agg(
+                ContactPool.phone,
+                aggregate_order_by(literal(","), ContactPool.uploaded_at, ContactPool.id)
+            ), "")))
+            .where(ContactPool.vcf_batch_id == batch.id)
+        )
+        digest = result.scalar_one()
+        key = hashlib.sha256(
+            f"{RENDER_VERSION}|{batch.prefix}|{batch.start_serial}|{batch.contacts_per_serial}|{digest}".encode()
+        ).hexdigest()
+        return key, digest
+    
+    async def stream_batch(
+        self,
+        batch: VcfBatch,
+        digest: str,
+        cache_key: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Render a batch's vCards from its contacts through a server-side
+        cursor, yielding encoded chunks. With a cache_key, the output is
+        also written to the render cache and kept only if it completes and
+        the phones still match `digest` (the key was derived from it).
+        """
+        running = hashlib.md5()
+        cache_entry = None
+        committed = False
+        try:
+            if cache_key:
+                cache_entry = await asyncio.to_thread(vcf_cache.create, cache_key)
+            async with AsyncSessionLocal() as session:
+                phones = await session.stream_scalars(
+                    self._batch_contacts(batch.id).execution_options(yield_per=STREAM_BATCH_SIZE)
+                )
+                offset = 0
+                async for partition in phones.partitions(STREAM_BATCH_SIZE):
+                    running.update(("," if offset else "").encode() + ",".join(partition).encode())
+                    data = "".join(self.render_batch(
+                        partition, batch.prefix, batch.start_serial, batch.contacts_per_serial, offset
+                    )).encode("utf-8")
+                    offset += len(partition)
+                    if cache_entry:
+                        await asyncio.to_thread(cache_entry.write, data)
+                    yield data
+            if cache_entry and running.hexdigest() == digest:
+                await asyncio.to_thread(cache_entry.commit)
+                committed = True
+        finally:
+            if cache_entry and not committed:
+                cache_entry.discard()
     
     async def assign_batch_to_agent(
         self,
@@ -202,14 +514,25 @@ END:VCARD
     async def get_agent_batches(
         self,
         session: AsyncSession,
-        agent_id: uuid.UUID
+        agent_id: uuid.UUID,
+        status: Optional[str] = None,
+        page: Optional["PageParams"] = None
     ) -> List[VcfBatch]:
-        """Get all VCF batches assigned to an agent."""
-        result = await session.execute(
-            select(VcfBatch)
-            .where(VcfBatch.agent_id == agent_id)
-            .order_by(VcfBatch.assigned_at.desc())
-        )
+        """
+        Get VCF batches assigned to an agent, most recently assigned first.
+        When a PageParams is given, only that page (plus one look-ahead row)
+        is fetched.
+        """
+        query = select(VcfBatch).where(VcfBatch.agent_id == agent_id)
+        if status:
+            query = query.where(VcfBatch.status == status)
+        
+        if page is not None:
+            query = page.apply(query, VcfBatch.assigned_at, VcfBatch.id)
+        else:
+            query = query.order_by(VcfBatch.assigned_at.desc())
+        
+        result = await session.execute(query)
         return result.scalars().all()
     
     async def get_pending_batches(
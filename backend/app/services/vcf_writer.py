@@ -0,0 +1,68 @@
+"""
+Streaming VCF Writer
+
+Writes vCard files without building them in memory and without blocking
+the event loop:
+- Cards are consumed lazily and written in joined chunks to a buffered
+  handle, so memory stays flat and there is no quadratic string growth
+- The file is written to a temp name, fsynced, then atomically renamed
+  into place, so readers never see a partial file
+- write_vcf() runs the whole thing (rendering included) in a worker thread
+"""
+
+import asyncio
+import os
+from itertools import islice
+from typing import Iterable
+
+# Cards joined per write() call
+WRITE_CHUNK_CARDS = 1000
+BUFFER_SIZE = 1024 * 1024
+
+
+def _fsync_dir(path: str) -> None:
+    # Persist the rename itself (no-op where directories can't be opened)
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_vcf_atomic(path: str, cards: Iterable[str]) -> int:
+    """
+    Write rendered vCards to path atomically.
+
+    Returns:
+        Number of cards written
+    """
+    tmp_path = f"{path}.tmp"
+    written = 0
+    cards = iter(cards)
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="", buffering=BUFFER_SIZE) as f:
+            while True:
+                chunk = list(islice(cards, WRITE_CHUNK_CARDS))
+                if not chunk:
+                    break
+                f.write("".join(chunk))
+                written += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(path)
+    return written
+
+
+async def write_vcf(path: str, cards: Iterable[str]) -> int:
+    """write_vcf_atomic in a worker thread; cards are rendered there too."""
+    return await asyncio.to_thread(write_vcf_atomic, path, cards)
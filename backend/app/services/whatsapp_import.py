@@ -0,0 +1,207 @@
+"""
+WhatsApp Import Service
+
+Turns an uploaded CSV/Excel contact list into a WhatsappCampaign split into
+VCF batches of a fixed size.
+
+The file is streamed in blocks of whole batches (pandas chunksize for CSV,
+openpyxl read-only rows for Excel), so memory stays bounded no matter how
+many rows a campaign has:
+- Each block's vCards are built with the shared vCard encoder
+- The block's batch files are written concurrently in worker threads
+- Batch rows are inserted with one bulk statement at the end
+
+Worker threads cannot be interrupted, so a cancelled import first waits for
+its in-flight read and writes before it closes the file and removes what it
+wrote.
+"""
+
+import asyncio
+import itertools
+import os
+import uuid
+from typing import Awaitable, Callable, Iterator, List, Optional, Tuple
+import openpyxl
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import whatsapp as models
+from app.services.vcard import encode_cards
+from app.services.vcf_writer import write_vcf_atomic
+
+# Rows read per block (rounded down to whole batches)
+READ_ROWS = 50000
+
+MISSING_COLUMNS = "Could not identify Name or Phone columns. Please use 'Name' and 'Phone' headers."
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # Phone numbers stored as numbers
+    return str(value)
+
+
+def _iter_csv(file_path: str, rows: int) -> Iterator[Tuple[pd.DataFrame, float]]:
+    size = os.path.getsize(file_path) or 1
+    with open(file_path, "rb") as f:
+        # Everything as text, so phones keep their leading zeros
+        for frame in pd.read_csv(f, chunksize=rows, dtype=str, keep_default_na=False):
+            yield frame, min(f.tell() / size, 1.0)
+
+
+def _iter_excel(file_path: str, rows: int) -> Iterator[Tuple[pd.DataFrame, float]]:
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        values = sheet.iter_rows(values_only=True)
+        header = [_cell_text(cell) for cell in next(values, ())]
+        total = max((sheet.max_row or 0) - 1, 1)
+        done = 0
+        while True:
+            block = list(itertools.islice(values, rows))
+            if not block:
+                break
+            done += len(block)
+            frame = pd.DataFrame(
+                [[_cell_text(cell) for cell in row[:len(header)]] for row in block],
+                columns=header,
+            ).fillna("")
+            yield frame, min(done / total, 1.0)
+    finally:
+        workbook.close()
+
+
+async def _wait_threads(futures: List[asyncio.Future]) -> None:
+    """Let thread work that is still running finish (its outcome is ignored)."""
+    pending = [future for future in futures if not future.done()]
+    if pending:
+        await asyncio.wait(pending)
+
+
+class WhatsappImportService:
+    """Service for importing WhatsApp campaign contact files."""
+
+    STORAGE_PATH = "storage/vcf"
+
+    def __init__(self):
+        os.makedirs(self.STORAGE_PATH, exist_ok=True)
+
+    def iter_contacts_file(self, file_path: str, file_name: str, rows: int) -> Iterator[Tuple[pd.DataFrame, float]]:
+        """Blocks of up to `rows` rows, each with the fraction of the file read so far."""
+        if file_name.lower().endswith('.csv'):
+            return _iter_csv(file_path, rows)
+        return _iter_excel(file_path, rows)
+
+    def find_columns(self, columns) -> Tuple[str, str]:
+        """
+        Raises:
+            ValueError: if no Name or Phone column can be identified
+        """
+        possible_name_cols = [c for c in columns if 'name' in str(c).lower()]
+        possible_phone_cols = [c for c in columns if 'phone' in str(c).lower() or 'tel' in str(c).lower() or 'mobile' in str(c).lower()]
+
+        if not possible_name_cols or not possible_phone_cols:
+            raise ValueError(MISSING_COLUMNS)
+        return possible_name_cols[0], possible_phone_cols[0]
+
+    async def import_campaign(
+        self,
+        session: AsyncSession,
+        file_path: str,
+        file_name: str,
+        name: str,
+        batch_size: int = 1000,
+        on_progress: Optional[Callable[[float], Awaitable[None]]] = None
+    ) -> models.WhatsappCampaign:
+        """
+        Create a campaign from a spooled upload, writing one VCF per batch.
+
+        Raises:
+            ValueError: if no Name or Phone column can be identified
+        """
+        campaign = models.WhatsappCampaign(
+            name=name,
+            file_name=file_name,
+            total_contacts=0
+        )
+        session.add(campaign)
+        # Campaign and batches commit together, so a cancelled import leaves nothing behind
+        await session.flush()
+
+        rows_per_block = max(READ_ROWS // batch_size, 1) * batch_size
+        blocks = self.iter_contacts_file(file_path, file_name, rows_per_block)
+        columns = None
+        batch_rows: List[dict] = []
+        written: List[str] = []
+        in_flight: List[asyncio.Future] = []
+
+        async def in_thread(func, *args):
+            # Shielded, so cancelling us leaves the future for _wait_threads
+            future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+            in_flight.append(future)
+            return await asyncio.shield(future)
+
+        try:
+            while True:
+                item = await in_thread(next, blocks, None)
+                if item is None:
+                    break
+                frame, fraction = item
+                if columns is None:
+                    columns = self.find_columns(frame.columns)
+                col_name, col_phone = columns
+
+                cards = list(encode_cards(
+                    # Short rows leave NaN even with dtype=str
+                    [name.strip() for name in frame[col_name].fillna("").tolist()],
+                    [phone.strip() for phone in frame[col_phone].fillna("").tolist()],
+                    tel_type=None
+                ))
+
+                # Blocks hold whole batches, so no batch spans two blocks
+                writes = []
+                for start in range(0, len(cards), batch_size):
+                    batch_path = os.path.join(self.STORAGE_PATH, f"{campaign.id}_batch_{len(batch_rows)}.vcf")
+                    batch_cards = cards[start:start + batch_size]
+                    batch_rows.append({
+                        "id": uuid.uuid4(),
+                        "campaign_id": campaign.id,
+                        "status": models.WhatsappBatchStatus.PENDING.value,
+                        "vcf_file_path": batch_path,
+                        "contact_count": len(batch_cards),
+                    })
+                    written.append(batch_path)
+                    writes.append(in_thread(write_vcf_atomic, batch_path, batch_cards))
+                await asyncio.gather(*writes)
+                in_flight.clear()
+                campaign.total_contacts += len(cards)
+
+                if on_progress:
+                    await on_progress(fraction)
+
+            if columns is None:
+                raise ValueError(MISSING_COLUMNS)
+
+            if batch_rows:
+                await session.execute(insert(models.WhatsappBatch), batch_rows)
+            await session.commit()
+        except BaseException:
+            # A write still running would otherwise land after the cleanup
+            await _wait_threads(in_flight)
+            for path in written:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        finally:
+            # Closing a generator a thread is still inside raises; wait it out
+            await _wait_threads(in_flight)
+            blocks.close()
+
+        return campaign
+
+
+# Singleton instance
+whatsapp_import = WhatsappImportService()
@@ -0,0 +1,74 @@
+"""
+Login throughput vs. redirect latency benchmark.
+
+Runs N concurrent password verifications while a probe coroutine simulates
+redirect traffic on the same event loop, and reports the probe's p50/p99
+scheduling delay. Compares the old inline (blocking) verify with the
+thread-pool path used by the login endpoint.
+
+Usage: python benchmark_password_hashing.py [concurrent_logins] [total_logins]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from app.core import security
+
+PROBE_INTERVAL = 0.005  # A "redirect" every 5ms
+
+
+async def redirect_probe(stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append((time.perf_counter() - expected) * 1000)
+
+
+async def run(mode: str, hashed: str, concurrency: int, total: int):
+    samples = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(redirect_probe(stop, samples))
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def login_worker():
+        while not queue.empty():
+            queue.get_nowait()
+            if mode == "inline":
+                security.verify_password("agent123", hashed)
+                await asyncio.sleep(0)
+            else:
+                await security.verify_password_async("agent123", hashed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1] if samples else 0
+    print(
+        f"{mode:>6}: {total / elapsed:7.1f} logins/s | "
+        f"redirect delay p50={statistics.median(samples) if samples else 0:7.2f}ms "
+        f"p99={p99:7.2f}ms max={samples[-1] if samples else 0:7.2f}ms"
+    )
+
+
+async def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    hashed = security.get_password_hash("agent123")
+
+    print(f"Argon2 params: {security.pwd_context.to_dict()}")
+    print(f"{concurrency} concurrent logins, {total} total\n")
+    await run("inline", hashed, concurrency, total)
+    await run("pool", hashed, concurrency, total)
+    print(f"\nPool metrics: {security.hashing_metrics.snapshot()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
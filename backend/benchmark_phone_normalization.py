@@ -0,0 +1,92 @@
+"""
+Phone normalization benchmark.
+
+Generates N raw phone cells in the formats seen in real uploads (local
+Israeli numbers with dashes/spaces, 972 prefixes, +country codes, junk) and
+compares the original regex-per-step cleaner with normalize_phone, the
+str.replace-based path used by the upload parser. Also checks that both
+produce identical results.
+
+Usage: python benchmark_phone_normalization.py [rows]
+"""
+
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+from app.services.phones import normalize_phone
+
+
+FORMATTING = re.compile(r'[\s\-\(\)\.]')
+NON_DIGITS = re.compile(r'[^\d]')
+
+
+def clean_phone_regex(phone):
+    """The cleaner as it was before normalize_phone (baseline)."""
+    if not phone:
+        return None
+    phone = FORMATTING.sub('', str(phone).strip())
+    if phone.startswith('+'):
+        phone = '+' + NON_DIGITS.sub('', phone[1:])
+    else:
+        phone = NON_DIGITS.sub('', phone)
+    digits_only = NON_DIGITS.sub('', phone)
+    if len(digits_only) < 7 or len(digits_only) > 15:
+        return None
+    if phone.startswith('0') and len(phone) == 10:
+        phone = '+972' + phone[1:]
+    elif phone.startswith('972'):
+        phone = '+' + phone
+    elif not phone.startswith('+'):
+        phone = '+972' + phone if len(phone) == 9 else '+' + phone
+    return phone
+
+
+def make_rows(count: int) -> list:
+    rng = random.Random(42)
+    formats = [
+        lambda n: f"05{n % 10}-{n % 10000000:07d}",
+        lambda n: f"05{n % 10} {n % 1000:03d} {n % 10000:04d}",
+        lambda n: f"9725{n % 100000000:08d}",
+        lambda n: f"+972 5{n % 10}-{n % 10000000:07d}",
+        lambda n: f"5{n % 100000000:08d}",
+        lambda n: f"+1 ({n % 1000:03d}) {n % 1000:03d}-{n % 10000:04d}",
+        lambda n: f"{n % 100000}",
+        lambda n: "n/a",
+        lambda n: "",
+    ]
+    weights = [30, 15, 15, 15, 10, 5, 4, 3, 3]
+    return [
+        rng.choices(formats, weights)[0](rng.randrange(10 ** 9))
+        for _ in range(count)
+    ]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = make_rows(count)
+    print(f"{count:,} rows")
+
+    started = time.perf_counter()
+    baseline = [clean_phone_regex(v) for v in rows]
+    unique_baseline = set(p for p in baseline if p)
+    baseline_elapsed = time.perf_counter() - started
+    print(f"  regex:     {baseline_elapsed:7.2f}s  ({count / baseline_elapsed:,.0f} rows/s)")
+
+    started = time.perf_counter()
+    results = [normalize_phone(v) for v in rows]
+    unique_new = set(p for p, _ in results if p)
+    new_elapsed = time.perf_counter() - started
+    print(f"  replace:   {new_elapsed:7.2f}s  ({count / new_elapsed:,.0f} rows/s)")
+
+    mismatches = sum(1 for a, (b, _) in zip(baseline, results) if a != b)
+    print(f"  unique:    {len(unique_new):,}  mismatches: {mismatches}")
+    print(f"  rejects:   {dict(Counter(r for _, r in results if r))}")
+    if mismatches or unique_baseline != unique_new:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
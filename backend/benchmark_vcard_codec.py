@@ -0,0 +1,81 @@
+"""
+vCard codec benchmark.
+
+Encodes N cards with the old inline f-string (no escaping) and with
+encode_cards, parses the encoded text back with parse_vcards, and reports
+cards/s for each. Names are drawn with `;`, `,`, `\\`, newlines and Hebrew
+in them, and every parsed card is compared with its source so escaping
+regressions show up as round-trip mismatches.
+
+A second run uses plain serial names, as VCF batches have them, and also
+times the escaped=True path render_batch uses, which escapes the prefix
+once instead of every name.
+
+Usage: python benchmark_vcard_codec.py [cards]
+"""
+
+import io
+import random
+import sys
+import time
+
+from app.services.vcard import encode_cards, escape_text, parse_vcards
+
+NAME_CHARS = "abcdefghij ABCDE דניאל;,\\\n\r"
+
+
+def make_cards(count: int):
+    rng = random.Random(42)
+    names = [
+        "".join(rng.choice(NAME_CHARS) for _ in range(rng.randint(0, 16)))
+        for _ in range(count)
+    ]
+    phones = [f"+9725{rng.randrange(10 ** 8):08d}" for _ in range(count)]
+    return names, phones
+
+
+def encode_inline(names, phones):
+    return "".join(
+        f"BEGIN:VCARD\nVERSION:3.0\nFN:{name}\nTEL;TYPE=CELL:{phone}\nEND:VCARD\n"
+        for name, phone in zip(names, phones)
+    )
+
+
+def timed(label: str, count: int, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<18} {elapsed:7.3f}s  {count / elapsed:12,.0f} cards/s")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    names, phones = make_cards(count)
+    print(f"{count:,} cards")
+
+    timed("encode (inline)", count, lambda: encode_inline(names, phones))
+    text = timed("encode_cards", count, lambda: "".join(encode_cards(names, phones)))
+    parsed = timed("parse_vcards", count, lambda: list(parse_vcards(io.StringIO(text))))
+
+    # Line breaks normalize to \n and the parser strips FN
+    expected = [name.replace("\r\n", "\n").replace("\r", "\n").strip() for name in names]
+    mismatches = sum(
+        1 for card, name, phone in zip(parsed, expected, phones)
+        if card.name != name or card.tels != [phone]
+    )
+    mismatches += abs(len(parsed) - count)
+    print(f"  round-trip mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+    print("serial names")
+    prefix = escape_text("Contact")
+    names = [f"{prefix}{index // 10:03d}" for index in range(count)]
+    timed("encode (inline)", count, lambda: encode_inline(names, phones))
+    timed("encode_cards", count, lambda: "".join(encode_cards(names, phones)))
+    timed("escaped=True", count, lambda: "".join(encode_cards(names, phones, escaped=True)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+VCF writer benchmark.
+
+Renders batches of 1.5k, 100k and 1M contacts (or the sizes given) with the
+old approach - string concatenation plus a blocking write on the event loop
+- and with the streaming writer used by batch generation, reporting wall
+time and the worst event-loop stall seen by a probe coroutine meanwhile.
+
+Usage: python benchmark_vcf_writer.py [size ...]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from app.services.vcf_generator import vcf_generator
+from app.services.vcf_writer import write_vcf
+
+PROBE_INTERVAL = 0.005
+PREFIX = "LEG"
+CONTACTS_PER_SERIAL = 25
+
+
+async def loop_probe(stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append((time.perf_counter() - expected) * 1000)
+
+
+async def write_concat(path: str, phones: list):
+    vcf_content = ""
+    for index, phone in enumerate(phones):
+        serial_name = vcf_generator.generate_serial_name(PREFIX, 1 + index // CONTACTS_PER_SERIAL)
+        vcf_content += vcf_generator.generate_vcard(serial_name, phone)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(vcf_content)
+
+
+async def write_streaming(path: str, phones: list):
+    await write_vcf(path, vcf_generator.render_batch(phones, PREFIX, 1, CONTACTS_PER_SERIAL))
+
+
+async def measure(writer, path: str, phones: list):
+    samples = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(loop_probe(stop, samples))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+    started = time.perf_counter()
+    await writer(path, phones)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return elapsed, max(samples) if samples else 0.0
+
+
+async def main(sizes):
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            phones = [f"+97250{i % 10000000:07d}" for i in range(size)]
+            print(f"{size:,} contacts")
+            for label, writer in (("concat", write_concat), ("streaming", write_streaming)):
+                path = os.path.join(tmp, f"{label}_{size}.vcf")
+                elapsed, stall = await measure(writer, path, phones)
+                size_mb = os.path.getsize(path) / 1024 / 1024
+                print(f"  {label:<10} {elapsed:7.2f}s  max loop stall {stall:8.1f}ms  ({size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1500, 100_000, 1_000_000]
+    asyncio.run(main(sizes))
@@ -0,0 +1,33 @@
+"""
+Nightly compaction of agent daily progress snapshots.
+
+Rebuilds AgentDailySnapshot rows for every agent from the raw AgentProgress
+rows of the last N days (default: yesterday and today), repairing totals
+and streaks after late or backdated reports.
+
+Run from cron shortly after midnight UTC:
+    python compact_progress_snapshots.py [days]
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+from app.core.database import AsyncSessionLocal
+from app.services.progress_snapshots import progress_snapshots
+
+
+async def compact(days: int):
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=days - 1)
+    async with AsyncSessionLocal() as session:
+        written = await progress_snapshots.compact(session, start, end)
+    print(f"Compacted snapshots {start} .. {end}: {written} rows written")
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(compact(days))
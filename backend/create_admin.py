@@ -1,7 +1,7 @@
 import asyncio
 from app.core.database import AsyncSessionLocal
 from app.models.tenant import User, Tenant, UserRole
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from sqlalchemy import select
 import uuid
 
@@ -25,7 +25,7 @@ async def create_admin():
                 name="Admin User",
                 phone="admin",
                 role=UserRole.ADMIN.value,
-                hashed_password=get_password_hash("admin123"),
+                hashed_password=await get_password_hash_async("admin123"),
                 wallet_balance=0.0
             )
             session.add(user)
@@ -0,0 +1,36 @@
+"""
+Rebuild the per-tenant phone presence filters from contact_pool.
+
+Uploads rebuild a missing filter on their own; run this after restoring
+Redis or the database, or to warm the filters of every tenant up front:
+    python rebuild_phone_filters.py [tenant_id ...]
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models import Tenant
+from app.services.phone_filter import phone_filter
+
+
+async def rebuild(tenant_ids):
+    if not tenant_ids:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Tenant.id))
+            tenant_ids = result.scalars().all()
+
+    for tenant_id in tenant_ids:
+        rebuilt = await phone_filter.rebuild(tenant_id)
+        print(f"{tenant_id}: {'rebuilt' if rebuilt else 'skipped (rebuild already running)'}")
+
+
+if __name__ == "__main__":
+    tenant_ids = [uuid.UUID(arg) for arg in sys.argv[1:]]
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(rebuild(tenant_ids))
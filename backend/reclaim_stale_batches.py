@@ -0,0 +1,47 @@
+"""
+Stale VCF batch reclamation.
+
+Returns the un-worked contacts of batches with no progress for N days to
+the pool (or, with --rebalance, moves untouched ones to active agents) for
+every tenant or the given ones. Meant to run daily from cron.
+    python reclaim_stale_batches.py [--days N] [--rebalance] [tenant_id ...]
+"""
+
+import argparse
+import asyncio
+import os
+import uuid
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models import Tenant
+from app.services.batch_reclaim import batch_reclaim, RECLAIM_REBALANCE, RECLAIM_RETURN
+from app.services.export import export_service
+
+
+async def reclaim(tenant_ids, stale_days, mode):
+    if not tenant_ids:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Tenant.id))
+            tenant_ids = result.scalars().all()
+
+    for tenant_id in tenant_ids:
+        async with AsyncSessionLocal() as session:
+            result = await batch_reclaim.reclaim_stale(session, tenant_id, stale_days=stale_days, mode=mode)
+        await export_service.invalidate_report(tenant_id)
+        print(
+            f"{tenant_id}: {result['moved_batches']} batches moved, "
+            f"{result['reclaimed_batches']} reclaimed, {result['returned_contacts']} contacts returned"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reclaim stale VCF batches")
+    parser.add_argument("--days", type=int, default=3, help="Days without progress that make a batch stale")
+    parser.add_argument("--rebalance", action="store_true", help="Move untouched batches to active agents")
+    parser.add_argument("tenant_ids", nargs="*", type=uuid.UUID)
+    args = parser.parse_args()
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(reclaim(args.tenant_ids, args.days, RECLAIM_REBALANCE if args.rebalance else RECLAIM_RETURN))
@@ -0,0 +1,37 @@
+"""
+Exact recount of the maintained contact pool counters.
+
+Rebuilds ContactPoolStats from contact_pool for every tenant (or the given
+ones), repairing any drift. Safe to run while uploads are in progress.
+    python recount_pool_stats.py [tenant_id ...]
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models import Tenant
+from app.services.pool_counters import pool_counters
+
+
+async def recount(tenant_ids):
+    if not tenant_ids:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Tenant.id))
+            tenant_ids = result.scalars().all()
+
+    for tenant_id in tenant_ids:
+        async with AsyncSessionLocal() as session:
+            stats = await pool_counters.recount(session, tenant_id)
+        print(f"{tenant_id}: {stats.total_contacts} contacts, {stats.assigned} assigned")
+
+
+if __name__ == "__main__":
+    tenant_ids = [uuid.UUID(arg) for arg in sys.argv[1:]]
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(recount(tenant_ids))
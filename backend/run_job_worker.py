@@ -0,0 +1,42 @@
+"""
+Standalone background job worker.
+
+Runs N job workers against the same Redis queue the API enqueues to, for
+deployments that keep heavy work out of the web process (set JOB_WORKERS=0
+on the API). Both processes must share the storage/ directory, since
+uploads are spooled there.
+
+    python run_job_worker.py [workers]
+"""
+
+import asyncio
+import os
+import signal
+import sys
+
+from app.services.jobs import job_workers
+
+
+async def main(workers: int):
+    job_workers.start(workers)
+    print(f"Job worker running with {workers} worker(s)")
+
+    stop = asyncio.Event()
+    if os.name != 'nt':
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        await job_workers.stop()
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    try:
+        asyncio.run(main(workers))
+    except KeyboardInterrupt:
+        pass
@@ -3,7 +3,7 @@ import logging
 from sqlalchemy import select
 from app.core.database import AsyncSessionLocal
 from app.models import Tenant, User, UserRole, Campaign, CampaignStatus
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,7 +29,7 @@ async def seed_data():
             role=UserRole.ADMIN.value,
             name="Alice Admin",
             phone="+15550001",
-            hashed_password=get_password_hash("admin123"),
+            hashed_password=await get_password_hash_async("admin123"),
             wallet_balance=1000.0
         )
         session.add(admin)
@@ -40,7 +40,7 @@ async def seed_data():
             role=UserRole.AGENT.value,
             name="Bob Agent",
             phone="+15550002",
-            hashed_password=get_password_hash("agent123"), # Usually OTP, but password for now
+            hashed_password=await get_password_hash_async("agent123"), # Usually OTP, but password for now
             current_score=150,
             wallet_balance=50.0
         )
@@ -49,7 +49,7 @@ async def seed_data():
             role=UserRole.AGENT.value,
             name="Charlie Agent",
             phone="+15550003",
-            hashed_password=get_password_hash("agent123"),
+            hashed_password=await get_password_hash_async("agent123"),
             current_score=320,
             wallet_balance=120.0
         )
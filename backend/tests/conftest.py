@@ -0,0 +1,16 @@
+"""
+Test configuration.
+
+Tests that need Postgres run against the database named by
+TEST_DATABASE_URL (a throwaway database: their tables are created and
+dropped around each module) and are skipped when it is not set. The rest
+need no services.
+"""
+
+import os
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+if TEST_DATABASE_URL:
+    # Settings are read when app.core.config is imported, so this must come first
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
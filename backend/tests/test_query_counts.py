@@ -0,0 +1,148 @@
+"""
+N+1 guards: listing endpoints must run the same number of queries whether
+they return one row or many.
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL not set", allow_module_level=True)
+
+from fastapi import Response
+from sqlalchemy import text
+
+from app import models
+from app.api.endpoints.campaigns import get_my_campaigns
+from app.api.endpoints.contacts import list_vcf_batches
+from app.api.pagination import PageParams
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.core.query_counter import assert_max_queries, count_queries
+
+SIZES = (1, 25)
+
+
+def run(coro):
+    async def with_fresh_pool():
+        try:
+            return await coro
+        finally:
+            # asyncpg connections belong to the loop that opened them
+            await engine.dispose()
+    return asyncio.run(with_fresh_pool())
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def drop():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+
+    run(create())
+    yield
+    run(drop())
+
+
+def _user(tenant: models.Tenant, role: models.UserRole) -> models.User:
+    return models.User(
+        tenant=tenant,
+        role=role.value,
+        phone=f"+9725{uuid.uuid4().int % 10 ** 8:08d}",
+        name=f"{role.value.title()} {uuid.uuid4().hex[:6]}",
+    )
+
+
+async def _seed_batches(count: int) -> models.User:
+    """A tenant with `count` batches, each assigned to a different agent."""
+    async with AsyncSessionLocal() as session:
+        tenant = models.Tenant(name=f"batches-{count}")
+        admin = _user(tenant, models.UserRole.ADMIN)
+        session.add(admin)
+        for _ in range(count):
+            session.add(models.VcfBatch(
+                tenant=tenant,
+                agent=_user(tenant, models.UserRole.AGENT),
+                contact_count=10,
+                status=models.VcfBatchStatus.ASSIGNED.value,
+            ))
+        await session.commit()
+        return admin
+
+
+async def _seed_campaigns(count: int) -> models.User:
+    """A tenant with `count` active campaigns, each joined by the agent."""
+    async with AsyncSessionLocal() as session:
+        tenant = models.Tenant(name=f"campaigns-{count}")
+        agent = _user(tenant, models.UserRole.AGENT)
+        session.add(agent)
+        for _ in range(count):
+            campaign = models.Campaign(
+                tenant=tenant,
+                name=f"Campaign {uuid.uuid4().hex[:6]}",
+                target_url="https://example.com",
+                status=models.CampaignStatus.ACTIVE.value,
+            )
+            session.add(models.TrackingLink(
+                short_code=uuid.uuid4().hex[:10],
+                agent=agent,
+                campaign=campaign,
+            ))
+        await session.commit()
+        return agent
+
+
+async def _count(call) -> tuple:
+    # Connect (and let the dialect run its setup queries) before counting
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    with count_queries() as counter:
+        items = await call()
+    return counter.count, len(items)
+
+
+def test_list_vcf_batches_query_count_is_constant():
+    counts = []
+    for size in SIZES:
+        admin = run(_seed_batches(size))
+        count, listed = run(_count(lambda: list_vcf_batches(
+            response=Response(), status=None, agent_id=None,
+            page=PageParams(cursor=None, limit=None), current_user=admin
+        )))
+        assert listed == size
+        counts.append(count)
+    assert counts[0] == counts[-1], f"queries grew with the batch count: {counts}"
+
+
+def test_get_my_campaigns_query_count_is_constant():
+    counts = []
+    for size in SIZES:
+        agent = run(_seed_campaigns(size))
+        count, listed = run(_count(lambda: get_my_campaigns(current_user=agent)))
+        assert listed == size
+        counts.append(count)
+    assert counts[0] == counts[-1], f"queries grew with the campaign count: {counts}"
+
+
+def test_listings_fit_a_single_query():
+    admin = run(_seed_batches(5))
+    agent = run(_seed_campaigns(5))
+
+    async def listings():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        with assert_max_queries(1):
+            await list_vcf_batches(
+                response=Response(), status=None, agent_id=None,
+                page=PageParams(cursor=None, limit=None), current_user=admin
+            )
+        with assert_max_queries(1):
+            await get_my_campaigns(current_user=agent)
+
+    run(listings())
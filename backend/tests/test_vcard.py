@@ -0,0 +1,87 @@
+"""
+vCard codec round trips: whatever encode_cards writes, parse_vcards must
+read back unchanged.
+"""
+
+import pytest
+
+from app.services.vcard import VCard, encode_card, encode_cards, escape_text, parse_vcards
+
+NAMES = [
+    "Alice",
+    "Dana Cohen",
+    "Doe; John",
+    "Smith, Jr.",
+    "back\\slash",
+    "two\nlines",
+    "semi;colon,comma\\back\nnewline",
+    "\\;",
+    "דנה כהן",
+    "Zoë, ☎ 050",
+    "",
+]
+
+
+def parse(text: str):
+    return list(parse_vcards(text.splitlines(keepends=True)))
+
+
+def fold(text: str, width: int) -> str:
+    """Fold every content line at `width` characters (RFC 2425 style)."""
+    folded = []
+    for line in text.splitlines():
+        chunks = [line[i:i + width] for i in range(0, len(line), width)] or [""]
+        folded.append("\r\n ".join(chunks))
+    return "\r\n".join(folded) + "\r\n"
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_card_round_trips(name):
+    assert parse(encode_card(name, "+972501234567")) == [VCard(name, ["+972501234567"])]
+
+
+def test_batch_round_trips():
+    tels = [f"+9725012345{i:02d}" for i in range(len(NAMES))]
+    cards = parse("".join(encode_cards(NAMES, tels)))
+    assert cards == [VCard(name, [tel]) for name, tel in zip(NAMES, tels)]
+
+
+@pytest.mark.parametrize("name", ["Alice", "Dana Cohen 12", "דנה", "Zoë-Ann (work)"])
+def test_plain_names_are_not_escaped(name):
+    assert escape_text(name) == name
+    assert f"\nFN:{name}\n" in encode_card(name, "+972501234567")
+
+
+def test_special_characters_are_escaped():
+    assert escape_text("a;b,c\\d\ne") == "a\\;b\\,c\\\\d\\ne"
+
+
+def test_carriage_returns_become_newlines():
+    assert escape_text("a\r\nb\rc") == "a\\nb\\nc"
+    assert parse(encode_card("a\r\nb", "+972501234567"))[0].name == "a\nb"
+
+
+def test_pre_escaped_names_are_written_as_given():
+    tels = ["+972501234567"] * len(NAMES)
+    pre_escaped = encode_cards([escape_text(name) for name in NAMES], tels, escaped=True)
+    assert list(pre_escaped) == list(encode_cards(NAMES, tels))
+
+
+def test_tel_is_kept_on_one_line():
+    card = encode_card("Alice", "+97250\r\n1234567")
+    assert "TEL;TYPE=CELL:+97250 1234567\n" in card
+    assert parse(card) == [VCard("Alice", ["+97250 1234567"])]
+
+
+def test_tel_type_can_be_omitted():
+    card = encode_card("Alice", "+972501234567", tel_type=None)
+    assert "\nTEL:+972501234567\n" in card
+    assert parse(card) == [VCard("Alice", ["+972501234567"])]
+
+
+@pytest.mark.parametrize("width", [1, 2, 5, 75])
+def test_folded_lines_round_trip(width):
+    # Narrow widths also fold inside escape sequences and multi-byte names
+    tels = [f"+9725012345{i:02d}" for i in range(len(NAMES))]
+    cards = parse(fold("".join(encode_cards(NAMES, tels)), width))
+    assert cards == [VCard(name, [tel]) for name, tel in zip(NAMES, tels)]